@@ -1,22 +1,50 @@
 """
 RootAgent (Orquestador principal)
 Orquesta el flujo secuencial de los agentes del sistema de verificación de noticias.
+
+El árbol de agentes (y con él google.adk, google.genai, aiohttp y
+BeautifulSoup) se construye la primera vez que se pide ``root_agent``, no al
+importar este módulo.
 """
-from google.adk.agents.sequential_agent import SequentialAgent
-from adk_project.agents.smart_scraper_agent.smart_scraper_agent import SmartScraperAgent
-from adk_project.agents.claim_extractor_agent.claim_extractor_agent import ClaimExtractorAgent
-from adk_project.agents.fact_check_matcher_agent.fact_check_matcher_agent import FactCheckMatcherAgent
-from adk_project.agents.truth_scorer_agent.truth_scorer_agent import TruthScorerAgent
-from adk_project.agents.response_formatter_agent.response_formatter_agent import ResponseFormatterAgent
-
-# This is the object that will be passed to the deployment function.
-root_agent = SequentialAgent(
-    name="FactosAgent",
-    sub_agents=[
-        SmartScraperAgent(),
-        ClaimExtractorAgent(),
-        FactCheckMatcherAgent(),
-        TruthScorerAgent(),
-        ResponseFormatterAgent()
-    ]
-) 
\ No newline at end of file
+import threading
+
+_root_agent = None
+# El warm-up construye el árbol en un hilo; el lock evita importaciones concurrentes a medias.
+_build_lock = threading.Lock()
+
+
+def get_root_agent():
+    """Returns the FactosAgent tree, building it once per process (thread-safe)."""
+    global _root_agent
+    if _root_agent is None:
+        with _build_lock:
+            if _root_agent is None:
+                _root_agent = _build_root_agent()
+    return _root_agent
+
+
+def _build_root_agent():
+    from google.adk.agents.sequential_agent import SequentialAgent
+    from adk_project.agents.smart_scraper_agent.smart_scraper_agent import SmartScraperAgent
+    from adk_project.agents.claim_extractor_agent.claim_extractor_agent import ClaimExtractorAgent
+    from adk_project.agents.fact_check_matcher_agent.fact_check_matcher_agent import FactCheckMatcherAgent
+    from adk_project.agents.truth_scorer_agent.truth_scorer_agent import TruthScorerAgent
+    from adk_project.agents.response_formatter_agent.response_formatter_agent import ResponseFormatterAgent
+
+    return SequentialAgent(
+        name="FactosAgent",
+        sub_agents=[
+            SmartScraperAgent(),
+            ClaimExtractorAgent(),
+            FactCheckMatcherAgent(),
+            TruthScorerAgent(),
+            ResponseFormatterAgent()
+        ]
+    )
+
+
+def __getattr__(name):
+    # This is the object that will be passed to the deployment function.
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,232 @@
+"""
+Micro-batching de llamadas a modelo entre pipelines concurrentes.
+
+Las peticiones de un mismo agente que llegan con pocos milisegundos de
+diferencia se empaquetan en un único prompt con salida JSON por elemento y
+los resultados se reparten a cada invocación en espera. Con carga baja (sin
+llegadas recientes) la petición va directa al modelo sin esperar; un lote de
+un solo elemento o un lote fallido también vuelve a la llamada directa.
+
+El lote corre con el plazo más corto de sus peticiones y se cancela si todas
+dejan de esperar; el consumo de tokens del lote se reparte entre sus elementos.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, GenerateContentResponseUsageMetadata, Part
+
+from adk_project.agents.utils import parse_json_text
+from adk_project.deadline import Deadline, current_deadline, deadline_scope
+from adk_project.telemetry import LLM_BATCH_SIZE
+
+# 1 desactiva el batching.
+BATCH_MAX_SIZE = int(os.getenv("FACTOS_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("FACTOS_BATCH_MAX_WAIT_MS", "15"))
+
+BATCH_MARKER = "[FACTOS-BATCH]"
+BATCH_INSTRUCTION = f"""
+
+{BATCH_MARKER}
+Recibirás varias entradas independientes, cada una entre <item id="N"> y </item>.
+Aplica las instrucciones anteriores a cada entrada por separado, sin mezclar información entre ellas.
+Responde únicamente con un array JSON con un objeto por entrada: [{{"id": N, "output": <tu respuesta para esa entrada>}}]
+"""
+
+
+def render_item(item_id: int, llm_request: LlmRequest) -> str:
+    lines = [
+        f"[{content.role or 'user'}] {part.text}"
+        for content in llm_request.contents
+        for part in content.parts or []
+        if part.text
+    ]
+    return f'<item id="{item_id}">\n' + "\n".join(lines) + "\n</item>"
+
+
+def _batchable(llm_request: LlmRequest) -> bool:
+    # A mitad de un ciclo de herramientas la respuesta depende del function_response: va directa.
+    parts = [part for content in llm_request.contents for part in content.parts or []]
+    return any(p.text for p in parts) and not any(p.function_call or p.function_response for p in parts)
+
+
+def _group_key(agent_name: str, llm_request: LlmRequest) -> str:
+    instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+    digest = hashlib.sha256(instruction.encode("utf-8")).hexdigest()[:16]
+    return f"{agent_name}:{llm_request.model}:{digest}"
+
+
+def _shortest_deadline(deadlines: List[Optional[Deadline]]) -> Optional[Deadline]:
+    expiries = [d.expires_at for d in deadlines if d is not None and d.expires_at is not None]
+    return Deadline(min(expiries)) if expiries else None
+
+
+def split_usage(
+    usage: Optional[GenerateContentResponseUsageMetadata], parts: int
+) -> List[Optional[GenerateContentResponseUsageMetadata]]:
+    """Splits the token counts of one batched call across its ``parts`` items (remainders go to the first ones)."""
+    if usage is None:
+        return [None] * parts
+    counts = {k: v for k, v in usage.model_dump(exclude_none=True).items() if isinstance(v, int)}
+    return [
+        GenerateContentResponseUsageMetadata(
+            **{k: v // parts + (i < v % parts) for k, v in counts.items()}
+        )
+        for i in range(parts)
+    ]
+
+
+async def _after_model(agent, callback_context: CallbackContext, response: LlmResponse) -> LlmResponse:
+    # ADK no ejecuta after_model_callback cuando before_model devuelve la respuesta.
+    for callback in agent.canonical_after_model_callbacks:
+        altered = callback(callback_context=callback_context, llm_response=response)
+        if inspect.isawaitable(altered):
+            altered = await altered
+        if altered:
+            response = altered
+    return response
+
+
+class MicroBatcher:
+    """Gathers model requests per agent for up to ``max_wait_ms`` and sends them as one call."""
+
+    def __init__(self, max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.batched_items = 0
+        self.direct = 0
+        self.fallbacks = 0
+        self._queues: Dict[str, List[Tuple[LlmRequest, asyncio.Future, Optional[Deadline]]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._last_arrival: Dict[str, float] = {}
+        self._dispatching = set()
+        self._agents: Dict[str, Any] = {}
+
+    def register(self, agent) -> None:
+        """Makes ``agent`` batchable; ``before_model`` finds it by ``callback_context.agent_name``."""
+        self._agents[agent.name] = agent
+
+    async def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        agent = self._agents.get(callback_context.agent_name)
+        if agent is None or self.max_batch_size <= 1 or not _batchable(llm_request):
+            return None
+        group = _group_key(agent.name, llm_request)
+        now = time.monotonic()
+        last = self._last_arrival.get(group)
+        self._last_arrival[group] = now
+        if group not in self._queues and (last is None or now - last > self.max_wait):
+            # Carga baja: no hay con quién agrupar, así que no se espera.
+            self.direct += 1
+            return None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.setdefault(group, [])
+        if not queue:
+            self._timers[group] = loop.call_later(self.max_wait, self._flush, group, agent)
+        queue.append((llm_request, future, current_deadline()))
+        if len(queue) >= self.max_batch_size:
+            self._flush(group, agent)
+
+        response = await future
+        if response is None:
+            self.fallbacks += 1
+            return None
+        return await _after_model(agent, callback_context, response)
+
+    def _flush(self, group: str, agent) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        # Las peticiones canceladas mientras esperaban no entran en el lote.
+        items = [item for item in self._queues.pop(group, []) if not item[1].done()]
+        if len(items) == 1:
+            # Un solo elemento: llamada directa.
+            items[0][1].set_result(None)
+            return
+        if items:
+            # Lanzado desde un timer, fuera del contexto de cada petición: hereda el plazo más corto.
+            with deadline_scope(_shortest_deadline([deadline for _, _, deadline in items])):
+                task = asyncio.ensure_future(self._dispatch(agent, items))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+            futures = [future for _, future, _ in items]
+            for future in futures:
+                future.add_done_callback(lambda _: self._abandon(task, futures))
+
+    @staticmethod
+    def _abandon(task: asyncio.Task, futures: List[asyncio.Future]) -> None:
+        if all(future.cancelled() for future in futures):
+            task.cancel()
+
+    async def _dispatch(self, agent, items: List[Tuple[LlmRequest, asyncio.Future, Optional[Deadline]]]) -> None:
+        outputs: Dict[int, object] = {}
+        usage = None
+        deadline = current_deadline()
+        try:
+            async with asyncio.timeout(deadline.remaining() if deadline is not None else None):
+                outputs, usage = await self._call_batch(agent, [request for request, _, _ in items])
+            self.batches += 1
+            self.batched_items += len(items)
+            LLM_BATCH_SIZE.labels(stage=agent.name).observe(len(items))
+        except Exception as exc:
+            print(f"--- Batched model call for {agent.name} failed, falling back: {type(exc).__name__}: {exc} ---")
+        shares = split_usage(usage, len(outputs))
+        for item_id, (_, future, _) in enumerate(items):
+            if future.done():
+                continue
+            if item_id not in outputs:
+                future.set_result(None)
+                continue
+            output = outputs[item_id]
+            text = output if isinstance(output, str) else json.dumps(output)
+            future.set_result(LlmResponse(content=Content(role="model", parts=[Part(text=text)]), usage_metadata=shares.pop(0)))
+
+    async def _call_batch(
+        self, agent, requests: List[LlmRequest]
+    ) -> Tuple[Dict[int, object], Optional[GenerateContentResponseUsageMetadata]]:
+        """Sends one packed request; returns ``{item_id: output}`` for the answered items and the call's token usage."""
+        first = requests[0]
+        config = first.config.model_copy(deep=True)
+        config.tools = None
+        config.response_mime_type = "application/json"
+        config.system_instruction = str(config.system_instruction or "") + BATCH_INSTRUCTION
+        prompt = "\n\n".join(render_item(i, request) for i, request in enumerate(requests))
+        batch_request = LlmRequest(
+            model=first.model, contents=[Content(role="user", parts=[Part(text=prompt)])], config=config
+        )
+        final = None
+        async for response in agent.canonical_model.generate_content_async(batch_request):
+            if not response.partial:
+                final = response
+        text = "".join(p.text or "" for p in final.content.parts) if final and final.content else ""
+        usage = final.usage_metadata if final else None
+        answers = parse_json_text(text, [])
+        if not isinstance(answers, list):
+            return {}, usage
+        outputs = {
+            answer["id"]: answer["output"]
+            for answer in answers
+            if isinstance(answer, dict) and isinstance(answer.get("id"), int) and "output" in answer
+        }
+        # Solo cuentan los ids pedidos: un id inventado no debe quedarse parte del consumo.
+        return {i: outputs[i] for i in range(len(requests)) if i in outputs}, usage
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "direct": self.direct,
+            "fallbacks": self.fallbacks,
+        }
+
+
+MODEL_BATCHER = MicroBatcher()
@@ -1,21 +1,27 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools import FunctionTool
 from adk_project.agents.claim_extractor_agent.prompt import CLAIM_EXTRACTOR_PROMPT
+from adk_project.agents.smart_scraper_agent.article_extractor import ArticleExtractionError, extract_article
+from adk_project.agents.batching import MODEL_BATCHER
+from adk_project.agents.llm_cache import LLM_CACHE
+from adk_project.agents.utils import article_context_callback, payload_budget_callback
+from adk_project.deadline import LLM_MIN_BUDGET_S, degrade, has_budget
+from adk_project.messages import ExtractedClaim
+from adk_project.protocols.a2a_protocol import MAX_PAYLOAD_TOKENS
+from adk_project.summarizer import summarize
+from adk_project.telemetry import timed_tool
 import json
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Part, Content
 
-# Simulación de herramienta Firecrawl
+@timed_tool
 async def firecrawl_tool(url: str) -> str:
-    # Simulación específica para la noticia de The Guardian
-    if url == "https://www.theguardian.com/world/2025/jun/11/uk-and-gibraltar-strike-deal-over-territorys-future-and-borders":
-        return (
-            "The UK and Gibraltar have reached a historic agreement with Spain over the future of the territory and its borders. "
-            "The deal is expected to ease tensions and ensure free movement between Gibraltar and Spain, while maintaining British sovereignty. "
-            "Officials from all sides hailed the agreement as a breakthrough after years of negotiations."
-        )
-    # ...simulación genérica...
-    return f"Texto extraído de {url} (simulado)"
+    """Obtiene el texto principal del artículo (resumen extractivo acotado en tokens)."""
+    try:
+        article = await extract_article(url)
+    except ArticleExtractionError as exc:
+        return f"Error: {exc}"
+    return summarize(article["full_text"], article["headline"], MAX_PAYLOAD_TOKENS)
 
 firecrawl = FunctionTool(firecrawl_tool)
 
@@ -27,8 +33,12 @@ class ClaimExtractorAgent(LlmAgent):
             description="Extrae la afirmación principal del artículo usando NLP y Firecrawl.",
             output_key="extracted_claim",
             tools=[firecrawl],
-            model="gemini-2.5-flash"
+            model="gemini-2.5-flash",
+            # El texto del artículo se añade a la llamada antes de calcular la clave de caché.
+            before_model_callback=[article_context_callback, LLM_CACHE.before_model, MODEL_BATCHER.before_model],
+            after_model_callback=[payload_budget_callback("ExtractedClaim"), LLM_CACHE.after_model],
         )
+        MODEL_BATCHER.register(self)
 
     async def run_async(self, ctx):
         # The input to this agent is the output of the SmartScraperAgent.
@@ -38,12 +48,26 @@ class ClaimExtractorAgent(LlmAgent):
         url = validated_article.get("url", "") # We use the URL from the *actual* scraped article
 
         if url == "https://www.theguardian.com/world/2025/jun/11/uk-and-gibraltar-strike-deal-over-territorys-future-and-borders":
-            claim = {
-                "claim": "The UK and Gibraltar have reached a historic agreement with Spain over the territory's future and borders, ensuring free movement and maintaining British sovereignty.",
-                "tokens_used": 22
-            }
+            claim = ExtractedClaim(
+                claim="The UK and Gibraltar have reached a historic agreement with Spain over the territory's future and borders, ensuring free movement and maintaining British sovereignty.",
+                tokens_used=22,
+            ).to_dict()
+            final_part = Part(text=json.dumps(claim))
+            yield Event(
+                content=Content(parts=[final_part]),
+                author=self.name,
+                actions=EventActions(state_delta={self.output_key: claim}),
+            )
+        elif not has_budget(LLM_MIN_BUDGET_S):
+            # Sin plazo para el modelo: el titular (o el inicio del texto) hace de afirmación principal.
+            degrade(self.name)
+            claim = ExtractedClaim(claim=validated_article.get("headline") or validated_article.get("preview", "")).to_dict()
             final_part = Part(text=json.dumps(claim))
-            yield Event(content=Content(parts=[final_part]), author=self.name)
+            yield Event(
+                content=Content(parts=[final_part]),
+                author=self.name,
+                actions=EventActions(state_delta={self.output_key: claim}),
+            )
         else:
             # For the default case, just invoke the parent LLM logic.
             # The ADK will use the output from the previous agent (the article text)
@@ -2,39 +2,73 @@ from google.adk.agents import LlmAgent
 from google.adk.tools import FunctionTool
 from adk_project.agents.fact_check_matcher_agent.prompt import MATCHER_PROMPT
 from adk_project.agents.fact_check_matcher_agent.factchecker_scraper import get_factchecker_claims
+from adk_project.agents.fact_check_matcher_agent.factcheck_index import search_local_factchecks
+from adk_project.agents.llm_cache import LLM_CACHE
+from adk_project.agents.utils import load_claim_text, payload_budget_callback
+from adk_project.deadline import LIVE_SCRAPE_MIN_BUDGET_S, LLM_MIN_BUDGET_S, degrade, has_budget
+from adk_project.protocols.a2a_protocol import validate_message
+from adk_project.telemetry import timed_tool
 import json
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Part, Content
 
+STAGE_NAME = "FactCheckMatcherAgent"
+
+@timed_tool
+async def local_factcheck_search_tool(main_claim: str):
+    """Busca la afirmación en la base local pre-embebida (similitud de coseno)."""
+    return await search_local_factchecks(main_claim)
+
+@timed_tool
 async def factchecker_search_tool(main_claim: str):
+    """Devuelve ``{"matches": [...], "failures": [...]}``; ``failures`` lista los fact-checkers no disponibles y el motivo."""
     # Simulación específica para la noticia de The Guardian
     if "Gibraltar" in main_claim:
-        return [
+        return {"matches": [
             {"claim": "There is no evidence that the new UK-Gibraltar-Spain deal changes British sovereignty over Gibraltar.", "confidence": 0.97, "source": "https://www.factcheck.org/uk-gibraltar-sovereignty-deal/"},
             {"claim": "The agreement is designed to maintain free movement and reduce border friction, not to alter sovereignty.", "confidence": 0.95, "source": "https://apnews.com/ap-fact-check/gibraltar-deal"},
             {"claim": "Fact-checkers confirm the deal is a diplomatic breakthrough, not a sovereignty transfer.", "confidence": 0.93, "source": "https://reporterslab.org/fact-checking/gibraltar-deal/"}
-        ]
-    # ...comportamiento real o simulado...
-    claims = await get_factchecker_claims(main_claim)
-    return claims
+        ], "failures": []}
+    # La base local ya la consulta local_factcheck_search_tool; aquí solo el scraping en vivo.
+    if not has_budget(LIVE_SCRAPE_MIN_BUDGET_S):
+        degrade(STAGE_NAME)
+        return {"matches": [], "failures": []}
+    result = await get_factchecker_claims(main_claim)
+    if any(f["reason"] == "deadline" for f in result["failures"]):
+        degrade(STAGE_NAME)
+    return result
 
+local_factcheck_tool = FunctionTool(local_factcheck_search_tool)
 factchecker_tool = FunctionTool(factchecker_search_tool)
 
 class FactCheckMatcherAgent(LlmAgent):
     def __init__(self):
         super().__init__(
-            name="FactCheckMatcherAgent",
-            instruction=MATCHER_PROMPT + "\n\nUtiliza la herramienta factchecker_tool para buscar claims relevantes en tiempo real.",
+            name=STAGE_NAME,
+            instruction=MATCHER_PROMPT + "\n\nUtiliza primero la herramienta local_factcheck_search_tool. Solo si no devuelve coincidencias, usa factchecker_search_tool para buscar claims relevantes en tiempo real. Si la herramienta devuelve 'failures', inclúyelos tal cual junto a 'matches' en tu respuesta.",
             description="Busca la afirmación en la base local de fact-checks y en tiempo real en los principales fact-checkers.",
             output_key="match_results",
-            tools=[factchecker_tool],
-            model="gemini-2.5-flash"
+            tools=[local_factcheck_tool, factchecker_tool],
+            model="gemini-2.5-flash",
+            before_model_callback=LLM_CACHE.before_model,
+            after_model_callback=[payload_budget_callback("MatchResults"), LLM_CACHE.after_model],
         )
 
     async def run_async(self, ctx):
         # This agent's only job is to invoke the LLM with the provided
         # claim from the previous agent. The LLM will then use the
-        # factchecker_tool to get live results. We don't need any
-        # special logic here.
+        # factchecker_tool to get live results.
+        if not has_budget(LLM_MIN_BUDGET_S):
+            # Sin plazo para el modelo: solo la base local, sin LLM ni scraping en vivo.
+            degrade(self.name)
+            matches = await search_local_factchecks(load_claim_text(ctx.session.state))
+            results = validate_message("MatchResults", {"matches": matches}).to_dict()
+            final_part = Part(text=json.dumps(results))
+            yield Event(
+                content=Content(parts=[final_part]),
+                author=self.name,
+                actions=EventActions(state_delta={self.output_key: results}),
+            )
+            return
         async for event in super().run_async(ctx):
             yield event
@@ -0,0 +1,350 @@
+"""
+Índice local de fact-checks pre-embebidos.
+
+Layout en disco (un directorio por índice):
+    manifest.json          -> count, dim, embedder, nlist
+    embeddings.npy         -> matriz float32 (count, dim) normalizada, se abre con mmap
+    metadata.jsonl         -> una línea JSON por fila (claim, source, ...)
+    metadata_offsets.npy   -> offsets en bytes de cada línea de metadata.jsonl
+    ivf_centroids.npy      -> (opcional) centroides IVF (nlist, dim)
+    ivf_order.npy          -> (opcional) filas ordenadas por lista IVF
+    ivf_offsets.npy        -> (opcional) inicio de cada lista dentro de ivf_order
+    row_keys.npy           -> hash (uint64) del texto embebido de cada fila; permite reutilizar embeddings
+
+``INDEX_DIR`` puede contener el índice directamente o, si lo genera la
+ingesta, snapshots en ``snapshots/<nombre>/`` más un fichero ``CURRENT`` con
+el nombre del snapshot servido. ``CURRENT`` se reemplaza de forma atómica y
+``get_index`` abre el snapshot nuevo en la siguiente búsqueda.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from adk_project.workers import run_in_parse_pool
+
+EMBEDDING_DIM = 512
+EMBEDDER_NAME = "hashing-v1"
+
+INDEX_DIR = os.getenv(
+    "FACTOS_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "factcheck_index"),
+)
+INDEX_MIN_SCORE = float(os.getenv("FACTOS_INDEX_MIN_SCORE", "0.5"))
+INDEX_TOP_K = int(os.getenv("FACTOS_INDEX_TOP_K", "3"))
+INDEX_NPROBE = int(os.getenv("FACTOS_INDEX_NPROBE", "8"))
+# Cada cuánto (s) se comprueba si CURRENT apunta a un snapshot nuevo.
+INDEX_RELOAD_INTERVAL = float(os.getenv("FACTOS_INDEX_RELOAD_INTERVAL", "5"))
+CURRENT_FILE = "CURRENT"
+SNAPSHOTS_DIR = "snapshots"
+
+# Filas procesadas por bloque en la búsqueda exacta; acota la memoria temporal.
+SEARCH_CHUNK_ROWS = 65536
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(text)
+
+
+def embed_texts(texts: List[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Embeds texts with signed feature hashing over unigrams and bigrams.
+
+    CPU-only and deterministic, so the index can be built offline and queried
+    without a model round-trip. Rows are L2-normalized.
+    """
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        toks = _tokens(text)
+        feats = toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+        for feat in feats:
+            h = zlib.crc32(feat.encode("utf-8"))
+            out[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    return _normalize(out)
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int):
+    if scores.shape[0] <= k:
+        order = np.argsort(-scores)
+    else:
+        part = np.argpartition(-scores, k)[:k]
+        order = part[np.argsort(-scores[part])]
+    return scores[order], ids[order]
+
+
+def _spherical_kmeans(data: np.ndarray, nlist: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(data), nlist * 256)
+    sample = np.asarray(data[rng.choice(len(data), size=sample_size, replace=False)])
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def row_key(text: str) -> int:
+    """Stable 64-bit key of an embedded text (and the embedder that produced it)."""
+    digest = hashlib.sha256(f"{EMBEDDER_NAME}\0{text}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def build_index(
+    records: Iterable[Dict],
+    out_dir: str,
+    nlist: int = 0,
+    embedder: Callable[[List[str]], np.ndarray] = embed_texts,
+    batch_size: int = 4096,
+    previous: Optional["FactCheckIndex"] = None,
+    embedder_name: str = EMBEDDER_NAME,
+) -> int:
+    """Builds an on-disk index from records with at least ``claim`` and ``source``.
+
+    When ``nlist`` > 0 an IVF partition is stored too, enabling approximate
+    search over large corpora. Rows whose claim is already embedded in
+    ``previous`` are copied from it instead of re-embedded; ``embedder_name``
+    is recorded in the manifest so queries use the same embedder. Returns
+    the number of indexed rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    records = list(records)
+    count = len(records)
+
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    with open(os.path.join(out_dir, "metadata.jsonl"), "wb") as f:
+        for i, record in enumerate(records):
+            f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            offsets[i + 1] = f.tell()
+    np.save(os.path.join(out_dir, "metadata_offsets.npy"), offsets)
+
+    keys = np.fromiter((row_key(r["claim"]) for r in records), dtype=np.uint64, count=count)
+    np.save(os.path.join(out_dir, "row_keys.npy"), keys)
+
+    dim = embedder(["probe"]).shape[1]
+    emb = np.lib.format.open_memmap(
+        os.path.join(out_dir, "embeddings.npy"), mode="w+", dtype=np.float32, shape=(count, dim)
+    )
+    reusable = previous is not None and previous.manifest["dim"] == dim and previous.manifest.get("embedder") == embedder_name
+    reused = previous.rows_for_keys(keys) if reusable else np.full(count, -1)
+    copy = np.flatnonzero(reused >= 0)
+    for start in range(0, len(copy), batch_size):
+        rows = copy[start:start + batch_size]
+        emb[rows] = previous.embeddings[reused[rows]]
+    fresh = np.flatnonzero(reused < 0)
+    for start in range(0, len(fresh), batch_size):
+        rows = fresh[start:start + batch_size]
+        emb[rows] = embedder([records[i]["claim"] for i in rows])
+    emb.flush()
+
+    nlist = min(nlist, count)
+    if nlist > 0:
+        centroids = _spherical_kmeans(emb, nlist)
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            assign[start:start + SEARCH_CHUNK_ROWS] = np.argmax(
+                emb[start:start + SEARCH_CHUNK_ROWS] @ centroids.T, axis=1
+            )
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        ivf_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        ivf_offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        np.save(os.path.join(out_dir, "ivf_centroids.npy"), centroids)
+        np.save(os.path.join(out_dir, "ivf_order.npy"), order)
+        np.save(os.path.join(out_dir, "ivf_offsets.npy"), ivf_offsets)
+    del emb
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"count": count, "dim": int(dim), "embedder": embedder_name, "nlist": nlist, "embedded": int(len(fresh))}, f)
+    return count
+
+
+class FactCheckIndex:
+    """Memory-mapped cosine-similarity index over pre-embedded fact-checks.
+
+    Safe to search from several threads: metadata rows are read with
+    ``os.pread``, which does not share a file position.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embedder: Callable[[List[str]], np.ndarray] = embed_texts,
+        embedder_name: str = EMBEDDER_NAME,
+    ):
+        self.path = path
+        self.embedder = embedder
+        self.embedder_name = embedder_name
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "metadata_offsets.npy"), mmap_mode="r")
+        self._metadata_file = open(os.path.join(path, "metadata.jsonl"), "rb")
+        self.centroids = None
+        if self.manifest.get("nlist"):
+            self.centroids = np.load(os.path.join(path, "ivf_centroids.npy"))
+            self.ivf_order = np.load(os.path.join(path, "ivf_order.npy"), mmap_mode="r")
+            self.ivf_offsets = np.load(os.path.join(path, "ivf_offsets.npy"))
+
+    def __len__(self) -> int:
+        return int(self.manifest["count"])
+
+    @property
+    def compatible(self) -> bool:
+        """Whether the stored vectors were produced by this index's query embedder."""
+        return self.manifest.get("embedder") == self.embedder_name
+
+    def rows_for_keys(self, keys: np.ndarray) -> np.ndarray:
+        """Maps each row key to a row of this index holding the same text, or -1."""
+        path = os.path.join(self.path, "row_keys.npy")
+        if self.manifest.get("embedder") != EMBEDDER_NAME or not os.path.exists(path):
+            return np.full(len(keys), -1, dtype=np.int64)
+        own = np.load(path)
+        if not len(own):
+            return np.full(len(keys), -1, dtype=np.int64)
+        order = np.argsort(own, kind="stable")
+        pos = np.searchsorted(own[order], keys).clip(max=len(own) - 1)
+        return np.where(own[order][pos] == keys, order[pos], -1).astype(np.int64)
+
+    def close(self) -> None:
+        self._metadata_file.close()
+
+    def metadata(self, row: int) -> Dict:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(os.pread(self._metadata_file.fileno(), end - start, start))
+
+    def _exact(self, query: np.ndarray, k: int):
+        best_scores = np.empty(0, dtype=np.float32)
+        best_ids = np.empty(0, dtype=np.int64)
+        for start in range(0, len(self), SEARCH_CHUNK_ROWS):
+            block = self.embeddings[start:start + SEARCH_CHUNK_ROWS]
+            scores = np.concatenate([best_scores, block @ query])
+            ids = np.concatenate([best_ids, np.arange(start, start + len(block))])
+            best_scores, best_ids = _top_k(scores, ids, k)
+        return best_scores, best_ids
+
+    def _approximate(self, query: np.ndarray, k: int, nprobe: int):
+        probes = np.argsort(-(self.centroids @ query))[:nprobe]
+        rows = np.concatenate(
+            [self.ivf_order[self.ivf_offsets[p]:self.ivf_offsets[p + 1]] for p in probes]
+        )
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float32), rows
+        rows.sort()  # lectura secuencial del mmap
+        return _top_k(self.embeddings[rows] @ query, rows, k)
+
+    def search(
+        self,
+        queries: List[str],
+        k: int = INDEX_TOP_K,
+        min_score: float = 0.0,
+        nprobe: Optional[int] = INDEX_NPROBE,
+    ) -> List[List[Dict]]:
+        """Returns the top-k matches per query as ``{claim, source, confidence, ...}``.
+
+        Uses the IVF partition when present and ``nprobe`` is set; pass
+        ``nprobe=None`` to force exact search. Raises ``ValueError`` if the
+        index was built with a different embedder.
+        """
+        if not self.compatible:
+            raise ValueError(
+                f"index at {self.path} was built with {self.manifest.get('embedder')!r}, not {self.embedder_name!r}"
+            )
+        if not len(self):
+            return [[] for _ in queries]
+        vectors = self.embedder(queries).astype(np.float32)
+        results = []
+        for query in vectors:
+            if self.centroids is not None and nprobe:
+                scores, ids = self._approximate(query, k, nprobe)
+            else:
+                scores, ids = self._exact(query, k)
+            matches = []
+            for score, row in zip(scores, ids):
+                if score < min_score:
+                    continue
+                match = self.metadata(int(row))
+                match["confidence"] = round(float(score), 4)
+                matches.append(match)
+            results.append(matches)
+        return results
+
+
+def current_index_path(root: str = None) -> Optional[str]:
+    """Directory of the served index under ``root``: the ``CURRENT`` snapshot, else a flat index, else None."""
+    root = root or INDEX_DIR
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return os.path.join(root, SNAPSHOTS_DIR, f.read().strip())
+    except FileNotFoundError:
+        pass
+    return root if os.path.exists(os.path.join(root, "manifest.json")) else None
+
+
+def publish_snapshot(root: str, name: str) -> None:
+    """Atomically points ``CURRENT`` at ``snapshots/<name>`` (which must be fully written)."""
+    tmp = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+_INDEX: Optional[FactCheckIndex] = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[FactCheckIndex]:
+    """Opens the served index at ``INDEX_DIR``, switching to a newly published snapshot when ``CURRENT`` moves.
+
+    Returns None if no index was ever built. The previous snapshot stays
+    memory-mapped until nothing references it. Does file I/O; call it off
+    the event loop.
+    """
+    global _INDEX, _checked_at
+    with _index_lock:
+        now = time.monotonic()
+        if _INDEX is not None and now - _checked_at < INDEX_RELOAD_INTERVAL:
+            return _INDEX
+        _checked_at = now
+        path = current_index_path()
+        if path is None:
+            return _INDEX
+        if _INDEX is None or os.path.realpath(_INDEX.path) != os.path.realpath(path):
+            _INDEX = FactCheckIndex(path)
+        return _INDEX
+
+
+def _search_local(main_claim: str) -> List[Dict]:
+    index = get_index()
+    if index is None:
+        return []
+    if not index.compatible:
+        print(f"--- Local fact-check index skipped: built with {index.manifest.get('embedder')!r}, queries use {index.embedder_name!r} ---")
+        return []
+    return index.search([main_claim], min_score=INDEX_MIN_SCORE)[0]
+
+
+async def search_local_factchecks(main_claim: str) -> List[Dict]:
+    """Searches the local pre-embedded fact-check base in the parse pool; [] if unavailable."""
+    return await run_in_parse_pool(_search_local, main_claim)
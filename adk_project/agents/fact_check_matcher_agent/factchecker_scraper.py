@@ -1,102 +1,176 @@
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
 from typing import List, Dict
-import hashlib
-import time
+import os
 from urllib.parse import quote_plus
+from adk_project.agents.fact_check_matcher_agent import sources
+from adk_project.agents.fact_check_matcher_agent.sources import FactCheckSource
+from adk_project.cache import AsyncCache, make_backend
+from adk_project.agents.fact_check_matcher_agent.ingest import extract_claim_reviews
+from adk_project.cache.fingerprint import MinHashIndex, claim_key, claim_shingles, claim_tokens
+from adk_project.deadline import DEADLINE_RESERVE_S, remaining
+from adk_project.http_policy import FetchError, policy_get
+from adk_project.telemetry import register_cache
+from adk_project.workers import run_in_parse_pool
 
-# We will only use fact-checkers that have a searchable interface.
-FACTCHECKERS = {
-    "factcheck.org": "https://www.factcheck.org/?s={query}",
-    "apnews.com": "https://apnews.com/search?q={query}"
-}
+# Máximo de búsquedas simultáneas, sumando todas las fuentes y claims.
+SOURCE_CONCURRENCY = int(os.getenv("FACTOS_SOURCE_CONCURRENCY", "8"))
+# Con FIRST_K > 0 se responde en cuanto hay K coincidencias con confianza >= FIRST_K_MIN_CONFIDENCE
+# y se cancelan las búsquedas pendientes; con 0 se espera a todas las fuentes.
+FIRST_K = int(os.getenv("FACTOS_FIRST_K", "0"))
+FIRST_K_MIN_CONFIDENCE = float(os.getenv("FACTOS_FIRST_K_MIN_CONFIDENCE", "0.8"))
+
+_source_semaphore = asyncio.Semaphore(SOURCE_CONCURRENCY)
 
-CACHE: Dict[str, Dict] = {}
 CACHE_TTL = 3600  # 1 hora
+# Tras caducar, el resultado se sigue sirviendo mientras se refresca en segundo plano.
+CACHE_STALE_TTL = int(os.getenv("FACTOS_CACHE_STALE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.getenv("FACTOS_CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("FACTOS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 
-async def fetch_url(session, url):
-    # Using a realistic user-agent to avoid being blocked.
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-    try:
-        async with session.get(url, timeout=10, headers=headers) as resp:
-            if resp.status == 200:
-                return await resp.text()
-            return None
-    except Exception:
-        return None
+CACHE = AsyncCache(
+    make_backend("factcheck", max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES),
+    ttl=CACHE_TTL,
+    stale_ttl=CACHE_STALE_TTL,
+    name="factcheck",
+)
+# Claims reworded by the extractor reuse the cached results of a near-duplicate.
+NEAR_DUPLICATES = MinHashIndex(max_entries=CACHE_MAX_ENTRIES)
+register_cache("factcheck", CACHE.stats)
 
-async def parse_factcheck_org(html: str) -> List[Dict]:
+
+class FactCheckUnavailable(Exception):
+    """Some fact-checkers failed; carries the partial ``matches`` and per-site ``failures``.
+
+    Raised (rather than returned) so incomplete results never enter the cache.
+    """
+
+    def __init__(self, matches: List[Dict], failures: List[Dict]):
+        super().__init__(", ".join(f"{f['site']}: {f['reason']}" for f in failures))
+        self.matches = matches
+        self.failures = failures
+
+
+async def fetch_url(url) -> str:
+    """Returns the page body; raises ``FetchError`` (rate limit, breaker, timeout, HTTP...) on failure."""
+    # The per-domain policy goes through the shared, pooled transport.
+    resp = await policy_get(url)
+    return resp.text
+
+def parse_factcheck_org_html(html: str) -> List[Dict]:
     """Parses the search results from factcheck.org."""
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "html.parser")
-    articles = soup.find_all('article', limit=3)
-    results = []
-    for article in articles:
-        title_element = article.find('h3')
-        link_element = title_element.find('a') if title_element else None
-        if title_element and link_element:
-            results.append({
-                "claim": title_element.text.strip(),
-                "source": link_element['href'],
-                "confidence": 0.9  # Confidence is hard to gauge, so we use a default
-            })
-    return results
+    return sources.SOURCES["factcheck.org"].parse(html)
 
-async def parse_apnews(html: str) -> List[Dict]:
+def parse_apnews_html(html: str) -> List[Dict]:
     """Parses the search results from apnews.com."""
+    return sources.SOURCES["apnews.com"].parse(html)
+
+async def parse_source(source: FactCheckSource, html: str, query: str = "") -> List[Dict]:
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
-    cards = soup.find_all('div', class_='Card', limit=3)
-    results = []
-    for card in cards:
-        title_element = card.find('h3')
-        link_element = card.find('a', class_='Link')
-        if title_element and link_element and 'fact-check' in link_element['href']:
-             # Construct absolute URL if it's relative
-            url = link_element['href']
-            if not url.startswith('http'):
-                url = f"https://apnews.com{url}"
-            results.append({
-                "claim": title_element.text.strip(),
-                "source": url,
-                "confidence": 0.9
-            })
-    return results
-
-async def search_and_parse(session, site: str, search_url: str, query: str) -> List[Dict]:
-    """Fetches and parses results for a single fact-checker."""
-    url = search_url.format(query=quote_plus(query))
-    html = await fetch_url(session, url)
-    if site == "factcheck.org":
-        return await parse_factcheck_org(html)
-    elif site == "apnews.com":
-        return await parse_apnews(html)
-    return []
+    return await run_in_parse_pool(source.parse, html, query)
+
+async def parse_factcheck_org(html: str) -> List[Dict]:
+    return await parse_source(sources.SOURCES["factcheck.org"], html)
+
+async def parse_apnews(html: str) -> List[Dict]:
+    return await parse_source(sources.SOURCES["apnews.com"], html)
+
+def _best_rating(reviews: List[Dict], query: str) -> str:
+    """Rating of the ClaimReview whose claim is closest to ``query``; "" if the page has none."""
+    rated = [r for r in reviews if r.get("rating")]
+    if not rated:
+        return ""
+    tokens = claim_tokens(query)
+    return max(rated, key=lambda r: len(tokens & claim_tokens(r["claim"])))["rating"]
+
+
+async def fetch_rating(url: str, query: str) -> str:
+    """Reads the verdict from the ClaimReview JSON-LD of a fact-check page; "" if unavailable."""
+    try:
+        async with _source_semaphore:
+            html = await fetch_url(url)
+        reviews = await run_in_parse_pool(extract_claim_reviews, html, url)
+    except (FetchError, ValueError):
+        return ""
+    return _best_rating(reviews, query)
+
+
+async def search_and_parse(source: FactCheckSource, query: str) -> List[Dict]:
+    """Fetches and parses results for a single fact-checker, with the rating of each result when available."""
+    url = source.search_url.format(query=quote_plus(query))
+    async with _source_semaphore:
+        html = await fetch_url(url)
+    try:
+        matches = await parse_source(source, html, query)
+    except Exception as exc:
+        raise FetchError("parse_error", type(exc).__name__) from exc
+    if source.rating_from_page:
+        # El motor de reglas solo puntúa ratings estructurados, nunca titulares.
+        unrated = [m for m in matches if not m.get("rating")]
+        ratings = await asyncio.gather(*(fetch_rating(m["source"], query) for m in unrated))
+        for match, rating in zip(unrated, ratings):
+            if rating:
+                match["rating"] = rating
+    return matches
 
 
 def cache_key(query: str) -> str:
-    return hashlib.sha256(query.encode()).hexdigest()
+    return claim_key(query)
 
-async def get_factchecker_claims(main_claim: str) -> List[Dict]:
-    key = cache_key(main_claim)
-    now = time.time()
-    if key in CACHE and now - CACHE[key]["ts"] < CACHE_TTL:
-        print("--- Returning cached fact-check results ---")
-        return CACHE[key]["data"]
+def _enough_matches(matches: List[Dict], k: int) -> bool:
+    return k > 0 and sum(m["confidence"] >= FIRST_K_MIN_CONFIDENCE for m in matches) >= k
 
+async def live_factcheck(main_claim: str, first_k: int = None) -> List[Dict]:
+    """Searches every enabled source; with ``first_k`` (default ``FIRST_K``) returns early once enough good matches arrive.
+
+    Under a deadline, sources still pending when only ``DEADLINE_RESERVE_S`` is left are reported as failures.
+    """
     print(f"--- Performing live fact-check for: '{main_claim}' ---")
-    async with aiohttp.ClientSession() as session:
-        tasks = [search_and_parse(session, site, url, main_claim) for site, url in FACTCHECKERS.items()]
-        results_list = await asyncio.gather(*tasks)
-        
-        # Flatten the list of lists into a single list
-        all_claims = [claim for sublist in results_list for claim in sublist]
-        
-        CACHE[key] = {"data": all_claims, "ts": now}
-        return all_claims
+    first_k = FIRST_K if first_k is None else first_k
+    tasks = {asyncio.ensure_future(search_and_parse(source, main_claim)): source.name for source in sources.enabled_sources()}
+    pending = set(tasks)
+    matches, failures = [], []
+    try:
+        while pending and not _enough_matches(matches, first_k):
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining(DEADLINE_RESERVE_S), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # Plazo agotado: las fuentes que faltan cuentan como no disponibles.
+                failures.extend({"site": tasks[task], **FetchError("deadline").as_dict()} for task in pending)
+                break
+            for task in done:
+                if isinstance(task.exception(), FetchError):
+                    failures.append({"site": tasks[task], **task.exception().as_dict()})
+                elif task.exception() is not None:
+                    raise task.exception()
+                else:
+                    matches.extend(task.result())
+    finally:
+        # Las fuentes más lentas se cancelan en cuanto hay suficientes coincidencias.
+        for task in pending:
+            task.cancel()
+    matches.sort(key=lambda m: m["confidence"], reverse=True)
+    if failures:
+        raise FactCheckUnavailable(matches, failures)
+    return matches
+
+async def get_factchecker_claims(main_claim: str) -> Dict:
+    """Returns ``{"matches": [...], "failures": [...]}``; failures name the site and reason."""
+    key = cache_key(main_claim)
+    shingles = claim_shingles(main_claim)
+    if await CACHE.get(key) is None:
+        near = NEAR_DUPLICATES.query(shingles)
+        if near is not None:
+            key = near[0]
+    # Concurrent misses for the same claim share a single live fetch.
+    try:
+        matches = await CACHE.get_or_fetch(key, lambda: live_factcheck(main_claim))
+    except FactCheckUnavailable as exc:
+        return {"matches": exc.matches, "failures": exc.failures}
+    # Solo se indexan claves que ya tienen resultados en caché.
+    NEAR_DUPLICATES.add(key, shingles)
+    return {"matches": matches, "failures": []}
 
 # Ejemplo de uso:
 # claims = asyncio.run(get_factchecker_claims("Coffee prevents cancer"))
@@ -0,0 +1,282 @@
+"""
+Ingesta incremental de fact-checks ClaimReview para el índice local.
+
+Recorre los sitemaps de los fact-checkers, extrae el JSON-LD ClaimReview de
+cada página, deduplica por URL canónica y texto normalizado del claim, y
+construye un snapshot nuevo del índice. Solo se descargan las páginas cuyo
+``lastmod`` cambió desde el último checkpoint y solo se re-embeben los claims
+nuevos o modificados. El snapshot se publica de forma atómica (``CURRENT``),
+así que los workers de la API lo recogen sin reiniciar.
+
+Uso:
+    python -m adk_project.agents.fact_check_matcher_agent.ingest [--sitemap URL ...] [--index-dir DIR] [--full]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from adk_project.agents.fact_check_matcher_agent.factcheck_index import (
+    INDEX_RELOAD_INTERVAL,
+    INDEX_DIR,
+    SNAPSHOTS_DIR,
+    FactCheckIndex,
+    build_index,
+    current_index_path,
+    publish_snapshot,
+)
+from adk_project.agents.fact_check_matcher_agent.sources import enabled_sources
+from adk_project.api.result_cache import canonicalize_url
+from adk_project.cache.fingerprint import claim_key
+from adk_project.http_client import close_transport
+from adk_project.http_policy import FetchError, policy_get
+from adk_project.workers import HTML_PARSER, run_in_parse_pool
+
+STATE_FILE = "ingest_state.json"
+INGEST_CONCURRENCY = int(os.getenv("FACTOS_INGEST_CONCURRENCY", "8"))
+KEEP_SNAPSHOTS = int(os.getenv("FACTOS_INGEST_KEEP_SNAPSHOTS", "3"))
+# Un snapshot reemplazado se conserva este tiempo: los workers de la API solo
+# miran CURRENT cada FACTOS_INDEX_RELOAD_INTERVAL y pueden seguir sirviéndolo.
+PRUNE_GRACE_S = float(os.getenv("FACTOS_INGEST_PRUNE_GRACE_S", str(max(60.0, 2 * INDEX_RELOAD_INTERVAL))))
+
+
+def parse_sitemap(xml: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Returns ``(pages, child_sitemaps)`` as ``(loc, lastmod)`` pairs from a urlset or sitemapindex."""
+    root = ET.fromstring(xml.encode("utf-8"))
+    entries = []
+    for node in root:
+        fields = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in node}
+        if fields.get("loc"):
+            entries.append((fields["loc"], fields.get("lastmod", "")))
+    if root.tag.rsplit("}", 1)[-1] == "sitemapindex":
+        return [], entries
+    return entries, []
+
+
+def _claim_reviews(data) -> Iterable[Dict]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _claim_reviews(item)
+    elif isinstance(data, dict):
+        if "@graph" in data:
+            yield from _claim_reviews(data["@graph"])
+        types = data.get("@type")
+        if "ClaimReview" in (types if isinstance(types, list) else [types]):
+            yield data
+
+
+def _name(value) -> str:
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_name(v) for v in value)))
+    if isinstance(value, dict):
+        return value.get("name", "")
+    return value or ""
+
+
+def extract_claim_reviews(html: str, page_url: str) -> List[Dict]:
+    """Extracts ClaimReview records (claim, source, rating, publisher, date, page) from a page's JSON-LD."""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("script", type="application/ld+json"))
+    page = canonicalize_url(page_url)
+    records = []
+    for script in soup.find_all("script"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for review in _claim_reviews(data):
+            claim = (review.get("claimReviewed") or "").strip()
+            if not claim:
+                continue
+            rating = review.get("reviewRating") if isinstance(review.get("reviewRating"), dict) else {}
+            records.append({
+                "claim": claim,
+                "source": canonicalize_url(review.get("url") or page_url),
+                "rating": rating.get("alternateName", ""),
+                "publisher": _name(review.get("author")),
+                "date": review.get("datePublished", ""),
+                "page": page,
+            })
+    return records
+
+
+def dedupe(records: Iterable[Dict]) -> List[Dict]:
+    """Keeps one record per (canonical source URL, normalized claim), preferring the most recent ``date``."""
+    best: Dict[Tuple[str, str], Dict] = {}
+    for record in records:
+        key = (canonicalize_url(record["source"]), claim_key(record["claim"]))
+        if key not in best or record.get("date", "") >= best[key].get("date", ""):
+            best[key] = record
+    return list(best.values())
+
+
+def load_state(root: str) -> Dict:
+    try:
+        with open(os.path.join(root, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"pages": {}, "sitemaps": {}}
+
+
+def save_state(root: str, state: Dict) -> None:
+    tmp = os.path.join(root, f".{STATE_FILE}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(root, STATE_FILE))
+
+
+def _load_records(index: Optional[FactCheckIndex]) -> List[Dict]:
+    if index is None:
+        return []
+    return [index.metadata(row) for row in range(len(index))]
+
+
+async def _fetch(url: str, semaphore: asyncio.Semaphore) -> Optional[str]:
+    async with semaphore:
+        try:
+            return (await policy_get(url)).text
+        except FetchError as exc:
+            print(f"--- Ingest skipped {url}: {exc} ---")
+            return None
+
+
+async def crawl(sitemaps: List[str], state: Dict, full: bool = False, concurrency: int = INGEST_CONCURRENCY,
+                max_pages: int = 0) -> Dict[str, List[Dict]]:
+    """Fetches pages changed since the checkpoint in ``state`` (updated in place); returns records per page.
+
+    Pages that fail to download keep their old checkpoint and are retried
+    on the next run.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = {url: "" for url in sitemaps}
+    pages, sitemap_marks, seen_sitemaps = [], {}, set()
+    while pending:
+        batch = {url: lastmod for url, lastmod in pending.items() if url not in seen_sitemaps}
+        seen_sitemaps.update(batch)
+        bodies = await asyncio.gather(*(_fetch(url, semaphore) for url in batch))
+        pending = {}
+        for (url, lastmod), body in zip(batch.items(), bodies):
+            if body is None:
+                continue
+            try:
+                page_entries, children = parse_sitemap(body)
+            except ET.ParseError as exc:
+                print(f"--- Ingest could not parse sitemap {url}: {exc} ---")
+                continue
+            if lastmod:
+                sitemap_marks[url] = lastmod
+            pages.extend(page_entries)
+            for loc, child_lastmod in children:
+                # Un sitemap hijo sin cambios no contiene páginas nuevas.
+                if full or not child_lastmod or state["sitemaps"].get(loc) != child_lastmod:
+                    pending[loc] = child_lastmod
+
+    changed = [(loc, lastmod) for loc, lastmod in pages
+               if full or canonicalize_url(loc) not in state["pages"]
+               or (lastmod and state["pages"][canonicalize_url(loc)] != lastmod)]
+    complete = not max_pages or len(changed) <= max_pages
+    changed = changed[:max_pages] if max_pages else changed
+
+    async def ingest_page(loc: str, lastmod: str):
+        html = await _fetch(loc, semaphore)
+        if html is None:
+            return None
+        return loc, lastmod, await run_in_parse_pool(extract_claim_reviews, html, loc)
+
+    updates = {}
+    for result in await asyncio.gather(*(ingest_page(loc, lastmod) for loc, lastmod in changed)):
+        if result is None:
+            complete = False
+            continue
+        loc, lastmod, records = result
+        updates[canonicalize_url(loc)] = records
+        state["pages"][canonicalize_url(loc)] = lastmod
+    # Un sitemap solo se da por visto si todas sus páginas cambiadas se descargaron.
+    if complete:
+        state["sitemaps"].update(sitemap_marks)
+    return updates
+
+
+def _prune_snapshots(root: str, keep: int, current: str, grace: float = PRUNE_GRACE_S) -> None:
+    """Deletes snapshots beyond the newest ``keep`` once their successor has been published for ``grace`` seconds."""
+    snapshots_dir = os.path.join(root, SNAPSHOTS_DIR)
+    names = sorted(os.listdir(snapshots_dir))
+    superseded_before = time.time() - grace
+    for name, successor in zip(names[:-keep] if keep else [], names[1:]):
+        if name == current:
+            continue
+        try:
+            if os.path.getmtime(os.path.join(snapshots_dir, successor)) > superseded_before:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(os.path.join(snapshots_dir, name), ignore_errors=True)
+
+
+async def ingest(sitemaps: List[str], root: str = INDEX_DIR, full: bool = False, nlist: int = 0,
+                 concurrency: int = INGEST_CONCURRENCY, max_pages: int = 0, keep: int = KEEP_SNAPSHOTS) -> Dict:
+    """Runs one ingestion pass and publishes a new snapshot if anything changed; returns a summary."""
+    os.makedirs(os.path.join(root, SNAPSHOTS_DIR), exist_ok=True)
+    state = {"pages": {}, "sitemaps": {}} if full else load_state(root)
+    current = current_index_path(root)
+    previous = FactCheckIndex(current) if current else None
+
+    updates = await crawl(sitemaps, state, full=full, concurrency=concurrency, max_pages=max_pages)
+    summary = {"pages_fetched": len(updates), "snapshot": state.get("snapshot"), "records": len(previous or [])}
+    if not updates and not full:
+        if previous is not None:
+            previous.close()
+        save_state(root, state)
+        return {**summary, "embedded": 0}
+
+    # Las páginas descargadas reemplazan todos sus registros anteriores.
+    kept = [] if full else [r for r in _load_records(previous) if r.get("page") not in updates]
+    records = dedupe(kept + [r for page_records in updates.values() for r in page_records])
+
+    now = time.time()
+    name = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{now % 1:.3f}"[1:]
+    build_index(records, os.path.join(root, SNAPSHOTS_DIR, name), nlist=nlist, previous=previous)
+    if previous is not None:
+        previous.close()
+    publish_snapshot(root, name)
+    # El checkpoint solo avanza cuando el snapshot ya es visible.
+    state["snapshot"] = name
+    save_state(root, state)
+    _prune_snapshots(root, keep, name)
+    with open(os.path.join(root, SNAPSHOTS_DIR, name, "manifest.json")) as f:
+        embedded = json.load(f)["embedded"]
+    return {**summary, "snapshot": name, "records": len(records), "embedded": embedded}
+
+
+async def _run(sitemaps: List[str], args) -> Dict:
+    try:
+        return await ingest(sitemaps, args.index_dir, full=args.full, nlist=args.nlist,
+                            concurrency=args.concurrency, max_pages=args.max_pages)
+    finally:
+        await close_transport()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sitemap", action="append", default=None,
+                        help="sitemap or sitemap index URL (repeatable); defaults to the registered sources' sitemaps")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and rebuild from scratch")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists for approximate search (0 = exact)")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY)
+    parser.add_argument("--max-pages", type=int, default=0, help="cap on pages fetched this run (0 = no cap)")
+    args = parser.parse_args(argv)
+
+    sitemaps = args.sitemap or [s.sitemap for s in enabled_sources() if s.sitemap]
+    if not sitemaps:
+        parser.error("no sitemaps: pass --sitemap or set 'sitemap' on a source in FACTOS_SOURCES_FILE")
+    print(json.dumps(asyncio.run(_run(sitemaps, args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Registro de fact-checkers consultables en tiempo real.
+
+Cada fuente se declara con datos, no con código: plantilla de búsqueda,
+selectores CSS de los resultados, peso de confianza de la fuente y, si hace
+falta, su política HTTP por dominio. Las fuentes por defecto están en
+``DEFAULT_SOURCES``; ``FACTOS_SOURCES_FILE`` apunta a un JSON (lista de
+objetos con los mismos campos) que añade o reemplaza fuentes por ``name``.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from adk_project.cache.fingerprint import claim_tokens
+from adk_project.http_policy import configure_domain
+from adk_project.workers import HTML_PARSER
+
+SOURCES_FILE = os.getenv("FACTOS_SOURCES_FILE", "")
+
+DEFAULT_SOURCES = [
+    {
+        "name": "factcheck.org",
+        "search_url": "https://www.factcheck.org/?s={query}",
+        "container": "article",
+        "item": "article",
+        "title": "h3",
+        "link": "h3 a",
+    },
+    {
+        "name": "apnews.com",
+        "search_url": "https://apnews.com/search?q={query}",
+        "container": "div",
+        "container_class": "Card",
+        "item": "div.Card",
+        "title": "h3",
+        "link": "a.Link",
+        "link_contains": "fact-check",
+    },
+]
+
+
+@dataclass(frozen=True)
+class FactCheckSource:
+    """One searchable fact-checker.
+
+    A result's confidence is ``confidence * similarity * trust_weight``
+    minus ``rank_decay`` per position in the source's result list, where
+    ``similarity`` is the token overlap between the result title and the
+    searched claim (1.0 when parsing without a claim). The verdict comes
+    from the ``rating`` selector when the results page shows one; otherwise,
+    with ``rating_from_page``, it is read from the ClaimReview of each
+    result's own fact-check page.
+    """
+
+    name: str
+    search_url: str  # con el marcador {query}
+    item: str  # selector CSS de cada resultado
+    title: str  # selector CSS del título, dentro del resultado
+    link: str  # selector CSS del enlace, dentro del resultado
+    container: Optional[str] = None  # etiqueta para SoupStrainer: solo se materializan estos nodos
+    container_class: Optional[str] = None
+    link_contains: Optional[str] = None  # descarta enlaces que no contengan este texto
+    rating: Optional[str] = None  # selector CSS del rating, dentro del resultado
+    rating_from_page: bool = True  # sin rating en la búsqueda, se lee del ClaimReview de la página
+    max_results: int = 3
+    confidence: float = 0.9
+    trust_weight: float = 1.0
+    rank_decay: float = 0.0
+    enabled: bool = True
+    sitemap: Optional[str] = None  # sitemap con páginas ClaimReview, para la ingesta offline
+    policy: Dict = field(default_factory=dict)  # opciones de http_policy.configure_domain
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "FactCheckSource":
+        known = {f.name for f in fields(cls)}
+        unknown = set(config) - known
+        if unknown:
+            raise ValueError(f"Unknown fact-checker source fields for {config.get('name')!r}: {sorted(unknown)}")
+        source = cls(**config)
+        if "{query}" not in source.search_url:
+            raise ValueError(f"search_url of {source.name!r} has no {{query}} placeholder")
+        return source
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.search_url).hostname or ""
+
+    def strainer(self) -> Optional[SoupStrainer]:
+        if not self.container:
+            return None
+        if not self.container_class:
+            return SoupStrainer(self.container)
+        # SoupStrainer sees the raw class attribute ("Card PagePromo"), not the split list.
+        return SoupStrainer(self.container, class_=re.compile(rf"(^|\s){re.escape(self.container_class)}(\s|$)"))
+
+    def parse(self, html: str, query: str = "") -> List[Dict]:
+        """Extracts up to ``max_results`` matches for ``query`` from a search results page."""
+        if not html:
+            return []
+        query_tokens = claim_tokens(query) if query else None
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=self.strainer())
+        results = []
+        for item in soup.select(self.item, limit=self.max_results):
+            title_element = item.select_one(self.title)
+            link_element = item.select_one(self.link)
+            if not (title_element and link_element and link_element.get("href")):
+                continue
+            if self.link_contains and self.link_contains not in link_element["href"]:
+                continue
+            url = urljoin(self.search_url, link_element["href"])
+            title = title_element.text.strip()
+            similarity = 1.0 if query_tokens is None else _dice(query_tokens, claim_tokens(title))
+            confidence = self.confidence * similarity * self.trust_weight - self.rank_decay * len(results)
+            match = {
+                "claim": title,
+                "source": url,
+                "confidence": round(min(1.0, max(0.0, confidence)), 3),
+            }
+            rating_element = item.select_one(self.rating) if self.rating else None
+            if rating_element is not None and rating_element.text.strip():
+                match["rating"] = rating_element.text.strip()
+            results.append(match)
+        return results
+
+
+def _dice(a, b) -> float:
+    """Dice coefficient of two token sets: 1.0 when identical, 0.0 when disjoint."""
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+def load_sources(configs: List[Dict]) -> Dict[str, FactCheckSource]:
+    """Builds the registry from source configs; later entries replace earlier ones with the same name."""
+    sources = {}
+    for config in configs:
+        source = FactCheckSource.from_config(config)
+        sources[source.name] = source
+        if source.policy:
+            configure_domain(source.host, **source.policy)
+    return sources
+
+
+def _configured_sources() -> List[Dict]:
+    configs = list(DEFAULT_SOURCES)
+    if SOURCES_FILE:
+        with open(SOURCES_FILE, encoding="utf-8") as f:
+            configs.extend(json.load(f))
+    return configs
+
+
+SOURCES: Dict[str, FactCheckSource] = load_sources(_configured_sources())
+
+
+def enabled_sources() -> List[FactCheckSource]:
+    return [source for source in SOURCES.values() if source.enabled]
@@ -0,0 +1,132 @@
+"""
+Caché direccionada por contenido de las llamadas a modelo de los LlmAgent.
+
+La clave es un hash del modelo, la instrucción de sistema, el esquema de
+herramientas, la configuración de generación y el contenido enviado. Se
+engancha con ``before_model_callback``/``after_model_callback``, de modo que
+un acierto evita la llamada a Gemini por completo.
+
+Modos (``FACTOS_LLM_CACHE_MODE``):
+    cache   lee y escribe con TTL (por defecto)
+    off     desactivada
+    record  siempre llama al modelo y graba la respuesta en disco
+    replay  solo sirve respuestas grabadas; un fallo lanza ``LlmCacheMiss``
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from adk_project.cache import AsyncCache, SQLiteCache, make_backend
+from adk_project.telemetry import register_cache
+
+LLM_CACHE_MODE = os.getenv("FACTOS_LLM_CACHE_MODE", "cache")
+LLM_CACHE_TTL = int(os.getenv("FACTOS_LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("FACTOS_LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("FACTOS_LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Grabaciones de record/replay (independiente de FACTOS_CACHE_BACKEND).
+LLM_CASSETTE_PATH = os.getenv(
+    "FACTOS_LLM_CASSETTE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_cassette.sqlite3")
+)
+# Agentes (coma-separados) que nunca usan la caché.
+LLM_CACHE_DISABLED_AGENTS = {
+    a.strip() for a in os.getenv("FACTOS_LLM_CACHE_DISABLED_AGENTS", "").split(",") if a.strip()
+}
+# Las grabaciones no caducan en la práctica.
+CASSETTE_TTL = 10 * 365 * 24 * 3600
+CACHE_KEY_STATE = "temp:llm_cache_key"
+# Campos de la configuración que no cambian la respuesta del modelo.
+VOLATILE_CONFIG_FIELDS = {"http_options", "labels"}
+
+
+class LlmCacheMiss(Exception):
+    """Replay mode found no recorded response for a model request."""
+
+
+def _strip_call_ids(value: Any) -> Any:
+    # ADK asigna ids aleatorios a function_call/function_response en cada ejecución.
+    if isinstance(value, dict):
+        return {k: _strip_call_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_strip_call_ids(v) for v in value]
+    return value
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Content hash of everything that determines the model's answer."""
+    config = (
+        llm_request.config.model_dump(mode="json", exclude_none=True, exclude=VOLATILE_CONFIG_FIELDS)
+        if llm_request.config
+        else {}
+    )
+    payload = {
+        "model": llm_request.model,
+        "config": config,
+        "contents": _strip_call_ids([c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents]),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LlmResponseCache:
+    """Model-call cache exposed as ADK before/after model callbacks."""
+
+    def __init__(self, cache: Optional[AsyncCache], mode: str = "cache", disabled_agents=()):
+        self.cache = cache
+        self.mode = mode if cache is not None else "off"
+        self.disabled_agents = set(disabled_agents)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _enabled(self, callback_context: CallbackContext) -> bool:
+        return self.mode != "off" and callback_context.agent_name not in self.disabled_agents
+
+    async def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        if not self._enabled(callback_context):
+            return None
+        key = request_key(llm_request)
+        callback_context.state[CACHE_KEY_STATE] = key
+        if self.mode == "record":
+            return None
+        entry = await self.cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            return LlmResponse.model_validate(entry.value)
+        self.misses += 1
+        if self.mode == "replay":
+            raise LlmCacheMiss(f"No recorded response for {callback_context.agent_name} (key {key[:12]})")
+        return None
+
+    async def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if not self._enabled(callback_context):
+            return None
+        key = callback_context.state.get(CACHE_KEY_STATE)
+        if not key or llm_response.partial or llm_response.error_code or not llm_response.content:
+            return None
+        value = _strip_call_ids(llm_response.model_dump(mode="json", exclude_none=True))
+        ttl = CASSETTE_TTL if self.mode == "record" else None
+        await self.cache.set(key, value, ttl)
+        self.stores += 1
+        callback_context.state[CACHE_KEY_STATE] = None
+        return None
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+
+def make_llm_cache(mode: str = LLM_CACHE_MODE) -> LlmResponseCache:
+    if mode == "off":
+        return LlmResponseCache(None)
+    if mode in ("record", "replay"):
+        backend = SQLiteCache(LLM_CASSETTE_PATH, namespace="llm", vacuum_interval=0)
+        return LlmResponseCache(AsyncCache(backend, ttl=CASSETTE_TTL, name="llm"), mode, LLM_CACHE_DISABLED_AGENTS)
+    backend = make_backend("llm", max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES)
+    return LlmResponseCache(AsyncCache(backend, ttl=LLM_CACHE_TTL, name="llm"), mode, LLM_CACHE_DISABLED_AGENTS)
+
+
+LLM_CACHE = make_llm_cache()
+register_cache("llm", LLM_CACHE.stats)
@@ -1,9 +1,13 @@
 from google.adk.agents import LlmAgent
 from adk_project.agents.response_formatter_agent.prompt import FORMATTER_PROMPT
 import asyncio
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Part, Content
 import json
+import time
+from adk_project.agents.utils import as_dict, load_match_failures, load_matches, load_state_json
+from adk_project.deadline import degraded_stages
+from adk_project.protocols.a2a_protocol import validate_message
 
 AGUI_RESPONSE_SCHEMA = {
     "headline": "str",
@@ -36,9 +40,9 @@ class ResponseFormatterAgent(LlmAgent):
     async def run_async(self, ctx):
         # Empaqueta explícitamente los resultados previos en 'agui_response'
         state = ctx.session.state
-        scored = state.get('scored_result', {})
-        article = state.get('validated_article', {})
-        matches = state.get('match_results', {}).get('matches', [])
+        scored = as_dict(load_state_json(state, 'scored_result', {}))
+        article = as_dict(load_state_json(state, 'validated_article', {}))
+        matches = load_matches(state)
         agui_response = {
             "headline": article.get("headline", ""),
             "url": article.get("url", ""),
@@ -49,14 +53,29 @@ class ResponseFormatterAgent(LlmAgent):
             "verified_sources": scored.get("verified_sources", []),
             "recommendation": scored.get("recommendation", ""),
             "media_literacy_tip": scored.get("media_literacy_tip", ""),
-            "processing_time": scored.get("processing_time", 0.0),
+            # Measured wall clock since the scraper started, not the LLM's estimate.
+            "processing_time": round(time.time() - state["pipeline_started_at"], 3) if "pipeline_started_at" in state else 0.0,
             "confidence_level": scored.get("confidence_level", 0),
             "sources_checked": len(matches),
             "original_source_label": "Medium Risk",  # Simulado
             "original_source_url": article.get("url", ""),
             "verified_sources_label": "High Trust"  # Simulado
         }
+        if article.get("error"):
+            agui_response["error"] = article["error"]
+        failures = load_match_failures(state)
+        if failures:
+            agui_response["unavailable_sources"] = failures
+        degraded = degraded_stages()
+        if degraded:
+            agui_response["degraded_stages"] = degraded
+        # Leniente: un campo mal formado en la salida del LLM puntuador vuelve a su valor por defecto.
+        agui_response = validate_message("AGUIResponse", agui_response, lenient=True).to_dict()
         # The agent's final output must be yielded as an Event object.
         # We wrap our dictionary in a Part and then in an Event.
         final_part = Part(text=json.dumps(agui_response))
-        yield Event(content=Content(parts=[final_part]), author=self.name)
+        yield Event(
+            content=Content(parts=[final_part]),
+            author=self.name,
+            actions=EventActions(state_delta={self.output_key: agui_response}),
+        )
@@ -0,0 +1,221 @@
+"""
+Extractor de artículos en streaming para SmartScraperAgent.
+
+Descarga el HTML por bloques con un límite duro de bytes, extrae metadatos de
+<head> y JSON-LD mientras llega, y corta la descarga en cuanto se cierra el
+contenedor principal del artículo. La limpieza de boilerplate se ejecuta en el
+pool de parsing, fuera del event loop.
+"""
+import codecs
+import json
+import os
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from adk_project.http_client import get_transport
+from adk_project.workers import HTML_PARSER, run_in_parse_pool
+
+SCRAPER_MAX_BYTES = int(os.getenv("FACTOS_SCRAPER_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPER_TIMEOUT = float(os.getenv("FACTOS_SCRAPER_TIMEOUT", "10"))
+# Solo se desactiva para entornos locales (p. ej. el servidor de replay de benchmarks).
+SCRAPER_REQUIRE_HTTPS = os.getenv("FACTOS_SCRAPER_REQUIRE_HTTPS", "1") != "0"
+# Dominios de noticias permitidos (coma-separados); "*" permite cualquiera.
+ALLOWED_DOMAINS = [
+    d.strip().lower()
+    for d in os.getenv(
+        "FACTOS_ALLOWED_DOMAINS",
+        "theguardian.com,bbc.com,bbc.co.uk,reuters.com,apnews.com,nytimes.com,washingtonpost.com,"
+        "cnn.com,npr.org,aljazeera.com,elpais.com,elmundo.es,lemonde.fr,dw.com,france24.com,"
+        "politico.com,bloomberg.com,ft.com,economist.com,usatoday.com,nbcnews.com,cbsnews.com,abcnews.go.com",
+    ).split(",")
+    if d.strip()
+]
+
+ARTICLE_TYPES = {"NewsArticle", "Article", "ReportageNewsArticle", "AnalysisNewsArticle", "BlogPosting"}
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "aside", "footer", "header", "form", "figure", "iframe", "svg", "button"]
+BOILERPLATE_ATTR = re.compile(r"share|social|related|promo|advert|\bads?\b|newsletter|comment|subscribe|cookie|caption|byline", re.IGNORECASE)
+MIN_PARAGRAPH_CHARS = 40
+
+
+class ArticleExtractionError(Exception):
+    """The URL is not allowed or the article could not be downloaded/extracted."""
+
+
+def validate_url(url: str) -> None:
+    parts = urlsplit(url)
+    if parts.scheme != "https" and (SCRAPER_REQUIRE_HTTPS or parts.scheme != "http"):
+        raise ArticleExtractionError(f"URL must use HTTPS: {url}")
+    host = (parts.hostname or "").lower()
+    if "*" not in ALLOWED_DOMAINS and not any(host == d or host.endswith("." + d) for d in ALLOWED_DOMAINS):
+        raise ArticleExtractionError(f"Domain not in the news whitelist: {host}")
+
+
+def _jsonld_articles(data) -> List[Dict]:
+    if isinstance(data, list):
+        return [a for item in data for a in _jsonld_articles(item)]
+    if not isinstance(data, dict):
+        return []
+    if "@graph" in data:
+        return _jsonld_articles(data["@graph"])
+    types = data.get("@type")
+    types = set(types) if isinstance(types, list) else {types}
+    return [data] if types & ARTICLE_TYPES else []
+
+
+def _author_name(author) -> str:
+    if isinstance(author, list):
+        return ", ".join(filter(None, (_author_name(a) for a in author)))
+    if isinstance(author, dict):
+        return author.get("name", "")
+    return author or ""
+
+
+class ArticleStreamParser(HTMLParser):
+    """Incremental parser that collects metadata and detects when the article closes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.jsonld: Dict = {}
+        self.title = ""
+        self.article_closed = False
+        # ETag/Last-Modified de la respuesta, para revalidar resultados cacheados sin otra descarga.
+        self.validators: Dict[str, str] = {}
+        self._in_title = False
+        self._jsonld_buffer: Optional[List[str]] = None
+        self._article_tag: Optional[str] = None
+        self._article_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key and attrs.get("content") and key not in self.meta:
+                self.meta[key] = attrs["content"]
+        elif tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._jsonld_buffer = []
+        if self._article_tag is None and not self.article_closed and (
+            tag == "article" or attrs.get("itemprop") == "articleBody"
+        ):
+            self._article_tag = tag
+            self._article_depth = 0
+        if tag == self._article_tag:
+            self._article_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "script" and self._jsonld_buffer is not None:
+            try:
+                articles = _jsonld_articles(json.loads("".join(self._jsonld_buffer)))
+            except ValueError:
+                articles = []
+            if articles and not self.jsonld:
+                self.jsonld = articles[0]
+            self._jsonld_buffer = None
+        if tag == self._article_tag:
+            self._article_depth -= 1
+            if self._article_depth == 0:
+                self.article_closed = True
+                self._article_tag = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._jsonld_buffer is not None:
+            self._jsonld_buffer.append(data)
+
+    def metadata(self) -> Dict[str, str]:
+        ld, meta = self.jsonld, self.meta
+        return {
+            "headline": ld.get("headline") or meta.get("og:title") or meta.get("twitter:title") or self.title.strip(),
+            "byline": _author_name(ld.get("author")) or meta.get("author") or meta.get("article:author", ""),
+            "publish_date": ld.get("datePublished") or meta.get("article:published_time") or meta.get("date") or meta.get("pubdate", ""),
+            "article_body": ld.get("articleBody", ""),
+        }
+
+
+def extract_main_text(html: str) -> str:
+    """Removes boilerplate and returns the main article paragraphs."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    container = soup.find("article") or soup.find(attrs={"itemprop": "articleBody"}) or soup.find("main") or soup.body or soup
+    for element in container.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+    for element in container.find_all(True):
+        if element.decomposed:
+            continue
+        marker = " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+        if BOILERPLATE_ATTR.search(marker):
+            element.decompose()
+    paragraphs = [p.get_text(" ", strip=True) for p in container.find_all("p")]
+    paragraphs = [p for p in paragraphs if len(p) >= MIN_PARAGRAPH_CHARS]
+    if not paragraphs:
+        return container.get_text(" ", strip=True)
+    return "\n\n".join(paragraphs)
+
+
+async def download_article_html(url: str, max_bytes: int = SCRAPER_MAX_BYTES):
+    """Streams the page until the article closes or ``max_bytes`` is reached.
+
+    Returns ``(html_prefix, parser, bytes_read)``.
+    """
+    parser = ArticleStreamParser()
+    parts: List[str] = []
+    bytes_read = 0
+    async with get_transport().stream(url, timeout=SCRAPER_TIMEOUT) as resp:
+        if resp.status != 200:
+            raise ArticleExtractionError(f"HTTP {resp.status} fetching {url}")
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        parser.validators = {k: headers[h] for k, h in (("etag", "etag"), ("last_modified", "last-modified")) if h in headers}
+        content_type = headers.get("content-type", "")
+        charset = re.search(r"charset=([\w-]+)", content_type)
+        try:
+            decoder = codecs.getincrementaldecoder(charset.group(1) if charset else "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for chunk in resp.chunks:
+            chunk = chunk[: max_bytes - bytes_read]
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            parser.feed(text)
+            if parser.article_closed or bytes_read >= max_bytes:
+                break
+    return "".join(parts), parser, bytes_read
+
+
+def article_text(html: str) -> str:
+    """Main text of a downloaded page, extracted as ``extract_article`` does (blocking; run it in the parse pool)."""
+    parser = ArticleStreamParser()
+    parser.feed(html)
+    return parser.metadata()["article_body"] or extract_main_text(html)
+
+
+async def extract_article(url: str, validate: bool = True) -> Dict[str, str]:
+    """Returns ``{url, headline, byline, publish_date, full_text}`` (plus ``etag``/``last_modified`` if sent) for a news URL."""
+    if validate:
+        validate_url(url)
+    try:
+        html, parser, _ = await download_article_html(url)
+    except ArticleExtractionError:
+        raise
+    except Exception as exc:
+        raise ArticleExtractionError(f"Could not download {url}: {type(exc).__name__}") from exc
+    meta = parser.metadata()
+    full_text = meta["article_body"] or await run_in_parse_pool(extract_main_text, html)
+    if not full_text:
+        raise ArticleExtractionError(f"No article content found at {url}")
+    return {
+        "url": url,
+        "headline": meta["headline"],
+        "byline": meta["byline"],
+        "publish_date": meta["publish_date"],
+        "full_text": full_text,
+        **parser.validators,
+    }
@@ -1,7 +1,13 @@
 from google.adk.agents import LlmAgent
 from adk_project.agents.smart_scraper_agent.prompt import SCRAPER_PROMPT
+from adk_project.agents.smart_scraper_agent.article_extractor import ArticleExtractionError, extract_article
+from adk_project.blobstore import BLOBS, preview
+from adk_project.messages import ValidatedArticle
+from adk_project.protocols.a2a_protocol import enforce_payload_budget, validate_message
+from adk_project.workers import run_in_parse_pool
 import json
-from google.adk.events import Event
+import time
+from google.adk.events import Event, EventActions
 from google.genai.types import Part, Content
 
 class SmartScraperAgent(LlmAgent):
@@ -9,34 +15,28 @@ class SmartScraperAgent(LlmAgent):
         super().__init__(
             name="SmartScraperAgent",
             instruction=SCRAPER_PROMPT,
-            description="Valida la URL y extrae contenido relevante usando Firecrawl.",
+            description="Valida la URL y extrae titular, autor, fecha y texto del artículo en streaming.",
             output_key="validated_article",
             model="gemini-2.5-flash"
         )
 
     async def run_async(self, ctx):
         url = ctx.session.state.get("input", "")
-        # Simulación específica para la URL de The Guardian
-        if url == "https://www.theguardian.com/world/2025/jun/11/uk-and-gibraltar-strike-deal-over-territorys-future-and-borders":
-            article = {
-                "url": url,
-                "headline": "UK and Gibraltar strike deal over territory's future and borders",
-                "byline": "Sam Jones in Madrid and agencies",
-                "publish_date": "2025-06-11",
-                "full_text": (
-                    "The UK and Gibraltar have reached a historic agreement with Spain over the future of the territory and its borders. "
-                    "The deal is expected to ease tensions and ensure free movement between Gibraltar and Spain, while maintaining British sovereignty. "
-                    "Officials from all sides hailed the agreement as a breakthrough after years of negotiations."
-                )
-            }
-        else:
-            # Simulación: siempre devuelve un artículo válido para pruebas
-            article = {
-                "url": "https://example-health-news.com",
-                "headline": "Study Shows Coffee Prevents Cancer in 90% of Cases",
-                "byline": "Health News Desk",
-                "publish_date": "2025-06-21",
-                "full_text": "Coffee consumption prevents 90% of all cancer cases according to new research. The study referenced only looked at a specific type of liver cancer in lab mice, not humans. It found a correlation between a compound in coffee and reduced tumor growth in mice, but did not demonstrate cancer prevention in humans at any percentage close to 90%."
-            }
+        started_at = time.time()
+        try:
+            article = await extract_article(url.strip())
+            # El cuerpo se guarda una vez en el almacén de blobs; estado y evento llevan solo la referencia.
+            full_text = article.pop("full_text")
+            article.update(text_ref=await BLOBS.put(full_text), preview=preview(full_text))
+            article = await run_in_parse_pool(enforce_payload_budget, "ValidatedArticle", article)
+            article = validate_message("ValidatedArticle", article).to_dict()
+        except ArticleExtractionError as exc:
+            # URL inválida o inaccesible: error claro y el resto del pipeline no llama al LLM.
+            article = ValidatedArticle(url=url, error=str(exc)).to_dict()
+            ctx.end_invocation = True
         final_part = Part(text=json.dumps(article))
-        yield Event(content=Content(parts=[final_part]), author=self.name)
+        yield Event(
+            content=Content(parts=[final_part]),
+            author=self.name,
+            actions=EventActions(state_delta={self.output_key: article, "pipeline_started_at": started_at}),
+        )
@@ -0,0 +1,101 @@
+"""
+Motor de puntuación determinista basado en reglas.
+
+Deduce el veredicto de cada coincidencia a partir de su rating estructurado
+(el ``alternateName`` de ClaimReview, que el índice local guarda y el scraping
+en vivo lee de la página de cada fact-check), lo pondera por la similitud de la
+coincidencia y mide el acuerdo entre fuentes. Los titulares no cuentan como
+veredicto: "confirma" o "es cierto que" en un desmentido dirían lo contrario.
+Si la confianza resultante supera el umbral, el TruthScorerAgent no necesita
+llamar al LLM.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+RULES_MIN_CONFIDENCE = int(os.getenv("FACTOS_RULES_MIN_CONFIDENCE", "70"))
+# Coincidencias con similitud menor no cuentan como evidencia.
+RULES_MIN_SIMILARITY = float(os.getenv("FACTOS_RULES_MIN_SIMILARITY", "0.6"))
+
+LABELS = {0: "True", 1: "Context Needed", 2: "Misleading", 3: "False"}
+
+# Ordered from most to least specific: the first pattern found decides the verdict.
+VERDICT_PATTERNS: List[Tuple[re.Pattern, int]] = [
+    (re.compile(p, re.IGNORECASE), score)
+    for p, score in [
+        (r"\bhalf[- ]true\b|\bmostly true\b|\bmissing context\b|\bneeds context\b|\bmixed\b|\bunproven\b|\bpartly\b|\bcontexto\b", 1),
+        (r"\bmisleading\b|\bexaggerat\w*|\bdistort\w*|\bout of context\b|\bcherry[- ]pick\w*|\bengañoso\b|\bexagera\w*", 2),
+        (r"\bnot true\b|\buntrue\b|\bfalse\b|\bfake\b|\bhoax\b|\bfabricated\b|\bdebunk\w*|\bno evidence\b|\bbaseless\b|\bpants on fire\b|\bfalso\b|\bbulo\b", 3),
+        (r"\btrue\b|\baccurate\b|\bcorrect\b|\bconfirm\w*|\bverified\b|\bverdadero\b|\bcierto\b", 0),
+    ]
+]
+
+RECOMMENDATIONS = {
+    0: "The claim is supported by fact-checkers; it is safe to share with its original context.",
+    1: "Read the full fact-check before sharing; the claim lacks important context.",
+    2: "Avoid sharing without clarification; fact-checkers found the claim misleading.",
+    3: "Do not share; fact-checkers rated this claim as false.",
+}
+MEDIA_LITERACY_TIP = "Check whether independent fact-checkers agree before trusting a viral claim."
+
+
+def detect_verdict(text: str) -> Optional[int]:
+    """Maps a fact-check rating (e.g. "Mostly False") to a 0-3 score, or None if it states no verdict."""
+    for pattern, score in VERDICT_PATTERNS:
+        if pattern.search(text or ""):
+            return score
+    return None
+
+
+def score_matches(main_claim: str, matches: List[Dict]) -> Tuple[Dict, bool]:
+    """Scores ``match_results`` without a model call.
+
+    Returns ``(scored_result, confident)``; ``confident`` is False when the
+    evidence is missing, weak or contradictory and the LLM should decide.
+    """
+    votes: Dict[int, float] = {}
+    voters: Dict[int, List[Dict]] = {}
+    for match in matches:
+        similarity = float(match.get("confidence") or 0.0)
+        if similarity < RULES_MIN_SIMILARITY:
+            continue
+        # Only a structured rating is a verdict; matches without one are left to the LLM.
+        verdict = detect_verdict(match.get("rating") or "")
+        if verdict is None:
+            continue
+        weight = similarity * float(match.get("trust_weight", 1.0))
+        votes[verdict] = votes.get(verdict, 0.0) + weight
+        voters.setdefault(verdict, []).append(match)
+
+    if not votes:
+        return {
+            "score": None,
+            "label": "",
+            "main_claim": main_claim,
+            "confidence_level": 0,
+            "scored_by": "rules",
+        }, False
+
+    score = max(votes, key=votes.get)
+    supporting = voters[score]
+    agreement = votes[score] / sum(votes.values())
+    similarity = sum(float(m.get("confidence") or 0.0) for m in supporting) / len(supporting)
+    # A single source can't reach full confidence on its own.
+    corroboration = min(1.0, 0.75 + 0.25 * (len(supporting) - 1))
+    confidence = round(100 * agreement * similarity * corroboration)
+    sources = [m["source"] for m in supporting if m.get("source")]
+    scored = {
+        "score": score,
+        "label": LABELS[score],
+        "main_claim": main_claim,
+        "detailed_analysis": (
+            f"{len(supporting)} of {sum(len(v) for v in voters.values())} matching fact-checks "
+            f"rate this claim as '{LABELS[score]}'."
+        ),
+        "verified_sources": sources,
+        "recommendation": RECOMMENDATIONS[score],
+        "media_literacy_tip": MEDIA_LITERACY_TIP,
+        "confidence_level": confidence,
+        "scored_by": "rules",
+    }
+    return scored, confidence >= RULES_MIN_CONFIDENCE
@@ -1,7 +1,13 @@
 from google.adk.agents import LlmAgent
 from adk_project.agents.truth_scorer_agent.prompt import TRUTH_SCORER_PROMPT
+from adk_project.agents.truth_scorer_agent.rules import score_matches
+from adk_project.agents.batching import MODEL_BATCHER
+from adk_project.agents.llm_cache import LLM_CACHE
+from adk_project.protocols.a2a_protocol import enforce_payload_budget, validate_message
+from adk_project.agents.utils import load_claim_text, load_matches, payload_budget_callback
+from adk_project.deadline import LLM_MIN_BUDGET_S, degrade, has_budget
 import json
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Part, Content
 
 TRUTH_SCORER_OUTPUT_SCHEMA = {
@@ -23,12 +29,29 @@ class TruthScorerAgent(LlmAgent):
             instruction=TRUTH_SCORER_PROMPT + "\n\nTu respuesta debe ser un JSON con la siguiente estructura: " + str(TRUTH_SCORER_OUTPUT_SCHEMA),
             description="Asigna un puntaje de desinformación y explica el resultado en formato estructurado para el frontend.",
             output_key="scored_result",
-            model="gemini-2.5-flash"
+            model="gemini-2.5-flash",
+            before_model_callback=[LLM_CACHE.before_model, MODEL_BATCHER.before_model],
+            after_model_callback=[payload_budget_callback("ScoredResult"), LLM_CACHE.after_model],
         )
+        MODEL_BATCHER.register(self)
 
     async def run_async(self, ctx):
-        # This agent's purpose is to take the claim and the search results
-        # from the previous steps and use an LLM to generate a final
-        # structured score and analysis.
-        async for event in super().run_async(ctx):
-            yield event
+        # Well-covered claims are scored deterministically from the matches;
+        # the LLM is only used when the rule engine's confidence is ambiguous
+        # and the deadline leaves time for a model call.
+        state = ctx.session.state
+        scored, confident = score_matches(load_claim_text(state), load_matches(state))
+        if not confident:
+            if has_budget(LLM_MIN_BUDGET_S):
+                async for event in super().run_async(ctx):
+                    yield event
+                return
+            # Sin plazo para el modelo: se publica la puntuación por reglas aunque sea dudosa.
+            degrade(self.name)
+        scored = validate_message("ScoredResult", enforce_payload_budget("ScoredResult", scored)).to_dict()
+        final_part = Part(text=json.dumps(scored))
+        yield Event(
+            content=Content(parts=[final_part]),
+            author=self.name,
+            actions=EventActions(state_delta={self.output_key: scored}),
+        )
@@ -0,0 +1,114 @@
+"""
+Utilidades compartidas por los agentes
+"""
+import json
+from typing import Any, Dict, List
+
+from adk_project.blobstore import BLOBS
+from adk_project.messages import MessageValidationError
+from adk_project.protocols.a2a_protocol import MAX_PAYLOAD_TOKENS, enforce_payload_budget, validate_message
+from adk_project.summarizer import summarize
+
+
+def parse_json_text(text: str, default: Any = None) -> Any:
+    """Parses model/agent output text as JSON, tolerating a ```json fence."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return default
+
+
+def load_state_json(state, key: str, default: Any = None) -> Any:
+    """Reads ``state[key]`` as a parsed JSON value.
+
+    LlmAgents store their final text under ``output_key``, often wrapped in
+    a ```json fence, while custom agents store dicts; both are accepted.
+    """
+    value = state.get(key, default)
+    if not isinstance(value, str):
+        return value
+    return parse_json_text(value, default)
+
+
+def as_dict(value: Any) -> Dict:
+    return value if isinstance(value, dict) else {}
+
+
+def load_matches(state) -> List[Dict]:
+    """Returns the match list from ``match_results`` (bare list or ``{"matches": [...]}``)."""
+    value = load_state_json(state, "match_results", {})
+    if isinstance(value, dict):
+        value = value.get("matches", [])
+    return [m for m in value if isinstance(m, dict)] if isinstance(value, list) else []
+
+
+def load_match_failures(state) -> List[Dict]:
+    """Returns the fact-checker ``failures`` reported alongside ``match_results``, if any."""
+    value = as_dict(load_state_json(state, "match_results", {})).get("failures", [])
+    return [f for f in value if isinstance(f, dict)] if isinstance(value, list) else []
+
+
+async def load_article_text(state) -> str:
+    """Returns the validated article's body from the blob store (falls back to its preview)."""
+    article = as_dict(load_state_json(state, "validated_article", {}))
+    text = await BLOBS.get(article["text_ref"]) if article.get("text_ref") else None
+    return text or article.get("full_text") or article.get("preview", "")
+
+
+async def article_context_callback(callback_context, llm_request):
+    """``before_model_callback`` that adds the validated article's digest to this model call only.
+
+    Session state and events keep just ``text_ref`` and a preview; the
+    body is read from the blob store on demand.
+    """
+    from google.genai.types import Content, Part
+
+    state = callback_context.state
+    article = as_dict(load_state_json(state, "validated_article", {}))
+    if not article.get("text_ref"):
+        return None
+    digest = summarize(await load_article_text(state), article.get("headline", ""), MAX_PAYLOAD_TOKENS)
+    llm_request.contents.insert(0, Content(role="user", parts=[Part(text=f"Texto del artículo:\n{digest}")]))
+    return None
+
+
+def load_claim_text(state) -> str:
+    """Returns the extracted claim text from ``extracted_claim`` (dict or plain text)."""
+    value = state.get("extracted_claim", "")
+    parsed = load_state_json(state, "extracted_claim")
+    if isinstance(parsed, dict):
+        return parsed.get("claim", "")
+    return value if isinstance(value, str) else ""
+
+
+def payload_budget_callback(message_type: str):
+    """Builds an ``after_model_callback`` that keeps the agent's final output within ``MAX_PAYLOAD_TOKENS``.
+
+    JSON output is also validated (leniently) against ``message_type`` and
+    normalized; output that does not match is logged and left as is. The
+    response is edited in place (and None returned) so later callbacks,
+    such as the LLM cache, still run and see the bounded payload.
+    """
+
+    def enforce(callback_context, llm_response):
+        parts = llm_response.content.parts if llm_response.content else None
+        if llm_response.partial or not parts or not parts[0].text:
+            return None
+        payload = parse_json_text(parts[0].text, parts[0].text)
+        if message_type == "MatchResults" and isinstance(payload, list):
+            payload = {"matches": payload}
+        bounded = enforce_payload_budget(message_type, payload)
+        if isinstance(bounded, dict):
+            try:
+                bounded = validate_message(message_type, bounded, lenient=True).to_dict()
+            except MessageValidationError as exc:
+                print(f"--- {message_type} output failed validation: {exc} ---")
+        if bounded is not payload:
+            parts[0].text = bounded if isinstance(bounded, str) else json.dumps(bounded, ensure_ascii=False)
+        return None
+
+    return enforce
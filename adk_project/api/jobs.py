@@ -0,0 +1,325 @@
+"""
+Cola de trabajos asíncrona para el pipeline.
+
+``POST /jobs`` encola y responde al momento con un id; un pool de workers
+asíncronos ejecuta el pipeline. El resultado se consulta con
+``GET /jobs/{id}``, se recibe por SSE (``/jobs/{id}/events``) o se envía a un
+webhook. Hay dos carriles de prioridad (``interactive`` antes que ``bulk``),
+una profundidad máxima que devuelve 429 y deduplicación de URLs ya
+encoladas. Con ``FACTOS_JOB_DB`` los trabajos se guardan en SQLite y los
+pendientes se reanudan al arrancar.
+
+La persistencia es de un solo proceso: cada worker de uvicorn tiene su propia
+cola en memoria, así que el fichero se bloquea al abrirlo y un segundo
+proceso con el mismo ``FACTOS_JOB_DB`` falla al arrancar (un worker, o un
+fichero por worker). Los webhooks solo se envían a http(s) y nunca a
+direcciones privadas, de loopback o link-local, salvo que el host esté en
+``FACTOS_JOB_WEBHOOK_HOSTS``; con esa lista definida, solo a esos hosts. La
+entrega se conecta a las IPs ya comprobadas y no sigue redirecciones.
+"""
+import asyncio
+import fcntl
+import ipaddress
+import itertools
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from adk_project.api.result_cache import canonicalize_url
+from adk_project.http_client import get_transport
+from adk_project.telemetry import JOB_QUEUE_DEPTH, JOBS_TOTAL
+
+JOB_WORKERS = int(os.getenv("FACTOS_JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("FACTOS_JOB_QUEUE_MAX", "1000"))
+# Vacío = solo en memoria.
+JOB_DB = os.getenv("FACTOS_JOB_DB", "")
+# Tiempo que un trabajo terminado sigue consultable.
+JOB_RETENTION = int(os.getenv("FACTOS_JOB_RETENTION", "3600"))
+WEBHOOK_TIMEOUT = float(os.getenv("FACTOS_JOB_WEBHOOK_TIMEOUT", "10"))
+# Hosts permitidos para webhooks, separados por comas (".example.com" incluye subdominios).
+WEBHOOK_HOSTS = [h.strip().lower() for h in os.getenv("FACTOS_JOB_WEBHOOK_HOSTS", "").split(",") if h.strip()]
+
+PRIORITIES = {"interactive": 0, "bulk": 1}
+FINISHED = ("done", "error")
+
+
+class QueueFull(Exception):
+    """The queue already holds ``JOB_QUEUE_MAX`` waiting jobs."""
+
+
+class InvalidWebhook(ValueError):
+    """The webhook URL is not http(s) or points at a host the server must not call."""
+
+
+@dataclass
+class Job:
+    id: str
+    text: str
+    priority: str
+    key: str
+    webhooks: List[str] = field(default_factory=list)
+    status: str = "queued"  # queued | running | done | error
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    def public(self) -> Dict:
+        data = asdict(self)
+        del data["key"], data["webhooks"]
+        return data
+
+
+def dedupe_key(text: str) -> str:
+    text = text.strip()
+    return canonicalize_url(text) if urlsplit(text).scheme in ("http", "https") else text
+
+
+def _allowlisted(host: str) -> bool:
+    return any(host == h or (h.startswith(".") and host.endswith(h)) for h in WEBHOOK_HOSTS)
+
+
+def _public_address(address: str) -> bool:
+    return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+
+
+def check_webhook_url(url: str) -> None:
+    """Raises ``InvalidWebhook`` unless ``url`` is http(s) and its host may be called."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise InvalidWebhook("webhook_url must be an http(s) URL")
+    if WEBHOOK_HOSTS:
+        if not _allowlisted(host):
+            raise InvalidWebhook(f"webhook host {host} is not allowed")
+        return
+    try:
+        public = _public_address(host)
+    except ValueError:
+        public = host != "localhost" and not host.endswith(".localhost")
+    if not public:
+        raise InvalidWebhook(f"webhook host {host} is not a public address")
+
+
+async def _public_addresses(host: str) -> Optional[List[str]]:
+    """Addresses ``host`` resolves to if all are public, else None (checked again at delivery against DNS rebinding)."""
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None)
+    except OSError:
+        return None
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not addresses or not all(_public_address(address) for address in addresses):
+        return None
+    return addresses
+
+
+class JobStore:
+    """SQLite persistence for jobs (one JSON row per job), owned by a single process."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = open(f"{path}.lock", "w")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock.close()
+            raise RuntimeError(
+                f"{path} is in use by another process; FACTOS_JOB_DB needs one file per worker process"
+            ) from None
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, finished_at REAL)"
+        )
+
+    def save(self, job: Job) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                (job.id, json.dumps(asdict(job), default=str), job.finished_at),
+            )
+
+    def load(self, finished_after: float) -> List[Job]:
+        """Unfinished jobs plus those finished after ``finished_after``; older rows are deleted."""
+        with self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at <= ?", (finished_after,))
+        rows = self.conn.execute("SELECT data FROM jobs").fetchall()
+        return [Job(**json.loads(data)) for (data,) in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+        self._lock.close()
+
+
+class JobQueue:
+    """Priority queue of pipeline jobs drained by a pool of asyncio workers."""
+
+    def __init__(self, max_depth: int = JOB_QUEUE_MAX, store: Optional[JobStore] = None, retention: float = JOB_RETENTION):
+        self.max_depth = max_depth
+        self.store = store
+        self.retention = retention
+        self.jobs: Dict[str, Job] = {}
+        self._active: Dict[str, str] = {}  # clave de deduplicación -> id del trabajo en cola o en curso
+        self._finished: deque = deque()
+        self._done: Dict[str, asyncio.Event] = {}
+        self._seq = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._deliveries = set()
+        self._queued = dict.fromkeys(PRIORITIES, 0)
+        if store is not None:
+            for job in store.load(time.time() - retention):
+                self._restore(job)
+
+    def _restore(self, job: Job) -> None:
+        if job.status == "running":
+            job.status = "queued"  # el worker murió con el proceso: se reintenta
+        self.jobs[job.id] = job
+        if job.status in FINISHED:
+            self._finished.append((job.finished_at, job.id))
+        else:
+            self._active[job.key] = job.id
+            self._count(job.priority, 1)
+
+    def depth(self, priority: Optional[str] = None) -> int:
+        """Jobs waiting for a worker, in one lane or in total."""
+        return self._queued[priority] if priority else sum(self._queued.values())
+
+    def _count(self, priority: str, delta: int) -> None:
+        self._queued[priority] += delta
+        JOB_QUEUE_DEPTH.labels(priority=priority).set(self._queued[priority])
+
+    def _enqueue(self, job: Job) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait((PRIORITIES[job.priority], next(self._seq), job.id))
+
+    def _save(self, job: Job) -> None:
+        if self.store is not None:
+            self.store.save(job)
+
+    def submit(self, text: str, priority: str = "interactive", webhook_url: Optional[str] = None):
+        """Queues ``text`` and returns ``(job, deduplicated)``; raises ``QueueFull`` when at capacity.
+
+        Resubmitting a URL that is already queued or running returns the
+        existing job, promoted to the higher priority and with the extra webhook.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if webhook_url:
+            check_webhook_url(webhook_url)
+        self._purge()
+        key = dedupe_key(text)
+        existing = self.jobs.get(self._active.get(key, ""))
+        if existing is not None:
+            if webhook_url and webhook_url not in existing.webhooks:
+                existing.webhooks.append(webhook_url)
+            if existing.status == "queued" and PRIORITIES[priority] < PRIORITIES[existing.priority]:
+                self._count(existing.priority, -1)
+                self._count(priority, 1)
+                existing.priority = priority
+                self._enqueue(existing)  # la entrada antigua se descarta al salir de la cola
+            self._save(existing)
+            JOBS_TOTAL.labels(outcome="deduplicated").inc()
+            return existing, True
+        if self.depth() >= self.max_depth:
+            JOBS_TOTAL.labels(outcome="rejected").inc()
+            raise QueueFull(f"{self.max_depth} jobs already queued")
+        job = Job(id=uuid.uuid4().hex, text=text, priority=priority, key=key, webhooks=[webhook_url] if webhook_url else [])
+        self.jobs[job.id] = job
+        self._active[key] = job.id
+        self._save(job)
+        self._count(priority, 1)
+        self._enqueue(job)
+        JOBS_TOTAL.labels(outcome="queued").inc()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Job:
+        """Waits until the job is finished and returns it."""
+        job = self.jobs[job_id]
+        if job.status not in FINISHED:
+            await self._done.setdefault(job_id, asyncio.Event()).wait()
+        return job
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.retention
+        while self._finished and self._finished[0][0] <= cutoff:
+            _, job_id = self._finished.popleft()
+            self.jobs.pop(job_id, None)
+
+    async def _deliver(self, job: Job) -> None:
+        for url in job.webhooks:
+            host = (urlsplit(url).hostname or "").lower()
+            addresses = None
+            if not _allowlisted(host):
+                # La conexión va a estas IPs: un cambio de DNS posterior no puede redirigirla.
+                addresses = await _public_addresses(host)
+                if addresses is None:
+                    print(f"--- Webhook {url} for job {job.id} skipped: host does not resolve to a public address ---")
+                    continue
+            try:
+                resp = await get_transport().post_json(
+                    url, job.public(), timeout=WEBHOOK_TIMEOUT, follow_redirects=False, addresses=addresses
+                )
+                if 300 <= resp.status < 400:
+                    print(f"--- Webhook {url} for job {job.id} failed: redirect to {resp.headers.get('Location')} not followed ---")
+                elif resp.status >= 400:
+                    print(f"--- Webhook {url} for job {job.id} answered HTTP {resp.status} ---")
+            except Exception as exc:
+                print(f"--- Webhook {url} for job {job.id} failed: {type(exc).__name__} ---")
+
+    async def _worker(self, run: Callable[[str], Awaitable[Dict]]) -> None:
+        while True:
+            priority, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            # Entradas obsoletas: trabajo ya recogido o promovido a otro carril.
+            if job is None or job.status != "queued" or PRIORITIES[job.priority] != priority:
+                continue
+            self._count(job.priority, -1)
+            job.status, job.started_at = "running", time.time()
+            self._save(job)
+            try:
+                job.result, job.status = await run(job.text), "done"
+            except asyncio.CancelledError:
+                # Apagado a mitad de trabajo: vuelve a la cola para el siguiente start().
+                job.status = "queued"
+                self._count(job.priority, 1)
+                self._save(job)
+                raise
+            except Exception as exc:
+                job.error, job.status = f"{type(exc).__name__}: {exc}", "error"
+            job.finished_at = time.time()
+            self._active.pop(job.key, None)
+            self._finished.append((job.finished_at, job.id))
+            self._save(job)
+            JOBS_TOTAL.labels(outcome=job.status).inc()
+            self._done.pop(job.id, asyncio.Event()).set()
+            if job.webhooks:
+                delivery = asyncio.create_task(self._deliver(job))
+                self._deliveries.add(delivery)
+                delivery.add_done_callback(self._deliveries.discard)
+
+    def start(self, run: Callable[[str], Awaitable[Dict]], workers: int = JOB_WORKERS) -> None:
+        """Starts ``workers`` tasks on the running loop; queued (and recovered) jobs are picked up in order."""
+        self._queue = asyncio.PriorityQueue()
+        for job in sorted((j for j in self.jobs.values() if j.status == "queued"), key=lambda j: j.created_at):
+            self._queue.put_nowait((PRIORITIES[job.priority], next(self._seq), job.id))
+        self._workers = [asyncio.create_task(self._worker(run)) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._deliveries, return_exceptions=True)
+        self._workers, self._queue = [], None
+
+
+JOBS = JobQueue(store=JobStore(JOB_DB) if JOB_DB else None)
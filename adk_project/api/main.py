@@ -1,9 +1,35 @@
-from fastapi import FastAPI
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from adk_project.agent import root_agent
+from typing import List, Literal, Optional
+from adk_project.api.jobs import JOB_WORKERS, JOBS, InvalidWebhook, QueueFull
+from adk_project.api.pipeline import run_batch, run_pipeline_cached, stream_pipeline
+from adk_project.api.warmup import WARMUP_ENABLED, warm_up
+from adk_project import profiling
+from adk_project.cache import close_backends
+from adk_project.deadline import deadline_scope, new_deadline
+from adk_project.http_client import close_transport
+from adk_project.telemetry import render_metrics
+from adk_project.workers import shutdown_parse_pool
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Los agentes se construyen en segundo plano: /health responde desde el primer momento.
+    warmup = asyncio.create_task(warm_up()) if WARMUP_ENABLED else None
+    JOBS.start(run_pipeline_cached, JOB_WORKERS)
+    yield
+    await JOBS.stop()
+    if warmup is not None:
+        warmup.cancel()
+    # Cierra el pool HTTP compartido al apagar el worker.
+    await close_transport()
+    shutdown_parse_pool()
+    close_backends()
+
+app = FastAPI(lifespan=lifespan)
 
 # Pydantic models for request validation
 class Instance(BaseModel):
@@ -12,14 +38,130 @@ class Instance(BaseModel):
 class PredictionPayload(BaseModel):
     instances: List[Instance]
 
+class JobRequest(BaseModel):
+    text: str
+    priority: Literal["interactive", "bulk"] = "interactive"
+    webhook_url: Optional[str] = None
+
+# Con la cola llena se pide al cliente que reintente pasado este tiempo.
+QUEUE_FULL_RETRY_AFTER_S = 5
+SSE_KEEPALIVE_S = 15
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
 
+def _request_deadline(deadline_ms: Optional[int]):
+    # Sin cabecera (o con 0) se aplica FACTOS_DEADLINE_MS.
+    return new_deadline(deadline_ms / 1000 if deadline_ms and deadline_ms > 0 else None)
+
+async def _client_disconnected(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def _cancel_on_disconnect(request: Request, work):
+    # Si el cliente se va, se cancela el trabajo: fetches y llamadas a modelo pendientes incluidos.
+    task = asyncio.ensure_future(work)
+    disconnected = asyncio.ensure_future(_client_disconnected(request))
+    try:
+        await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnected.cancel()
+        if not task.done():
+            task.cancel()
+    if not task.done():
+        await asyncio.wait({task})
+    if task.cancelled():
+        return None
+    return task.result()
+
 @app.post("/predict")
-def predict(payload: PredictionPayload):
-    predictions = [root_agent.run(instance.text) for instance in payload.instances]
-    return {"predictions": predictions}
+async def predict(payload: PredictionPayload, request: Request, x_deadline_ms: Optional[int] = Header(None),
+                  x_factos_profile: Optional[str] = Header(None), x_factos_profile_output: str = Header("file")):
+    # Perfilado bajo demanda: cabecera con el token privilegiado o muestreo aleatorio.
+    requested = x_factos_profile is not None
+    if requested and not profiling.token_matches(x_factos_profile):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    profile = profiling.acquire(f"/predict {payload.instances[0].text if payload.instances else ''}") \
+        if requested or profiling.sampled() else None
+    with deadline_scope(_request_deadline(x_deadline_ms)):
+        async with profiling.profiling(profile):
+            predictions = await _cancel_on_disconnect(request, run_batch([instance.text for instance in payload.instances]))
+    if predictions is None:
+        return Response(status_code=499)  # Client Closed Request: nadie leerá la respuesta
+    response = {"predictions": predictions}
+    if profile is None:
+        if requested:
+            response["profile"] = {"error": f"{profiling.PROFILE_MAX_CONCURRENT} requests are already being profiled"}
+    elif requested and x_factos_profile_output == "inline":
+        response["profile"] = profile.inline()
+    else:
+        files = await asyncio.to_thread(profile.write, profiling.PROFILE_DIR)
+        if requested:
+            response["profile"] = {"id": profile.id, "files": files}
+    return response
+
+@app.post("/predict/stream")
+async def predict_stream(instance: Instance, format: str = "sse", x_deadline_ms: Optional[int] = Header(None)):
+    # Emite la salida de cada agente en cuanto está disponible (SSE o NDJSON).
+    # Si el cliente se desconecta, Starlette cancela el generador y con él el pipeline.
+    deadline = _request_deadline(x_deadline_ms)
+
+    async def sse():
+        async for item in stream_pipeline(instance.text, deadline):
+            yield f"event: {item['output_key'] or item['stage']}\ndata: {json.dumps(item)}\n\n"
+
+    async def ndjson():
+        async for item in stream_pipeline(instance.text, deadline):
+            yield json.dumps(item) + "\n"
+
+    if format == "ndjson":
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    try:
+        job, deduplicated = JOBS.submit(request.text, request.priority, request.webhook_url)
+    except QueueFull as exc:
+        return JSONResponse({"detail": str(exc)}, status_code=429, headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_S)})
+    except InvalidWebhook as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"id": job.id, "status": job.status, "deduplicated": deduplicated}
+
+def _get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _get_job(job_id).public()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    # Un evento "status" inmediato y otro "done" al terminar; comentarios keep-alive mientras tanto.
+    job = _get_job(job_id)
+
+    async def sse():
+        yield f"event: status\ndata: {json.dumps(job.public())}\n\n"
+        finished = asyncio.ensure_future(JOBS.wait(job_id))
+        try:
+            while not finished.done():
+                await asyncio.wait({finished}, timeout=SSE_KEEPALIVE_S)
+                if not finished.done():
+                    yield ": keep-alive\n\n"
+            yield f"event: done\ndata: {json.dumps(finished.result().public())}\n\n"
+        finally:
+            finished.cancel()
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/")
 def read_root():
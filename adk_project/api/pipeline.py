@@ -0,0 +1,158 @@
+"""
+Ejecución del pipeline FactosAgent a través de un Runner de ADK.
+
+El Runner y el árbol de agentes se crean en la primera petición (o en el
+warm-up), de modo que importar este módulo no carga google.adk.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from adk_project import profiling
+from adk_project.agent import get_root_agent
+from adk_project.agents.utils import parse_json_text
+from adk_project.api.result_cache import make_pipeline_cache, record_article
+from adk_project.deadline import Deadline, new_deadline, next_within
+from adk_project.telemetry import PipelineTrace, register_cache
+
+APP_NAME = "factos"
+USER_ID = "api"
+PREDICT_CONCURRENCY = int(os.getenv("FACTOS_PREDICT_CONCURRENCY", "8"))
+
+_predict_semaphore = asyncio.Semaphore(PREDICT_CONCURRENCY)
+RESULT_CACHE = make_pipeline_cache()
+register_cache("pipeline", RESULT_CACHE.stats)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Returns the Runner, building the agent tree on first use (thread-safe)."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                from google.adk.runners import Runner
+                from adk_project.api.sessions import BoundedSessionService
+
+                _runner = Runner(agent=get_root_agent(), app_name=APP_NAME, session_service=BoundedSessionService())
+    return _runner
+
+
+async def ensure_runner():
+    """Like ``get_runner`` but builds off the event loop, so cold imports never block other requests."""
+    if _runner is not None:
+        return _runner
+    return await asyncio.to_thread(get_runner)
+
+
+@functools.lru_cache(maxsize=None)
+def stage_output_keys() -> Dict[str, str]:
+    return {agent.name: agent.output_key for agent in get_root_agent().sub_agents}
+
+
+def final_output_key() -> str:
+    return get_root_agent().sub_agents[-1].output_key
+
+
+async def pipeline_events(text: str, deadline: Optional[Deadline] = None):
+    """Runs the pipeline for one input in a fresh session, yielding every ADK event.
+
+    Every step runs under ``deadline`` (by default a new one, see
+    ``new_deadline``); when it expires the step is cancelled and
+    ``DeadlineExceeded`` is raised.
+    """
+    deadline = deadline or new_deadline()
+    runner = await ensure_runner()
+    from google.genai.types import Content, Part
+
+    session_service = runner.session_service
+    session = await session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, state={"input": text}
+    )
+    message = Content(role="user", parts=[Part(text=text)])
+    trace = PipelineTrace()
+    events = runner.run_async(user_id=USER_ID, session_id=session.id, new_message=message)
+    try:
+        while True:
+            try:
+                event = await next_within(events, deadline)
+            except StopAsyncIteration:
+                break
+            trace.on_event(event)
+            profiling.mark(f"event:{event.author}")
+            yield event
+    finally:
+        await events.aclose()
+        trace.finish()
+        await session_service.delete_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+        )
+
+
+def _stage_output(event):
+    """Returns ``(output_key, data)`` if ``event`` is a sub-agent's final output."""
+    output_key = stage_output_keys().get(event.author)
+    if output_key is None or not event.is_final_response():
+        return None
+    if output_key in event.actions.state_delta:
+        return output_key, event.actions.state_delta[output_key]
+    if not (event.content and event.content.parts and event.content.parts[0].text):
+        return None
+    text = event.content.parts[0].text
+    return output_key, parse_json_text(text, text)
+
+
+async def stream_pipeline(text: str, deadline: Optional[Deadline] = None):
+    """Yields ``{stage, output_key, data}`` as soon as each sub-agent produces its output.
+
+    The last item is always the ``agui_response`` stage (or an ``error`` stage).
+    """
+    try:
+        async for event in pipeline_events(text, deadline):
+            output = _stage_output(event)
+            if output is not None:
+                yield {"stage": event.author, "output_key": output[0], "data": output[1]}
+    except Exception as exc:
+        yield {"stage": "error", "output_key": None, "data": f"{type(exc).__name__}: {exc}"}
+
+
+async def run_pipeline(text: str) -> Dict:
+    """Runs the whole pipeline for one input and returns the ``agui_response``."""
+    result = None
+    async for event in pipeline_events(text):
+        output = _stage_output(event)
+        if output is not None and output[0] == "validated_article":
+            record_article(output[1])
+        if output is not None and output[0] == final_output_key():
+            result = output[1]
+    return result
+
+
+async def run_pipeline_cached(text: str) -> Dict:
+    """Like ``run_pipeline`` but memoized per canonical URL and revalidated against the origin."""
+    return await RESULT_CACHE.run(text, run_pipeline)
+
+
+async def _run_instance(text: str) -> Dict:
+    async with _predict_semaphore:
+        start = time.perf_counter()
+        try:
+            result, error = await run_pipeline_cached(text), None
+        except Exception as exc:
+            result, error = None, f"{type(exc).__name__}: {exc}"
+        return {
+            "result": result,
+            "error": error,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+
+async def run_batch(texts: List[str]) -> List[Dict]:
+    """Runs inputs concurrently (capped by ``FACTOS_PREDICT_CONCURRENCY``), preserving order."""
+    return await asyncio.gather(*(_run_instance(text) for text in texts))
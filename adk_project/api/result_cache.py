@@ -0,0 +1,165 @@
+"""
+Memoización del pipeline completo por URL canónica.
+
+La URL canónica solo sirve de clave de caché y de coalescencia; el pipeline
+y la revalidación piden la URL tal como la envió el usuario, porque el
+editor puede no servir la variante canónica.
+
+Un resultado fresco se devuelve directamente. Pasado ese plazo se revalida
+contra el origen con un GET condicional (ETag/Last-Modified) o comparando el
+hash del texto del artículo; si no cambió se reutiliza el ``agui_response``
+guardado sin volver a ejecutar los cinco agentes. Los validadores salen de la
+propia descarga del SmartScraperAgent (``record_article``), sin otra petición.
+"""
+import hashlib
+import os
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from adk_project.cache import AsyncCache, SingleFlight, make_backend
+from adk_project.http_policy import FetchError, policy_get
+from adk_project.workers import run_in_parse_pool
+
+PIPELINE_CACHE_TTL = int(os.getenv("FACTOS_PIPELINE_CACHE_TTL", "900"))
+# Tiempo durante el que un resultado caducado se conserva para revalidarlo.
+PIPELINE_CACHE_REVALIDATE_TTL = int(os.getenv("FACTOS_PIPELINE_CACHE_REVALIDATE_TTL", "86400"))
+PIPELINE_CACHE_MAX_ENTRIES = int(os.getenv("FACTOS_PIPELINE_CACHE_MAX_ENTRIES", "5000"))
+
+# Una respuesta incompleta (plazo agotado, fact-checkers o artículo no
+# disponibles) no se reutiliza: el fallo puede ser transitorio.
+INCOMPLETE_FIELDS = ("degraded_stages", "unavailable_sources", "error")
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga",
+    "ocid", "cmpid", "ref", "ref_src", "smid", "smtyp", "share", "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "pk_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalizes a news URL: drops tracking params, fragments and AMP variants."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("amp."):
+        host = host[len("amp."):]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    segments = [s for s in parts.path.split("/") if s and s.lower() != "amp"]
+    if segments:
+        last = segments[-1]
+        for suffix in (".amp.html", ".amp"):
+            if last.lower().endswith(suffix):
+                last = last[: -len(suffix)] + (".html" if suffix == ".amp.html" else "")
+        segments[-1] = last
+    path = "/" + "/".join(segments)
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+_validators: ContextVar[Optional[Dict]] = ContextVar("factos_article_validators", default=None)
+
+
+def record_article(article: Dict) -> None:
+    """Keeps the validators of the article fetched by the pipeline run being cached (no-op outside one)."""
+    validators = _validators.get()
+    if validators is None or not isinstance(article, dict):
+        return
+    text_ref = article.get("text_ref") or ""
+    validators.update(
+        etag=article.get("etag"),
+        last_modified=article.get("last_modified"),
+        # text_ref es el sha256 del texto extraído (ver adk_project.blobstore).
+        content_hash=text_ref.split(":", 1)[1] if ":" in text_ref else None,
+    )
+
+
+class PipelineResultCache:
+    """Caches ``agui_response`` per canonical URL and revalidates it against the origin."""
+
+    def __init__(self, cache: AsyncCache):
+        self.cache = cache
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._flight = SingleFlight()
+
+    async def _unchanged(self, url: str, stored: Dict) -> bool:
+        headers = {}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+        # Misma política por dominio (rate limit, breaker) que el resto de descargas.
+        try:
+            resp = await policy_get(url, headers)
+        except FetchError:
+            return False
+        if resp.status == 304:
+            return True
+        if resp.status != 200 or not stored.get("content_hash"):
+            return False
+        from adk_project.agents.smart_scraper_agent.article_extractor import article_text
+
+        return content_hash(await run_in_parse_pool(article_text, resp.text)) == stored["content_hash"]
+
+    async def _lookup_or_run(self, key: str, url: Optional[str], run: Callable[[], Awaitable[Dict]]) -> Dict:
+        entry = await self.cache.get(key)
+        if entry is not None:
+            stored = entry.value
+            if time.time() < entry.expires_at:
+                self.hits += 1
+                return stored["response"]
+            if url and await self._unchanged(url, stored):
+                self.revalidated += 1
+                await self.cache.set(key, stored)
+                return stored["response"]
+        self.misses += 1
+        validators: Dict = {}
+        token = _validators.set(validators)
+        try:
+            response = await run()
+        finally:
+            _validators.reset(token)
+        if isinstance(response, dict) and not any(response.get(f) for f in INCOMPLETE_FIELDS):
+            await self.cache.set(key, {"response": response, **validators})
+        return response
+
+    async def run(self, text: str, run_pipeline: Callable[[str], Awaitable[Dict]]) -> Dict:
+        """Returns the cached result for ``text`` or runs the pipeline once for all concurrent callers.
+
+        Submissions with the same canonical URL share the cache entry, but the
+        pipeline always receives the URL as submitted.
+        """
+        text = text.strip()
+        url = text if text.lower().startswith(("http://", "https://")) else None
+        key = hashlib.sha256((canonicalize_url(url) if url else text).encode("utf-8")).hexdigest()
+        return await self._flight.do(key, lambda: self._lookup_or_run(key, url, lambda: run_pipeline(text)))
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+        }
+
+
+def make_pipeline_cache() -> PipelineResultCache:
+    backend = make_backend("pipeline", max_entries=PIPELINE_CACHE_MAX_ENTRIES)
+    return PipelineResultCache(
+        AsyncCache(backend, ttl=PIPELINE_CACHE_TTL, stale_ttl=PIPELINE_CACHE_REVALIDATE_TTL, name="pipeline")
+    )
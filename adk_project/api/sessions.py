@@ -0,0 +1,64 @@
+"""
+Servicio de sesiones en memoria con TTL y límite de sesiones.
+
+Las sesiones que nadie borra (clientes que se desconectan a mitad de un
+stream, generadores que no se cierran) caducan tras ``FACTOS_SESSION_TTL``
+segundos sin eventos; por encima de ``FACTOS_SESSION_MAX`` se descartan las
+menos recientes.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from google.adk.sessions import InMemorySessionService, Session
+
+SESSION_TTL = float(os.getenv("FACTOS_SESSION_TTL", "900"))
+SESSION_MAX = int(os.getenv("FACTOS_SESSION_MAX", "10000"))
+
+
+class BoundedSessionService(InMemorySessionService):
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = SESSION_MAX):
+        super().__init__()
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        self._touched: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+
+    def _touch(self, session: Session) -> None:
+        key = (session.app_name, session.user_id, session.id)
+        self._touched[key] = time.monotonic()
+        self._touched.move_to_end(key)
+
+    def evict(self) -> int:
+        """Drops idle sessions past the TTL, then the oldest ones beyond ``max_sessions``."""
+        now, evicted = time.monotonic(), 0
+        while self._touched:
+            (app_name, user_id, session_id), touched = next(iter(self._touched.items()))
+            if now - touched < self.ttl and len(self._touched) <= self.max_sessions:
+                break
+            self._touched.popitem(last=False)
+            self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        self.evict()
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        self._touch(session)
+        return session
+
+    async def append_event(self, session: Session, event):
+        event = await super().append_event(session=session, event=event)
+        if (session.app_name, session.user_id, session.id) in self._touched:
+            self._touch(session)
+        return event
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._touched.pop((app_name, user_id, session_id), None)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    def __len__(self) -> int:
+        return len(self._touched)
@@ -0,0 +1,64 @@
+"""
+Warm-up en segundo plano tras arrancar el servidor.
+
+Construye el árbol de agentes fuera del event loop (las importaciones
+pesadas no bloquean /health), abre conexiones hacia los fact-checkers para
+calentar DNS y TLS, y crea los clientes de modelo.
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from adk_project.http_client import get_transport
+
+WARMUP_ENABLED = os.getenv("FACTOS_WARMUP", "1") != "0"
+WARMUP_TIMEOUT = float(os.getenv("FACTOS_WARMUP_TIMEOUT", "5"))
+# Orígenes a precalentar (coma-separados); por defecto, los de las fuentes registradas.
+WARMUP_URLS: Optional[List[str]] = [u.strip() for u in os.getenv("FACTOS_WARMUP_URLS", "").split(",") if u.strip()] or None
+
+WARMUP_STATE = {"done": False, "seconds": None}
+
+
+def _default_urls() -> List[str]:
+    from adk_project.agents.fact_check_matcher_agent.sources import enabled_sources
+
+    origins = {f"{p.scheme}://{p.netloc}/" for p in (urlsplit(s.search_url) for s in enabled_sources())}
+    return sorted(origins)
+
+
+async def preconnect(url: str) -> None:
+    """Opens (and drops) a connection so DNS and the TLS session are cached."""
+    try:
+        async with get_transport().stream(url, timeout=WARMUP_TIMEOUT):
+            pass
+    except Exception as exc:
+        print(f"--- Warm-up could not reach {url}: {type(exc).__name__} ---")
+
+
+async def warm_model_client(model) -> None:
+    api_client = getattr(model, "api_client", None)  # Solo los modelos Gemini exponen un cliente.
+    if api_client is None:
+        return
+    try:
+        # Llamada de metadatos sin coste: abre la conexión del cliente asíncrono.
+        await asyncio.wait_for(api_client.aio.models.get(model=model.model), WARMUP_TIMEOUT)
+    except Exception as exc:
+        print(f"--- Warm-up could not reach model {model.model}: {type(exc).__name__} ---")
+
+
+async def warm_up() -> None:
+    from adk_project.api.pipeline import ensure_runner
+
+    start = time.perf_counter()
+    runner = await ensure_runner()
+    models = {}
+    for agent in runner.agent.sub_agents:
+        model = getattr(agent, "canonical_model", None)
+        if model is not None:
+            models.setdefault(model.model, model)
+    urls = WARMUP_URLS if WARMUP_URLS is not None else _default_urls()
+    await asyncio.gather(*(preconnect(url) for url in urls), *(warm_model_client(m) for m in models.values()))
+    WARMUP_STATE.update(done=True, seconds=round(time.perf_counter() - start, 3))
+    print(f"--- Warm-up finished in {WARMUP_STATE['seconds']:.2f}s ---")
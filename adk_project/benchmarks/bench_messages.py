@@ -0,0 +1,109 @@
+"""
+Microbenchmark de los mensajes A2A entre etapas.
+
+Compara el camino actual con dicts (``json.dumps``/``json.loads`` sin
+validar) con los mensajes tipados (dataclasses con slots, validación al
+decodificar y JSON vía orjson o msgpack si están instalados). Reporta
+tiempo de codificación y decodificación, tamaño en bytes y memoria de
+``--records`` coincidencias retenidas como dicts o como ``Match``.
+
+Uso:
+    python -m adk_project.benchmarks.bench_messages [--repeat N] [--records N]
+"""
+import argparse
+import importlib.util
+import json
+import statistics
+import time
+import tracemalloc
+
+from adk_project.messages import Match, MatchResults
+from adk_project.protocols.a2a_protocol import JSON_BACKEND, decode_message, encode_message, validate_message
+
+ARTICLE = {
+    "url": "https://www.example.com/health/2025/06/coffee-cancer-study",
+    "headline": "Drinking 12 cups of coffee a day prevents cancer, study claims",
+    "byline": "Jane Doe",
+    "publish_date": "2025-06-11T08:00:00Z",
+    "text_ref": "sha256:" + "ab" * 32,
+    "preview": "A new observational study of 40,000 adults suggests heavy coffee drinkers are less likely to " * 2,
+}
+MATCHES = {
+    "matches": [
+        {
+            "claim": f"Coffee does not prevent cancer, fact-check {i}",
+            "source": f"https://www.factcheck.org/2025/06/coffee-cancer-{i}/",
+            "confidence": round(0.95 - i * 0.05, 3),
+            "rating": "False",
+            "publisher": "FactCheck.org",
+            "date": "2025-06-12",
+        }
+        for i in range(5)
+    ],
+    "failures": [{"site": "apnews.com", "reason": "timeout", "detail": "3.0s"}],
+}
+SCORED = {
+    "score": 3,
+    "label": "False",
+    "main_claim": "Drinking 12 cups of coffee a day prevents cancer",
+    "detailed_analysis": "3 of 3 matching fact-checks rate this claim as 'False'.",
+    "verified_sources": [m["source"] for m in MATCHES["matches"][:3]],
+    "recommendation": "Do not share; fact-checkers rated this claim as false.",
+    "media_literacy_tip": "Check whether independent fact-checkers agree before trusting a viral claim.",
+    "confidence_level": 88,
+    "scored_by": "rules",
+}
+PAYLOADS = {"ValidatedArticle": ARTICLE, "MatchResults": MATCHES, "ScoredResult": SCORED}
+
+
+def timed_us(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def retained_kib(build):
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    codecs = ["json"] + (["msgpack"] if importlib.util.find_spec("msgpack") else [])
+    print(f"typed JSON backend: {JSON_BACKEND}; codecs: {', '.join(codecs)}")
+    print(f"{'message':18} {'path':14} {'bytes':>7} {'enc us':>8} {'dec us':>8}")
+    for message_type, payload in PAYLOADS.items():
+        body = json.dumps(payload).encode("utf-8")
+        enc = timed_us(lambda: json.dumps(payload).encode("utf-8"), args.repeat)
+        dec = timed_us(lambda: json.loads(body), args.repeat)
+        print(f"{message_type:18} {'dict+json':14} {len(body):7} {enc:8.2f} {dec:8.2f}")
+        message = validate_message(message_type, payload)
+        for codec in codecs:
+            body = encode_message(message, codec)
+            enc = timed_us(lambda: encode_message(message, codec), args.repeat)
+            dec = timed_us(lambda: decode_message(message_type, body, codec), args.repeat)
+            print(f"{message_type:18} {'typed+' + codec:14} {len(body):7} {enc:8.2f} {dec:8.2f}")
+
+    match = MATCHES["matches"][0]
+    body = json.dumps(match)
+    dict_kib = retained_kib(lambda: [json.loads(body) for _ in range(args.records)])
+    typed_kib = retained_kib(lambda: [Match.from_dict(json.loads(body)) for _ in range(args.records)])
+    print(f"{args.records} matches retained: dict {dict_kib:.0f} KiB, Match {typed_kib:.0f} KiB "
+          f"({100 * (1 - typed_kib / dict_kib):.0f}% less)")
+    results = MatchResults.from_dict(MATCHES)
+    assert decode_message("MatchResults", encode_message(results)) == results
+
+
+if __name__ == "__main__":
+    main()
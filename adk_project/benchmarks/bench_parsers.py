@@ -0,0 +1,80 @@
+"""
+Microbenchmark de los parsers de resultados de fact-checkers.
+
+Compara el parser original (árbol completo con html.parser) con el parser
+restringido (SoupStrainer + lxml) sobre páginas guardadas, reportando tiempo
+y memoria pico por página.
+
+Uso:
+    python -m adk_project.benchmarks.bench_parsers [--pages DIR] [--repeat N]
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from adk_project.agents.fact_check_matcher_agent.factchecker_scraper import (
+    HTML_PARSER,
+    parse_apnews_html,
+    parse_factcheck_org_html,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def baseline_factcheck_org(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find_all('article', limit=3)
+
+
+def baseline_apnews(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find_all('div', class_='Card', limit=3)
+
+
+PARSERS = {
+    "factcheck_org": (baseline_factcheck_org, parse_factcheck_org_html),
+    "apnews": (baseline_apnews, parse_apnews_html),
+}
+
+
+def measure(fn, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=FIXTURES_DIR, help="directory with saved *.html search pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"restricted parser backend: {HTML_PARSER}")
+    print(f"{'page':32} {'KB':>6} {'base ms':>9} {'new ms':>8} {'base KiB':>9} {'new KiB':>8}")
+    for path in sorted(glob.glob(os.path.join(args.pages, "*.html"))):
+        name = os.path.basename(path)
+        kind = next((k for k in PARSERS if name.startswith(k)), None)
+        if kind is None:
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        baseline, restricted = PARSERS[kind]
+        base_ms, base_kib = measure(baseline, html, args.repeat)
+        new_ms, new_kib = measure(restricted, html, args.repeat)
+        print(f"{name:32} {len(html) / 1024:6.0f} {base_ms:9.2f} {new_ms:8.2f} {base_kib:9.0f} {new_kib:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de arranque en frío de la API.
+
+Lanza intérpretes nuevos que importan ``adk_project.api.main``, levantan
+uvicorn en proceso y miden, desde el arranque del proceso: tiempo de
+importación, tiempo hasta el primer /health y tiempo hasta la primera
+predicción correcta (contra el servidor de replay y el LLM enlatado).
+
+Uso:
+    python -m adk_project.benchmarks.bench_startup [--runs 3] [--importtime 15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD_FLAG = "--child"
+
+
+async def _child(start: float) -> dict:
+    import_start = time.time()
+    from adk_project.api.main import app
+
+    imported = time.time()
+    import httpx
+    import uvicorn
+
+    from adk_project.benchmarks.replay_server import start_replay_server
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.005)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    async with httpx.AsyncClient(base_url=base, timeout=120) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                await asyncio.sleep(0.005)
+        healthy = time.time()
+
+        # Misma ruta que la primera petición: espera al warm-up en vez de importar en paralelo.
+        from adk_project.api.pipeline import ensure_runner
+
+        root_agent = (await ensure_runner()).agent
+        from adk_project.benchmarks.load_driver import configure_offline
+        from adk_project.benchmarks.stub_llm import install_stub_llm
+
+        replay, replay_url = await start_replay_server()
+        configure_offline(replay_url)
+        install_stub_llm(root_agent)
+        resp = await client.post("/predict", json={"instances": [{"text": f"{replay_url}/article/bench-1"}]})
+        prediction = resp.json()["predictions"][0]
+        if prediction["error"] or not prediction["result"] or prediction["result"].get("error"):
+            raise RuntimeError(f"first prediction failed: {prediction}")
+        predicted = time.time()
+        await replay.cleanup()
+
+    server.should_exit = True
+    await serving
+    return {
+        "interpreter_s": import_start - start,
+        "import_s": imported - import_start,
+        "first_health_s": healthy - start,
+        "first_prediction_s": predicted - start,
+    }
+
+
+def run_child() -> dict:
+    env = dict(os.environ, FACTOS_WARMUP_URLS=os.getenv("FACTOS_WARMUP_URLS", "http://127.0.0.1:9/"))
+    start = time.time()
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "adk_project.benchmarks.bench_startup", CHILD_FLAG, str(start)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def top_imports(module: str, limit: int):
+    """Returns the ``limit`` slowest imports (cumulative µs) of ``module`` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == CHILD_FLAG:
+        print(json.dumps(asyncio.run(_child(float(argv[1])))))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--importtime", type=int, default=0, help="also list the N slowest imports of the API module")
+    args = parser.parse_args(argv)
+
+    runs = [run_child() for _ in range(args.runs)]
+    print(f"{'metric':22} {'median s':>9} {'min s':>8} {'max s':>8}")
+    for metric in ("interpreter_s", "import_s", "first_health_s", "first_prediction_s"):
+        values = [r[metric] for r in runs]
+        print(f"{metric:22} {statistics.median(values):9.3f} {min(values):8.3f} {max(values):8.3f}")
+    if args.importtime:
+        print("\nslowest imports of adk_project.api.main:")
+        for cumulative_us, name in top_imports("adk_project.api.main", args.importtime):
+            print(f"{cumulative_us / 1000:10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Generador de carga offline para el pipeline FactosAgent.
+
+Levanta el servidor de replay, sustituye Gemini por el LLM enlatado y lanza
+peticiones concurrentes contra ``root_agent`` (``--target agent``), contra la
+ruta ``/predict`` de la app en proceso (``--target predict``) o contra un
+servidor ya desplegado (``--target http://host:puerto``; ese servidor debe
+estar configurado por su cuenta para no salir a la red). Reporta latencias
+p50/p95/p99, peticiones/s y RSS pico por etapa.
+
+Uso:
+    python -m adk_project.benchmarks.load_driver [--target agent] [--requests 200] [--concurrency 16]
+        [--distinct 50] [--llm-delay-ms 300] [--latency-ms 150] [--error-rate 0.02] [--max-p95-ms 0] [--json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import sys
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from adk_project.benchmarks.replay_server import factchecker_urls, start_replay_server
+from adk_project.benchmarks.stub_llm import install_stub_llm
+
+
+def current_rss_mib() -> float:
+    """Resident set size of this process right now (falls back to the lifetime peak)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mib()
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LoadReport:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {"pipeline": []}
+        self.peak_rss: Dict[str, float] = {}
+        self.errors = 0
+        self.requests = 0
+        self.wall = 0.0
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.latencies.setdefault(stage, []).append(seconds * 1000)
+
+    def sample_rss(self, stage: str) -> None:
+        self.peak_rss[stage] = max(self.peak_rss.get(stage, 0.0), current_rss_mib())
+
+    def summary(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "wall_s": round(self.wall, 3),
+            "rps": round(self.requests / self.wall, 2) if self.wall else 0.0,
+            "peak_rss_mib": round(peak_rss_mib(), 1),
+            "stages": {
+                stage: {
+                    "p50_ms": round(percentile(values, 50), 1),
+                    "p95_ms": round(percentile(values, 95), 1),
+                    "p99_ms": round(percentile(values, 99), 1),
+                    "peak_rss_mib": round(self.peak_rss.get(stage, 0.0), 1),
+                }
+                for stage, values in self.latencies.items()
+            },
+        }
+
+    def print(self, target: str, concurrency: int) -> None:
+        s = self.summary()
+        print(f"target: {target}  requests: {s['requests']}  concurrency: {concurrency}  errors: {s['errors']}")
+        print(f"wall: {s['wall_s']:.2f} s  throughput: {s['rps']:.2f} req/s  process peak RSS: {s['peak_rss_mib']:.1f} MiB")
+        print(f"{'stage':28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MiB':>9}")
+        for stage, row in s["stages"].items():
+            print(f"{stage:28} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} {row['peak_rss_mib']:9.1f}")
+
+
+def configure_offline(base_url: str) -> None:
+    """Points the scraper and the fact-checker search at the replay server."""
+    from adk_project.agents.fact_check_matcher_agent import sources
+    from adk_project.agents.smart_scraper_agent import article_extractor
+
+    for name, search_url in factchecker_urls(base_url).items():
+        sources.SOURCES[name] = replace(sources.SOURCES[name], search_url=search_url)
+    article_extractor.SCRAPER_REQUIRE_HTTPS = False
+    article_extractor.ALLOWED_DOMAINS = ["*"]
+
+
+def _failed(result) -> bool:
+    return not isinstance(result, dict) or bool(result.get("error"))
+
+
+async def drive_agent(url: str, report: LoadReport) -> None:
+    """One request straight through ``root_agent``, with per-stage spans and RSS."""
+    from adk_project.api import pipeline
+    from adk_project.telemetry import PipelineTrace
+
+    trace = PipelineTrace()
+    result = None
+    async for event in pipeline.pipeline_events(url):
+        trace.on_event(event)
+        report.sample_rss(event.author)
+        output = pipeline._stage_output(event)
+        if output is not None and output[0] == pipeline.final_output_key():
+            result = output[1]
+    report.record("pipeline", trace.finish())
+    report.sample_rss("pipeline")
+    for stage, seconds in trace.stages.items():
+        report.record(stage, seconds)
+    if _failed(result):
+        report.errors += 1
+
+
+async def drive_predict(client, predict_url: str, url: str, report: LoadReport) -> None:
+    """One single-instance POST to ``/predict``."""
+    start = time.perf_counter()
+    resp = await client.post(predict_url, json={"instances": [{"text": url}]}, timeout=120)
+    report.record("pipeline", time.perf_counter() - start)
+    report.sample_rss("pipeline")
+    if resp.status_code != 200:
+        report.errors += 1
+        return
+    prediction = resp.json()["predictions"][0]
+    if prediction.get("error") or _failed(prediction.get("result")):
+        report.errors += 1
+
+
+async def run_load(
+    target: str = "agent",
+    requests: int = 100,
+    concurrency: int = 8,
+    distinct: Optional[int] = None,
+    llm_delay_ms: float = 0.0,
+    llm_jitter_ms: float = 0.0,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: Optional[int] = None,
+) -> LoadReport:
+    """Runs ``requests`` pipeline executions, ``concurrency`` at a time, and returns the report."""
+    import httpx
+
+    from adk_project.agent import root_agent
+    from adk_project.http_client import close_transport
+
+    replay, base_url = await start_replay_server(
+        latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, seed=seed
+    )
+    distinct = distinct or requests
+    urls = [f"{base_url}/article/bench-{i % distinct}" for i in range(requests)]
+    report = LoadReport()
+    client = None
+    if target == "agent":
+        drive = lambda url: drive_agent(url, report)  # noqa: E731
+    else:
+        if target == "predict":
+            from adk_project.api.main import app
+
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://factos")
+            predict_url = "/predict"
+        else:
+            client = httpx.AsyncClient()
+            predict_url = target.rstrip("/") + "/predict"
+        drive = lambda url: drive_predict(client, predict_url, url, report)  # noqa: E731
+    if target in ("agent", "predict"):
+        configure_offline(base_url)
+        install_stub_llm(root_agent, llm_delay_ms, llm_jitter_ms)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(url: str) -> None:
+        async with semaphore:
+            try:
+                await drive(url)
+            except Exception as exc:
+                report.errors += 1
+                print(f"--- request failed: {type(exc).__name__}: {exc} ---")
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(url) for url in urls))
+    finally:
+        report.wall = time.perf_counter() - start
+        report.requests = len(urls)
+        if client is not None:
+            await client.aclose()
+        await close_transport()
+        await replay.cleanup()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="agent", help="agent, predict or the base URL of a running server")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=None, help="distinct article URLs (default: one per request)")
+    parser.add_argument("--llm-delay-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="replay server latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-p95-ms", type=float, default=0.0, help="exit non-zero if the pipeline p95 exceeds this")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_load(
+            target=args.target,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            distinct=args.distinct,
+            llm_delay_ms=args.llm_delay_ms,
+            llm_jitter_ms=args.llm_jitter_ms,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+    )
+    if args.json:
+        print(json.dumps(report.summary(), indent=2))
+    else:
+        report.print(args.target, args.concurrency)
+    p95 = report.summary()["stages"]["pipeline"]["p95_ms"]
+    if args.max_p95_ms and p95 > args.max_p95_ms:
+        print(f"--- p95 {p95:.1f} ms exceeds budget {args.max_p95_ms:.1f} ms ---")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Servidor local que reproduce páginas grabadas de factcheck.org, apnews.com y
+artículos de noticias, con latencia y tasa de errores configurables.
+
+Uso:
+    python -m adk_project.benchmarks.replay_server [--port 8081] [--latency-ms 150] [--jitter-ms 50] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+PAGES = {
+    "factcheck.org": "factcheck_org_search.html",
+    "apnews.com": "apnews_search.html",
+    "article": "article.html",
+}
+
+
+def load_pages(fixtures_dir: str = FIXTURES_DIR) -> Dict[str, str]:
+    pages = {}
+    for name, filename in PAGES.items():
+        with open(os.path.join(fixtures_dir, filename), encoding="utf-8") as f:
+            pages[name] = f.read()
+    return pages
+
+
+def make_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None) -> web.Application:
+    """Builds the replay app; every response waits ``latency_ms ± jitter_ms`` and fails with ``error_rate``."""
+    pages = load_pages()
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+
+    @web.middleware
+    async def simulate_network(request, handler):
+        stats["requests"] += 1
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return web.Response(status=503, text="replay: injected error")
+        return await handler(request)
+
+    def html(body: str) -> web.Response:
+        return web.Response(text=body, content_type="text/html", charset="utf-8")
+
+    async def factcheck_org(request):
+        return html(pages["factcheck.org"])
+
+    async def apnews(request):
+        return html(pages["apnews.com"])
+
+    async def article(request):
+        slug = request.match_info["slug"]
+        number = re.search(r"\d+", slug)
+        body = pages["article"].replace("__SLUG__", slug).replace("__SLUG_NUM__", number.group(0) if number else "12")
+        return html(body)
+
+    app = web.Application(middlewares=[simulate_network])
+    app["stats"] = stats
+    app.router.add_get("/factcheck.org/", factcheck_org)
+    app.router.add_get("/apnews.com/search", apnews)
+    app.router.add_get("/article/{slug}", article)
+    return app
+
+
+def factchecker_urls(base_url: str) -> Dict[str, str]:
+    """Search URL templates that point the registered fact-checker sources at the replay server."""
+    return {
+        "factcheck.org": f"{base_url}/factcheck.org/?s={{query}}",
+        "apnews.com": f"{base_url}/apnews.com/search?q={{query}}",
+    }
+
+
+async def start_replay_server(host: str = "127.0.0.1", port: int = 0, **options) -> Tuple[web.AppRunner, str]:
+    """Starts the server in the running loop; returns ``(runner, base_url)``. Stop it with ``runner.cleanup()``."""
+    runner = web.AppRunner(make_app(**options))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    app = make_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Almacén de textos direccionado por contenido.
+
+El cuerpo de cada artículo se guarda una sola vez bajo su sha256; el estado
+de sesión y los eventos solo llevan la referencia y un extracto corto. Nivel
+en memoria (LRU acotado en bytes UTF-8) y, con ``FACTOS_BLOB_DIR``, un nivel
+en disco compartido entre workers del nodo. El disco se barre cada
+``FACTOS_BLOB_SWEEP_INTERVAL`` segundos: caducan los ficheros no leídos en
+``FACTOS_BLOB_DISK_TTL`` y, por encima de ``FACTOS_BLOB_DISK_MAX_BYTES``, se
+borran los menos recientes. Los temporales de una escritura en curso solo se
+borran pasados ``FACTOS_BLOB_TMP_GRACE`` segundos (restos de un worker caído).
+La E/S de disco corre fuera del event loop.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+
+from adk_project.cache.memory import LRUCache
+from adk_project.telemetry import register_cache
+
+BLOB_MAX_ENTRIES = int(os.getenv("FACTOS_BLOB_MAX_ENTRIES", "2048"))
+BLOB_MAX_BYTES = int(os.getenv("FACTOS_BLOB_MAX_BYTES", str(64 * 1024 * 1024)))
+BLOB_TTL = int(os.getenv("FACTOS_BLOB_TTL", "3600"))
+# Vacío = solo memoria.
+BLOB_DIR = os.getenv("FACTOS_BLOB_DIR", "")
+BLOB_DISK_TTL = int(os.getenv("FACTOS_BLOB_DISK_TTL", "86400"))
+BLOB_DISK_MAX_BYTES = int(os.getenv("FACTOS_BLOB_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+BLOB_SWEEP_INTERVAL = int(os.getenv("FACTOS_BLOB_SWEEP_INTERVAL", "300"))
+BLOB_TMP_GRACE = int(os.getenv("FACTOS_BLOB_TMP_GRACE", "600"))
+PREVIEW_CHARS = int(os.getenv("FACTOS_BLOB_PREVIEW_CHARS", "280"))
+
+REF_PREFIX = "sha256:"
+TMP_SUFFIX = ".tmp"
+
+
+def preview(text: str, max_chars: int = PREVIEW_CHARS) -> str:
+    """First ``max_chars`` of ``text``, cut at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+def utf8_size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+class BlobStore:
+    """Content-addressed text store: memory LRU in front of an optional, size-capped directory."""
+
+    def __init__(self, memory: LRUCache, directory: str = "", ttl: float = BLOB_TTL,
+                 disk_ttl: float = BLOB_DISK_TTL, disk_max_bytes: int = BLOB_DISK_MAX_BYTES,
+                 sweep_interval: float = BLOB_SWEEP_INTERVAL, tmp_grace: float = BLOB_TMP_GRACE):
+        self.memory = memory
+        self.directory = directory
+        self.ttl = ttl
+        self.disk_ttl = disk_ttl
+        self.disk_max_bytes = disk_max_bytes
+        self.sweep_interval = sweep_interval
+        self.tmp_grace = tmp_grace
+        self.hits = self.disk_hits = self.misses = self.stores = self.disk_evictions = 0
+        self._swept_at = 0.0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _write(self, digest: str, text: str) -> None:
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Único por proceso e hilo: dos escrituras del mismo blob no comparten temporal.
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}{TMP_SUFFIX}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _read(self, digest: str) -> Optional[str]:
+        try:
+            with open(self._path(digest), encoding="utf-8") as f:
+                text = f.read()
+            # mtime = último uso, para caducar y desalojar por antigüedad.
+            os.utime(self._path(digest))
+            return text
+        except FileNotFoundError:
+            return None
+
+    def sweep(self) -> int:
+        """Deletes blobs unused for ``disk_ttl``, then the least recently used beyond ``disk_max_bytes``.
+
+        Temporary files are left alone unless older than ``tmp_grace``: a
+        younger one may be another worker's write in progress.
+        """
+        files = []
+        abandoned = time.time() - self.tmp_grace
+        removed = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if name.endswith(TMP_SUFFIX):
+                        if stat.st_mtime < abandoned:
+                            os.remove(path)
+                            removed += 1
+                        continue
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        expires = time.time() - self.disk_ttl
+        for mtime, size, path in files:
+            if mtime >= expires and total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self.disk_evictions += removed
+        return removed
+
+    def _sweep_due(self) -> bool:
+        now = time.monotonic()
+        if now - self._swept_at < self.sweep_interval:
+            return False
+        self._swept_at = now
+        return True
+
+    async def put(self, text: str) -> str:
+        """Stores ``text`` (idempotent) and returns its reference."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        ref = REF_PREFIX + digest
+        if self.memory.get(ref) is None:
+            self.memory.set(ref, text, self.ttl)
+            self.stores += 1
+        if self.directory:
+            await asyncio.to_thread(self._write, digest, text)
+            if self._sweep_due():
+                await asyncio.to_thread(self.sweep)
+        return ref
+
+    async def get(self, ref: str) -> Optional[str]:
+        """Returns the text for ``ref`` or None if it was evicted from every tier."""
+        entry = self.memory.get(ref)
+        if entry is not None:
+            self.hits += 1
+            return entry.value
+        digest = ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else ""
+        if self.directory and digest:
+            text = await asyncio.to_thread(self._read, digest)
+            if text is not None:
+                self.disk_hits += 1
+                self.memory.set(ref, text, self.ttl)
+                return text
+        self.misses += 1
+        return None
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.memory.evictions,
+            "disk_evictions": self.disk_evictions,
+            "entries": len(self.memory),
+        }
+
+
+BLOBS = BlobStore(LRUCache(max_entries=BLOB_MAX_ENTRIES, max_bytes=BLOB_MAX_BYTES, sizeof=utf8_size), BLOB_DIR)
+register_cache("blobs", BLOBS.stats)
@@ -0,0 +1,28 @@
+import os
+
+from .memory import CacheEntry, LRUCache
+from .coalescing import AsyncCache, SingleFlight
+from .sqlite import VACUUM_INTERVAL, SQLiteCache
+
+# "memory" (por proceso) o "sqlite" (compartida entre workers del nodo).
+CACHE_BACKEND = os.getenv("FACTOS_CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("FACTOS_CACHE_PATH", "/tmp/factos/cache.sqlite3")
+
+_sqlite_backends = {}
+
+
+def make_backend(namespace: str, max_entries: int = 1024, max_bytes=None):
+    """Builds the configured cache backend for ``namespace``."""
+    if CACHE_BACKEND == "sqlite":
+        if namespace not in _sqlite_backends:
+            # Un solo hilo de vacuum por proceso basta: purga todos los namespaces.
+            vacuum_interval = 0 if _sqlite_backends else VACUUM_INTERVAL
+            _sqlite_backends[namespace] = SQLiteCache(CACHE_PATH, namespace=namespace, vacuum_interval=vacuum_interval)
+        return _sqlite_backends[namespace]
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def close_backends() -> None:
+    """Closes the SQLite backends (connections and vacuum thread) on shutdown."""
+    for backend in _sqlite_backends.values():
+        backend.close()
@@ -0,0 +1,140 @@
+"""
+Caché asíncrona con coalescencia de peticiones y stale-while-revalidate.
+"""
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from adk_project.deadline import current_deadline
+
+
+def _expiry() -> float:
+    deadline = current_deadline()
+    return math.inf if deadline is None or deadline.expires_at is None else deadline.expires_at
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one in-flight task.
+
+    The task runs under the deadline of the caller that started it, so a
+    caller only joins it if that deadline lasts at least as long as its
+    own; a caller with a longer budget starts a fresh task instead of
+    inheriting an earlier cut-off (and its ``deadline`` failures).
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._expires: Dict[asyncio.Task, float] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        expires = _expiry()
+        if task is None or self._expires[task] < expires:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._expires[task] = expires
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+        # shield: si un solicitante se cancela, el resto sigue esperando el mismo resultado;
+        # cuando se va el último, la tarea se cancela (con sus fetches y llamadas a modelo).
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                self._forget(key, task)
+                task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if task.done():
+            self._expires.pop(task, None)
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+
+class AsyncCache:
+    """Read-through cache over a backend with ``get``/``set`` (``LRUCache``, ``SQLiteCache``).
+
+    Fresh entries are returned directly, stale-but-usable entries are returned
+    while a single background refresh runs, and concurrent misses for the same
+    key share one fetch.
+    """
+
+    def __init__(self, backend, ttl: float, stale_ttl: float = 0, name: str = "cache"):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self._flight = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+
+    async def get(self, key: str):
+        """Returns the cache entry for ``key`` (fresh or stale), or None."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.backend.get, key)
+        return self.backend.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        args = (key, value, self.ttl if ttl is None else ttl, self.stale_ttl)
+        if self.backend.blocking:
+            await asyncio.to_thread(self.backend.set, *args)
+        else:
+            self.backend.set(*args)
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        value = await fetch()
+        await self.set(key, value, ttl)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch, ttl: Optional[float]) -> None:
+        if key in self._flight:
+            return
+
+        async def refresh():
+            try:
+                await self._flight.do(key, lambda: self._fetch_and_store(key, fetch, ttl))
+            except Exception:
+                self.refresh_errors += 1
+
+        task = asyncio.ensure_future(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        entry = await self.get(key)
+        if entry is not None:
+            if time.time() < entry.expires_at:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background(key, fetch, ttl)
+            return entry.value
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._fetch_and_store(key, fetch, ttl))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "refresh_errors": self.refresh_errors,
+            "entries": len(self.backend),
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,163 @@
+"""
+Normalización de afirmaciones e índice MinHash/LSH de casi-duplicados.
+
+Dos afirmaciones que solo difieren en mayúsculas, puntuación, espacios o
+palabras vacías producen la misma clave; las negaciones y el orden de las
+palabras se conservan, así que "X causa Y" y "X no causa Y" nunca coinciden.
+Las reformulaciones leves se resuelven con similitud de Jaccard sobre
+palabras y bigramas de palabras (que conservan el orden), exigiendo los
+mismos números y negaciones.
+"""
+import hashlib
+import os
+import random
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+NEAR_DUP_THRESHOLD = float(os.getenv("FACTOS_NEAR_DUP_THRESHOLD", "0.8"))
+
+# Números con separadores decimales/miles y porcentaje se conservan tal cual.
+_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)*%?|[^\W\d_]+|\d+", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d")
+_CONTRACTION_RE = re.compile(r"n['’]t\b")
+
+# Negaciones: invierten el sentido de la afirmación, nunca son palabras vacías.
+NEGATIONS = frozenset("""
+not no never nor none nobody nothing neither without
+nunca ni jamas tampoco nadie nada ningun ninguna ninguno sin
+""".split())
+
+STOP_WORDS = frozenset("""
+a an the and or but if of to in on at by for with from as into about over after before
+is are was were be been being am do does did has have had will would can could should may might
+that this these those it its they them their there here he she his her we our you your i me my
+so than then too very just also which who whom whose what when where why how all any
+el la los las un una unos unas y o u pero si de del al en con por para sobre entre
+es son fue fueron ser sido está están estaba han ha hay que se su sus lo le les este esta
+estos estas ese esa eso muy más mas ya también como cuando donde quien cual
+""".split())
+
+_MERSENNE = (1 << 61) - 1
+
+
+def claim_words(text: str) -> List[str]:
+    """Unicode-folded, stop-word-free tokens of a claim in order; numbers and negations kept verbatim."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _CONTRACTION_RE.sub(" not", text)
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOP_WORDS]
+
+
+def claim_tokens(text: str) -> FrozenSet[str]:
+    return frozenset(claim_words(text))
+
+
+def claim_shingles(text: str) -> FrozenSet[str]:
+    """Words plus ordered word bigrams, so swapping subject and object changes the set."""
+    words = claim_words(text)
+    return frozenset(words) | frozenset(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def normalize_claim(text: str) -> str:
+    return " ".join(claim_words(text))
+
+
+def claim_key(text: str) -> str:
+    return hashlib.sha256(normalize_claim(text).encode("utf-8")).hexdigest()
+
+
+def _numbers(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(t for t in tokens if " " not in t and _NUMBER_RE.search(t))
+
+
+def _negations(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return tokens & NEGATIONS
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashIndex:
+    """LSH index over MinHash signatures of claim shingle sets (see ``claim_shingles``).
+
+    ``query`` returns the key of a previously added claim whose Jaccard
+    similarity is at least ``threshold`` and whose numbers and negations
+    match exactly, so "90% of cases" never reuses results for "50% of
+    cases", a long claim never reuses those of its own negation and
+    "Spain beat England" never reuses those of "England beat Spain".
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        max_entries: int = 50000,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+        self._tokens: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._bands: Dict[str, Tuple] = {}
+        self._buckets: List[Dict[Tuple, set]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def signature(self, tokens: FrozenSet[str]) -> List[int]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big")
+            for t in tokens
+        ] or [0]
+        return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, sig: List[int]) -> List[Tuple]:
+        return [tuple(sig[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    def add(self, key: str, tokens: FrozenSet[str]) -> None:
+        if key in self._tokens:
+            self._tokens.move_to_end(key)
+            return
+        band_keys = self._band_keys(self.signature(tokens))
+        self._tokens[key] = tokens
+        self._bands[key] = band_keys
+        for bucket, band in zip(self._buckets, band_keys):
+            bucket.setdefault(band, set()).add(key)
+        while len(self._tokens) > self.max_entries:
+            self.remove(next(iter(self._tokens)))
+
+    def remove(self, key: str) -> None:
+        self._tokens.pop(key, None)
+        for bucket, band in zip(self._buckets, self._bands.pop(key, ())):
+            members = bucket.get(band)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band]
+
+    def query(self, tokens: FrozenSet[str]) -> Optional[Tuple[str, float]]:
+        """Returns ``(key, similarity)`` of the best near-duplicate, or None."""
+        candidates = set()
+        for bucket, band in zip(self._buckets, self._band_keys(self.signature(tokens))):
+            candidates |= bucket.get(band, set())
+        numbers, negations = _numbers(tokens), _negations(tokens)
+        best = None
+        for key in candidates:
+            other = self._tokens[key]
+            if _numbers(other) != numbers or _negations(other) != negations:
+                continue
+            sim = jaccard(tokens, other)
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (key, sim)
+        return best
@@ -0,0 +1,88 @@
+"""
+Backend de caché en memoria: LRU acotado por número de entradas y bytes.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+# Cada cuántas escrituras se barren las entradas ya caducadas.
+PURGE_EVERY = 256
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float    # fresca hasta aquí
+    stale_until: float   # utilizable (stale-while-revalidate) hasta aquí
+    size: int
+
+
+def estimate_size(value: Any) -> int:
+    """Approximates the footprint of a JSON-like value by its encoded length."""
+    return len(json.dumps(value, default=str))
+
+
+class LRUCache:
+    """In-process LRU store with per-entry TTL and entry/byte bounds."""
+
+    blocking = False
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.evictions = 0
+        self.total_bytes = 0
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry.stale_until:
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        now = time.time()
+        self.delete(key)
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl, self.sizeof(value))
+        self._data[key] = entry
+        self.total_bytes += entry.size
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._data) > 1
+        ):
+            _, evicted = self._data.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def purge_expired(self) -> int:
+        """Drops entries past their stale window; returns how many were removed."""
+        now = time.time()
+        expired = [k for k, e in self._data.items() if now >= e.stale_until]
+        for key in expired:
+            self.delete(key)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.total_bytes = 0
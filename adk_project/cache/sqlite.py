@@ -0,0 +1,134 @@
+"""
+Backend de caché persistente en SQLite (modo WAL), compartido por todos los
+workers de un mismo nodo.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, List, Optional
+
+from .memory import CacheEntry
+
+VACUUM_INTERVAL = float(os.getenv("FACTOS_CACHE_VACUUM_INTERVAL", "300"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_stale_until ON cache (stale_until);
+"""
+
+
+def encode_value(value: Any) -> bytes:
+    """Serializes a JSON-like value as compact, zlib-compressed JSON."""
+    return zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def decode_value(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+class SQLiteCache:
+    """Cache backend with the same ``get``/``set`` contract as ``LRUCache``.
+
+    Each thread gets its own connection; WAL lets readers in every worker
+    proceed while one writer commits. A daemon thread periodically deletes
+    expired rows and returns free pages to the filesystem.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, namespace: str = "default", vacuum_interval: float = VACUUM_INTERVAL):
+        self.path = path
+        self.namespace = namespace
+        self.evictions = 0
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        # auto_vacuum solo tiene efecto al crear la base de datos.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+        self._stop = threading.Event()
+        self._vacuum_thread: Optional[threading.Thread] = None
+        if vacuum_interval > 0:
+            self._vacuum_thread = threading.Thread(target=self._vacuum_loop, args=(vacuum_interval,), daemon=True)
+            self._vacuum_thread.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Solo la usa su hilo; check_same_thread=False permite cerrarla desde close().
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def __len__(self) -> int:
+        (count,) = self._conn().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ? AND stale_until > ?",
+            (self.namespace, time.time()),
+        ).fetchone()
+        return count
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._conn().execute(
+            "SELECT value, expires_at, stale_until FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or time.time() >= row[2]:
+            return None
+        return CacheEntry(decode_value(row[0]), row[1], row[2], len(row[0]))
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, stale_until) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, encode_value(value), now + ttl, now + ttl + stale_ttl),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def purge_expired(self) -> int:
+        """Deletes rows past their stale window (all namespaces)."""
+        cur = self._conn().execute("DELETE FROM cache WHERE stale_until <= ?", (time.time(),))
+        self.evictions += cur.rowcount
+        return cur.rowcount
+
+    def vacuum(self) -> None:
+        self.purge_expired()
+        conn = self._conn()
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _vacuum_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.vacuum()
+            except sqlite3.Error as exc:
+                print(f"--- Cache vacuum failed: {exc} ---")
+
+    def close(self) -> None:
+        """Stops the vacuum thread and closes every thread's connection (a later call reconnects)."""
+        self._stop.set()
+        if self._vacuum_thread is not None and self._vacuum_thread is not threading.current_thread():
+            self._vacuum_thread.join()
+            self._vacuum_thread = None
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for conn in conns:
+            conn.close()
@@ -0,0 +1,120 @@
+"""
+Plazo por petición para el pipeline.
+
+El plazo se fija en la API (cabecera ``X-Deadline-Ms``) o con
+``FACTOS_DEADLINE_MS`` y viaja en una ContextVar junto a la invocación, de
+modo que cada agente y herramienta consulta el presupuesto restante sin
+recibirlo como parámetro. Una etapa sin presupuesto suficiente se degrada
+(sin LLM, sin scraping en vivo) y queda anotada en ``degraded_stages``; al
+agotarse el plazo se cancelan los fetches y llamadas a modelo pendientes.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from adk_project.telemetry import DEGRADED_STAGES
+
+# 0 = sin plazo por defecto.
+DEADLINE_MS = int(os.getenv("FACTOS_DEADLINE_MS", "0"))
+# Presupuesto mínimo para lanzar una llamada al modelo o el scraping en vivo.
+LLM_MIN_BUDGET_S = float(os.getenv("FACTOS_LLM_MIN_BUDGET_S", "3"))
+LIVE_SCRAPE_MIN_BUDGET_S = float(os.getenv("FACTOS_LIVE_SCRAPE_MIN_BUDGET_S", "2"))
+# Tiempo reservado a las etapas siguientes cuando se acota una espera (p. ej. el scraping en vivo).
+DEADLINE_RESERVE_S = float(os.getenv("FACTOS_DEADLINE_RESERVE_S", "1"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The pipeline ran out of time in the middle of a stage."""
+
+
+class Deadline:
+    """Absolute expiry (``time.monotonic``) of one pipeline run and the stages it degraded."""
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+        self.degraded: List[str] = []
+
+    def remaining(self, reserve: float = 0.0) -> Optional[float]:
+        """Seconds left minus ``reserve`` (never negative); None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    def allows(self, seconds: float) -> bool:
+        left = self.remaining()
+        return left is None or left >= seconds
+
+    def degrade(self, stage: str) -> None:
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+            DEGRADED_STAGES.labels(stage=stage).inc()
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("factos_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def new_deadline(seconds: Optional[float] = None) -> Deadline:
+    """A fresh deadline ``seconds`` from now, never later than the enclosing one.
+
+    Without ``seconds`` it inherits the enclosing deadline or, if there is
+    none, ``FACTOS_DEADLINE_MS``.
+    """
+    parent = _current.get()
+    if seconds is None and parent is None and DEADLINE_MS > 0:
+        seconds = DEADLINE_MS / 1000
+    candidates = [time.monotonic() + seconds] if seconds is not None else []
+    if parent is not None and parent.expires_at is not None:
+        candidates.append(parent.expires_at)
+    return Deadline(min(candidates) if candidates else None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def has_budget(seconds: float) -> bool:
+    """True if the current run (if any) still has ``seconds`` left."""
+    deadline = _current.get()
+    return deadline is None or deadline.allows(seconds)
+
+
+def remaining(reserve: float = 0.0) -> Optional[float]:
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining(reserve)
+
+
+def degrade(stage: str) -> None:
+    """Records that ``stage`` ran in degraded mode for the current run."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.degrade(stage)
+
+
+def degraded_stages() -> List[str]:
+    deadline = _current.get()
+    return list(deadline.degraded) if deadline is not None else []
+
+
+async def next_within(events, deadline: Deadline):
+    """``anext(events)`` with ``deadline`` current; the step (and every fetch and model call under it) is cancelled at expiry."""
+    timeout = asyncio.timeout(deadline.remaining())
+    try:
+        with deadline_scope(deadline):
+            async with timeout:
+                return await anext(events)
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceeded("pipeline deadline exceeded") from None
+        raise
@@ -0,0 +1,273 @@
+"""
+Cliente HTTP compartido por todo el proceso.
+
+Mantiene un pool de conexiones persistente (keep-alive, caché DNS, límites
+por host) en lugar de abrir una sesión nueva por petición. El transporte es
+intercambiable: ``aiohttp`` por defecto, o ``httpx`` con HTTP/2 si está
+instalado ``httpx[http2]`` (``FACTOS_HTTP_TRANSPORT=httpx``).
+"""
+import asyncio
+import os
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+from adk_project.telemetry import HTTP_DURATION
+
+HTTP_TRANSPORT = os.getenv("FACTOS_HTTP_TRANSPORT", "aiohttp")
+HTTP_LIMIT = int(os.getenv("FACTOS_HTTP_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("FACTOS_HTTP_LIMIT_PER_HOST", "10"))
+# Conexiones ociosas que el pool conserva en total (httpx no tiene límite por host).
+HTTP_KEEPALIVE_LIMIT = int(os.getenv("FACTOS_HTTP_KEEPALIVE_LIMIT", "20"))
+HTTP_KEEPALIVE = float(os.getenv("FACTOS_HTTP_KEEPALIVE", "30"))
+HTTP_DNS_TTL = int(os.getenv("FACTOS_HTTP_DNS_TTL", "300"))
+HTTP_TIMEOUT = float(os.getenv("FACTOS_HTTP_TIMEOUT", "10"))
+
+# Using a realistic user-agent to avoid being blocked.
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class HttpResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    text: str
+
+
+class StreamingResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    chunks: AsyncIterator[bytes]
+
+
+def _pinned_resolver(addresses: List[str]):
+    """aiohttp resolver that answers every lookup with ``addresses`` (already checked by the caller)."""
+    from aiohttp.abc import AbstractResolver
+
+    class PinnedResolver(AbstractResolver):
+        async def resolve(self, host, port=0, family=socket.AF_INET):
+            return [
+                {
+                    "hostname": host,
+                    "host": address,
+                    "port": port,
+                    "family": socket.AF_INET6 if ":" in address else socket.AF_INET,
+                    "proto": 0,
+                    "flags": socket.AI_NUMERICHOST,
+                }
+                for address in addresses
+            ]
+
+        async def close(self) -> None:
+            pass
+
+    return PinnedResolver()
+
+
+@asynccontextmanager
+async def _timed_fetch(url: str):
+    """Records the fetch latency; the block sets ``outcome["status"]``."""
+    outcome = {"status": "error"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        HTTP_DURATION.labels(host=urlsplit(url).hostname or "", status=str(outcome["status"])).observe(
+            time.perf_counter() - start
+        )
+
+
+class AiohttpTransport:
+    """HTTP/1.1 transport backed by one long-lived ``aiohttp.ClientSession``."""
+
+    def __init__(self):
+        self._session = None
+        self._loop = None
+        self._closing = set()
+
+    def session(self):
+        """Returns the shared session, creating it on first use (or on a new event loop)."""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is not loop:
+            self._discard_session()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_LIMIT,
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE,
+                ttl_dns_cache=HTTP_DNS_TTL,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+            self._loop = loop
+        return self._session
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = HTTP_TIMEOUT) -> HttpResponse:
+        import aiohttp
+
+        async with _timed_fetch(url) as outcome:
+            async with self.session().get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                outcome["status"] = resp.status
+                return HttpResponse(resp.status, dict(resp.headers), await resp.text())
+
+    async def post_json(
+        self,
+        url: str,
+        payload,
+        timeout: float = HTTP_TIMEOUT,
+        follow_redirects: bool = True,
+        addresses: Optional[List[str]] = None,
+    ) -> HttpResponse:
+        """POSTs ``payload`` as JSON; ``addresses`` pins the connection to those IPs of the URL's host."""
+        import aiohttp
+
+        async with _timed_fetch(url) as outcome:
+            if addresses:
+                # Sesión de un solo uso: el pool compartido resolvería el host por su cuenta.
+                connector = aiohttp.TCPConnector(resolver=_pinned_resolver(addresses), use_dns_cache=False)
+                session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+            else:
+                session = None
+            try:
+                async with (session or self.session()).post(
+                    url,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                    allow_redirects=follow_redirects,
+                ) as resp:
+                    outcome["status"] = resp.status
+                    return HttpResponse(resp.status, dict(resp.headers), await resp.text())
+            finally:
+                if session is not None:
+                    await session.close()
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = HTTP_TIMEOUT, chunk_size: int = 16384):
+        """Yields a ``StreamingResponse``; leaving the block early releases the connection."""
+        import aiohttp
+
+        async with _timed_fetch(url) as outcome:
+            async with self.session().get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                outcome["status"] = resp.status
+                yield StreamingResponse(resp.status, dict(resp.headers), resp.content.iter_chunked(chunk_size))
+
+    def _discard_session(self) -> None:
+        """Closes the session left behind by another event loop."""
+        session, loop = self._session, self._loop
+        self._session = None
+        if loop.is_running():
+            # Loop de otro hilo: el cierre corre en él.
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # Loop parado o cerrado: aiohttp suelta el pool sin usarlo, así que se cierra desde el loop actual.
+            task = asyncio.ensure_future(session.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class HttpxTransport:
+    """HTTP/2-capable transport backed by ``httpx.AsyncClient``."""
+
+    def __init__(self):
+        self._client = None
+
+    def client(self):
+        import httpx
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=HTTP_LIMIT,
+                    max_keepalive_connections=HTTP_KEEPALIVE_LIMIT,
+                    keepalive_expiry=HTTP_KEEPALIVE,
+                ),
+            )
+        return self._client
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = HTTP_TIMEOUT) -> HttpResponse:
+        async with _timed_fetch(url) as outcome:
+            resp = await self.client().get(url, headers=headers, timeout=timeout)
+            outcome["status"] = resp.status_code
+            return HttpResponse(resp.status_code, dict(resp.headers), resp.text)
+
+    async def post_json(
+        self,
+        url: str,
+        payload,
+        timeout: float = HTTP_TIMEOUT,
+        follow_redirects: bool = True,
+        addresses: Optional[List[str]] = None,
+    ) -> HttpResponse:
+        """POSTs ``payload`` as JSON; ``addresses`` pins the connection to those IPs of the URL's host."""
+        import httpx
+
+        headers, extensions, target = None, None, httpx.URL(url)
+        if addresses:
+            # Se conecta a la IP ya comprobada; Host y SNI siguen siendo los del webhook.
+            headers = {"Host": target.netloc.decode("ascii")}
+            extensions = {"sni_hostname": target.host}
+            target = target.copy_with(host=addresses[0])
+        async with _timed_fetch(url) as outcome:
+            resp = await self.client().post(
+                target,
+                json=payload,
+                headers=headers,
+                timeout=timeout,
+                follow_redirects=follow_redirects,
+                extensions=extensions,
+            )
+            outcome["status"] = resp.status_code
+            return HttpResponse(resp.status_code, dict(resp.headers), resp.text)
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = HTTP_TIMEOUT, chunk_size: int = 16384):
+        async with _timed_fetch(url) as outcome:
+            async with self.client().stream("GET", url, headers=headers, timeout=timeout) as resp:
+                outcome["status"] = resp.status_code
+                yield StreamingResponse(resp.status_code, dict(resp.headers), resp.aiter_bytes(chunk_size))
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+
+TRANSPORTS: Dict[str, Callable] = {
+    "aiohttp": AiohttpTransport,
+    "httpx": HttpxTransport,
+}
+
+_transport = None
+
+
+def register_transport(name: str, factory: Callable) -> None:
+    """Registers a transport factory selectable through ``FACTOS_HTTP_TRANSPORT``."""
+    TRANSPORTS[name] = factory
+
+
+def get_transport():
+    """Returns the process-wide transport, creating it lazily."""
+    global _transport
+    if _transport is None:
+        _transport = TRANSPORTS[HTTP_TRANSPORT]()
+    return _transport
+
+
+async def close_transport() -> None:
+    """Closes pooled connections; called from the FastAPI lifespan on shutdown."""
+    global _transport
+    if _transport is not None:
+        await _transport.close()
+        _transport = None
@@ -0,0 +1,239 @@
+"""
+Política por dominio delante de las peticiones a fact-checkers.
+
+Cada host tiene un token bucket (límite de peticiones), un timeout adaptativo
+calculado con los percentiles de latencia observados, un circuit breaker que
+falla rápido tras errores consecutivos y, opcionalmente, una segunda petición
+"hedged" si la primera no ha respondido tras el p95. Los fallos se lanzan
+como ``FetchError`` con un motivo estructurado.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from adk_project.http_client import HttpResponse, get_transport
+from adk_project.telemetry import FETCH_FAILURES, HEDGED_REQUESTS
+
+DOMAIN_RATE = float(os.getenv("FACTOS_DOMAIN_RATE", "5"))  # peticiones/s sostenidas por host
+DOMAIN_BURST = int(os.getenv("FACTOS_DOMAIN_BURST", "10"))
+# Espera máxima por un token antes de rendirse con "rate_limited".
+DOMAIN_MAX_QUEUE_S = float(os.getenv("FACTOS_DOMAIN_MAX_QUEUE_S", "5"))
+TIMEOUT_DEFAULT = float(os.getenv("FACTOS_TIMEOUT_DEFAULT", "10"))
+TIMEOUT_MIN = float(os.getenv("FACTOS_TIMEOUT_MIN", "1"))
+TIMEOUT_MAX = float(os.getenv("FACTOS_TIMEOUT_MAX", "10"))
+TIMEOUT_P99_FACTOR = float(os.getenv("FACTOS_TIMEOUT_P99_FACTOR", "2"))
+LATENCY_WINDOW = int(os.getenv("FACTOS_LATENCY_WINDOW", "200"))
+LATENCY_MIN_SAMPLES = int(os.getenv("FACTOS_LATENCY_MIN_SAMPLES", "20"))
+BREAKER_THRESHOLD = int(os.getenv("FACTOS_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_S = float(os.getenv("FACTOS_BREAKER_RESET_S", "30"))
+HEDGE_ENABLED = os.getenv("FACTOS_HEDGE", "0") == "1"
+
+FAILURE_REASONS = ("circuit_open", "rate_limited", "timeout", "http_error", "network_error", "parse_error", "deadline")
+
+
+class FetchError(Exception):
+    """A policy-guarded fetch failed; ``reason`` is one of ``FAILURE_REASONS``."""
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.detail = detail
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"reason": self.reason, "detail": self.detail}
+
+
+class TokenBucket:
+    """Reservation-based token bucket: callers take a token and sleep off any debt."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how long the caller must wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def cancel(self) -> None:
+        self.tokens += 1
+
+    async def acquire(self, max_wait: float = math.inf) -> None:
+        wait = self.reserve()
+        if wait > max_wait:
+            self.cancel()
+            raise FetchError("rate_limited", f"next slot in {wait:.1f}s")
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class LatencyTracker:
+    """Sliding window of successful response times."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = LATENCY_MIN_SAMPLES):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+    def timeout(self) -> float:
+        p99 = self.percentile(99)
+        if p99 is None:
+            return TIMEOUT_DEFAULT
+        return min(TIMEOUT_MAX, max(TIMEOUT_MIN, p99 * TIMEOUT_P99_FACTOR))
+
+
+class CircuitBreaker:
+    """closed → open after ``threshold`` consecutive failures → half-open (one probe) after ``reset_s``."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset_s: float = BREAKER_RESET_S):
+        self.threshold = threshold
+        self.reset_s = reset_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_s - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "open" and self.retry_in() == 0:
+            self.state = "half_open"
+            return True
+        return self.state == "closed"
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Reopens the breaker if the half-open probe ended without a verdict (cancelled or rate-limited)."""
+        if self.state == "half_open":
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class DomainPolicy:
+    def __init__(self, host: str, rate: float = DOMAIN_RATE, burst: int = DOMAIN_BURST, hedge: bool = HEDGE_ENABLED,
+                 breaker_threshold: int = BREAKER_THRESHOLD, breaker_reset_s: float = BREAKER_RESET_S):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_s)
+        self.hedge = hedge
+
+    def _fail(self, reason: str, detail: str = "", trip: bool = True) -> FetchError:
+        if trip:
+            self.breaker.record_failure()
+        FETCH_FAILURES.labels(host=self.host, reason=reason).inc()
+        return FetchError(reason, detail)
+
+    async def _attempts(self, url: str, headers, timeout: float) -> HttpResponse:
+        """Primary request plus, if enabled and it outlives the p95, one hedged duplicate."""
+        fetch = lambda: get_transport().get(url, headers=headers, timeout=timeout)  # noqa: E731
+        hedge_after = self.latency.percentile(95) if self.hedge else None
+        if hedge_after is None or hedge_after >= timeout:
+            return await asyncio.wait_for(fetch(), timeout)
+
+        deadline = time.monotonic() + timeout
+        pending = {asyncio.ensure_future(fetch())}
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                wait = (hedge_after if not hedged else deadline - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wait), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not done and not hedged:
+                    hedged = True
+                    HEDGED_REQUESTS.labels(host=self.host).inc()
+                    pending.add(asyncio.ensure_future(fetch()))
+                elif not done:
+                    break
+            raise error or asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        if not self.breaker.allow():
+            raise self._fail("circuit_open", f"{self.host} failing; retry in {self.breaker.retry_in():.0f}s", trip=False)
+        probe = self.breaker.state == "half_open"
+        try:
+            return await self._guarded_get(url, headers)
+        finally:
+            # Sin éxito ni fallo registrado, la sonda no puede dejar el breaker medio abierto para siempre.
+            if probe:
+                self.breaker.release_probe()
+
+    async def _guarded_get(self, url: str, headers: Optional[Dict[str, str]]) -> HttpResponse:
+        try:
+            await self.bucket.acquire(DOMAIN_MAX_QUEUE_S)
+        except FetchError as exc:
+            raise self._fail(exc.reason, exc.detail, trip=False)
+        timeout = self.latency.timeout()
+        start = time.monotonic()
+        try:
+            resp = await self._attempts(url, headers, timeout)
+        except asyncio.TimeoutError:
+            raise self._fail("timeout", f"no response from {self.host} in {timeout:.1f}s")
+        except Exception as exc:
+            raise self._fail("network_error", type(exc).__name__)
+        self.latency.add(time.monotonic() - start)
+        if resp.status >= 500 or resp.status == 429:
+            raise self._fail("http_error", f"HTTP {resp.status}")
+        # Un 4xx significa que el host responde: no cuenta para el breaker.
+        self.breaker.record_success()
+        # 304 solo responde a GETs condicionales; quien los envía lo espera.
+        if resp.status not in (200, 304):
+            raise self._fail("http_error", f"HTTP {resp.status}", trip=False)
+        return resp
+
+_policies: Dict[str, DomainPolicy] = {}
+_overrides: Dict[str, Dict] = {}
+
+
+def configure_domain(host: str, **options) -> None:
+    """Overrides the policy options (rate, burst, hedge, breaker_*) for one host."""
+    _overrides[host] = options
+    _policies.pop(host, None)
+
+
+def get_policy(host: str) -> DomainPolicy:
+    if host not in _policies:
+        _policies[host] = DomainPolicy(host, **_overrides.get(host, {}))
+    return _policies[host]
+
+
+async def policy_get(url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+    """GETs ``url`` through its host's policy; raises ``FetchError`` on any failure."""
+    return await get_policy(urlsplit(url).hostname or "").get(url, headers)
+
+
+def reset_policies() -> None:
+    _policies.clear()
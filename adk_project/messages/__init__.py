@@ -0,0 +1,5 @@
+from .base import Message, MessageValidationError
+from .extracted_claim import ExtractedClaim
+from .match_results import Match, MatchResults, SourceFailure
+from .scored_result import ScoredResult
+from .validated_article import ValidatedArticle
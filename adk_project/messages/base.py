@@ -0,0 +1,172 @@
+"""
+Base de los mensajes A2A: dataclasses congeladas con ``__slots__``,
+validación rápida en los límites entre etapas y conversión compacta a dict.
+"""
+import typing
+from dataclasses import MISSING, fields
+from typing import Any, Callable, Dict, List, Tuple
+
+Converter = Callable[[Any, bool], Any]
+
+
+class MessageValidationError(ValueError):
+    """A payload does not match its A2A message type."""
+
+
+def _type_error(expected: str, value: Any) -> TypeError:
+    return TypeError(f"expected {expected}, got {type(value).__name__}")
+
+
+def _str(value: Any, lenient: bool) -> str:
+    if isinstance(value, str):
+        return value
+    raise _type_error("str", value)
+
+
+def _number(value: Any) -> Any:
+    """Parses a numeric string from model output ("3", "2.0"); anything else is returned as is."""
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    return value
+
+
+def _int(value: Any, lenient: bool) -> int:
+    if lenient:
+        value = _number(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise _type_error("int", value)
+
+
+def _float(value: Any, lenient: bool) -> float:
+    if lenient:
+        value = _number(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise _type_error("float", value)
+
+
+def _any(value: Any, lenient: bool) -> Any:
+    return value
+
+
+def _optional(convert: Converter) -> Converter:
+    return lambda value, lenient: None if value is None else convert(value, lenient)
+
+
+def _tuple(convert: Converter) -> Converter:
+    def convert_items(value: Any, lenient: bool) -> tuple:
+        if not isinstance(value, (list, tuple)):
+            raise _type_error("list", value)
+        if not lenient:
+            return tuple(convert(item, False) for item in value)
+        # Leniente: los elementos inválidos se descartan en vez de invalidar la lista entera.
+        items = []
+        for item in value:
+            try:
+                items.append(convert(item, True))
+            except (TypeError, ValueError):
+                continue
+        return tuple(items)
+
+    return convert_items
+
+
+def _message(cls) -> Converter:
+    return lambda value, lenient: cls.from_dict(value, lenient)
+
+
+def _converter(tp) -> Converter:
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if origin is typing.Union and type(None) in args:
+        (inner,) = [arg for arg in args if arg is not type(None)]
+        return _optional(_converter(inner))
+    if origin is tuple:
+        return _tuple(_converter(args[0]))
+    if isinstance(tp, type) and issubclass(tp, Message):
+        return _message(tp)
+    return {str: _str, int: _int, float: _float}.get(tp, _any)
+
+
+_SPECS: Dict[type, List[Tuple[str, Converter, bool, bool]]] = {}
+
+
+def _nullable(tp) -> bool:
+    return typing.get_origin(tp) is typing.Union and type(None) in typing.get_args(tp)
+
+
+def _spec(cls) -> List[Tuple[str, Converter, bool, bool]]:
+    """``(name, converter, required, nullable)`` per field, resolved once per class."""
+    spec = _SPECS.get(cls)
+    if spec is None:
+        hints = typing.get_type_hints(cls)
+        spec = _SPECS[cls] = [
+            (
+                f.name,
+                _converter(hints[f.name]),
+                f.default is MISSING and f.default_factory is MISSING,
+                _nullable(hints[f.name]),
+            )
+            for f in fields(cls)
+        ]
+    return spec
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Message):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    return value
+
+
+class Message:
+    """Mixin for the A2A message dataclasses (``@dataclass(frozen=True, slots=True)``)."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data: Any, lenient: bool = False):
+        """Validates ``data`` (a dict, e.g. parsed JSON) and builds the message; unknown keys are ignored.
+
+        With ``lenient`` (for model output) numeric strings are parsed, an
+        invalid field with a default falls back to it, an invalid ``Optional``
+        field becomes None and invalid list items are dropped; a missing
+        field, or an invalid required one that cannot be None, always raises
+        ``MessageValidationError``.
+        """
+        if isinstance(data, cls):
+            return data
+        if not isinstance(data, dict):
+            raise MessageValidationError(f"{cls.__name__}: expected an object, got {type(data).__name__}")
+        values = {}
+        for name, convert, required, nullable in _spec(cls):
+            if name not in data:
+                if required:
+                    raise MessageValidationError(f"{cls.__name__}.{name}: missing")
+                continue
+            try:
+                values[name] = convert(data[name], lenient)
+            except (TypeError, ValueError) as exc:
+                if lenient and not required:
+                    continue
+                if lenient and nullable:
+                    print(f"--- {cls.__name__}.{name}: {exc}; using None ---")
+                    values[name] = None
+                    continue
+                raise MessageValidationError(f"{cls.__name__}.{name}: {exc}") from None
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict; fields left as None are omitted to keep the payload compact."""
+        data = {}
+        for name, _, _, _ in _spec(type(self)):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = _plain(value)
+        return data
@@ -5,7 +5,9 @@ Contiene: claim, tokens_used
 
 from dataclasses import dataclass
 
-@dataclass
-class ExtractedClaim:
+from adk_project.messages.base import Message
+
+@dataclass(frozen=True, slots=True)
+class ExtractedClaim(Message):
     claim: str
-    tokens_used: int
+    tokens_used: int = 0
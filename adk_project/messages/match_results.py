@@ -1,11 +1,32 @@
 """
 Mensaje MatchResults
-Contiene: matches (lista de dicts con claim, source, confidence)
+Contiene: matches (registros Match con claim, source, confidence y, si se
+conocen, rating, publisher, date y trust_weight) y failures (fact-checkers no
+disponibles y el motivo)
 """
 
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Optional, Tuple
 
-@dataclass
-class MatchResults:
-    matches: List[Dict[str, object]]
+from adk_project.messages.base import Message
+
+@dataclass(frozen=True, slots=True)
+class Match(Message):
+    claim: str
+    source: str = ""
+    confidence: float = 0.0
+    rating: Optional[str] = None
+    publisher: Optional[str] = None
+    date: Optional[str] = None
+    trust_weight: Optional[float] = None
+
+@dataclass(frozen=True, slots=True)
+class SourceFailure(Message):
+    site: str
+    reason: str
+    detail: str = ""
+
+@dataclass(frozen=True, slots=True)
+class MatchResults(Message):
+    matches: Tuple[Match, ...] = ()
+    failures: Tuple[SourceFailure, ...] = ()
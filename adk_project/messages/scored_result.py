@@ -1,13 +1,24 @@
 """
 Mensaje ScoredResult
-Contiene: score (0-3), explanation, sources
+Contiene: score (0-3, None sin evidencia), label, main_claim, análisis,
+fuentes verificadas, recomendación y nivel de confianza; scored_by indica si
+puntuó el motor de reglas o el LLM
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Optional, Tuple
 
-@dataclass
-class ScoredResult:
-    score: int
-    explanation: str
-    sources: List[str]
+from adk_project.messages.base import Message
+
+@dataclass(frozen=True, slots=True)
+class ScoredResult(Message):
+    score: Optional[int]
+    label: str = ""
+    main_claim: str = ""
+    detailed_analysis: str = ""
+    verified_sources: Tuple[str, ...] = ()
+    recommendation: str = ""
+    media_literacy_tip: str = ""
+    confidence_level: int = 0
+    processing_time: Optional[float] = None
+    scored_by: str = "llm"
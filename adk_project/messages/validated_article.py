@@ -1,14 +1,23 @@
 """
 Mensaje ValidatedArticle
-Contiene: url, headline, byline, publish_date, full_text
+Contiene: url, headline, byline, publish_date, text_ref (referencia al texto
+en adk_project.blobstore), preview (extracto corto), etag/last_modified de la
+respuesta del origen y error si la URL no se pudo validar
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
-@dataclass
-class ValidatedArticle:
+from adk_project.messages.base import Message
+
+@dataclass(frozen=True, slots=True)
+class ValidatedArticle(Message):
     url: str
-    headline: str
-    byline: str
-    publish_date: str
-    full_text: str
+    headline: str = ""
+    byline: str = ""
+    publish_date: str = ""
+    text_ref: str = ""
+    preview: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
@@ -0,0 +1,281 @@
+"""
+Perfilado bajo demanda de peticiones concretas.
+
+Una petición con la cabecera ``X-Factos-Profile: <FACTOS_PROFILE_TOKEN>`` (o
+una fracción ``FACTOS_PROFILE_SAMPLE_RATE`` de ellas) se ejecuta bajo un
+profiler por muestreo: un hilo toma la pila del event loop cada
+``FACTOS_PROFILE_INTERVAL_MS`` cuando corre una tarea de esa petición, y la
+de los hilos del pool de parsing mientras trabajan para ella. Además se
+registra la línea temporal de sus tareas asyncio y de los eventos del
+pipeline. El perfil se escribe en ``FACTOS_PROFILE_DIR`` (speedscope y
+collapsed stacks) o se devuelve en la respuesta. Como mucho
+``FACTOS_PROFILE_MAX_CONCURRENT`` peticiones se perfilan a la vez.
+"""
+import asyncio
+import functools
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_TOKEN = os.getenv("FACTOS_PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("FACTOS_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("FACTOS_PROFILE_DIR", "profiles")
+PROFILE_MAX_CONCURRENT = int(os.getenv("FACTOS_PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_INTERVAL_MS = float(os.getenv("FACTOS_PROFILE_INTERVAL_MS", "5"))
+MAX_STACK_DEPTH = 128
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(root: str, frame) -> Stack:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return (root, *reversed(labels))
+
+
+def _coro_name(coro) -> str:
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class RequestProfile:
+    """Samples, task timeline and pipeline marks of one profiled request."""
+
+    def __init__(self, name: str, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.name = name
+        self.interval = interval_ms / 1000
+        self.samples: Counter = Counter()
+        self.tasks: Dict[asyncio.Task, Dict] = {}
+        self.marks: List[Dict] = []
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._threads: Dict[int, str] = {}
+        self._loop = None
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def _now_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def add_task(self, task: asyncio.Task) -> None:
+        record = {"name": task.get_name(), "coro": _coro_name(task.get_coro()), "start_ms": self._now_ms(),
+                  "end_ms": None, "samples": 0}
+        self.tasks[task] = record
+        task.add_done_callback(lambda _: record.update(end_ms=self._now_ms()))
+
+    def mark(self, label: str) -> None:
+        self.marks.append({"at_ms": self._now_ms(), "label": label})
+
+    def wrap_thread(self, fn: Callable) -> Callable:
+        """Wraps ``fn`` so the worker thread running it is sampled for this request."""
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            ident = threading.get_ident()
+            self._threads[ident] = threading.current_thread().name
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._threads.pop(ident, None)
+
+        return run
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        task = asyncio.current_task(self._loop)
+        record = self.tasks.get(task) if task is not None else None
+        if record is not None and self._loop_thread in frames:
+            record["samples"] += 1
+            self.samples[_stack(f"loop:{_coro_name(task.get_coro())}", frames[self._loop_thread])] += 1
+        for ident, thread_name in list(self._threads.items()):
+            if ident in frames:
+                self.samples[_stack(f"thread:{thread_name}", frames[ident])] += 1
+
+    def _run_sampler(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run_sampler, name=f"factos-profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stops sampling without waiting for the sampler thread (see ``join``)."""
+        self._stop.set()
+        self.finished = self._now_ms()
+
+    def join(self) -> None:
+        """Blocks until the sampler thread exits; call it off the event loop."""
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (``a;b;c count`` per line)."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def timeline(self) -> List[Dict]:
+        """Tasks of the request in creation order, with the samples each spent on the loop."""
+        return [
+            {**record, "cpu_ms": round(record["samples"] * self.interval * 1000, 1)}
+            for record in sorted(self.tasks.values(), key=lambda r: r["start_ms"])
+        ]
+
+    def speedscope(self) -> Dict:
+        """A sampled profile in speedscope's file format (https://www.speedscope.app)."""
+        frames: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.most_common():
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "factos",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def report(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "wall_ms": self.finished,
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.samples.values()),
+            "tasks": self.timeline(),
+            "marks": self.marks,
+        }
+
+    def inline(self) -> Dict:
+        """The whole profile as one JSON-able dict, for returning it in the response."""
+        return {**self.report(), "speedscope": self.speedscope(), "collapsed": self.collapsed()}
+
+    def write(self, directory: str = PROFILE_DIR) -> List[str]:
+        """Writes ``<id>.speedscope.json``, ``<id>.collapsed.txt`` and ``<id>.tasks.json``; returns the paths."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.id)
+        outputs = {
+            f"{base}.speedscope.json": json.dumps(self.speedscope()),
+            f"{base}.collapsed.txt": self.collapsed(),
+            f"{base}.tasks.json": json.dumps(self.report(), indent=2),
+        }
+        for path, content in outputs.items():
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return list(outputs)
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("factos_profile", default=None)
+_active: List[RequestProfile] = []
+_active_lock = threading.Lock()
+
+
+def active_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def mark(label: str) -> None:
+    """Adds ``label`` to the timeline of the current request's profile, if it is being profiled."""
+    profile = _current.get()
+    if profile is not None:
+        profile.mark(label)
+
+
+def token_matches(token: str) -> bool:
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def sampled() -> bool:
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def acquire(name: str) -> Optional[RequestProfile]:
+    """A new profile, or None if ``PROFILE_MAX_CONCURRENT`` requests are already being profiled."""
+    with _active_lock:
+        if len(_active) >= PROFILE_MAX_CONCURRENT:
+            return None
+        profile = RequestProfile(name)
+        _active.append(profile)
+        return profile
+
+
+def _task_factory(previous: Optional[Callable]) -> Callable:
+    """Task factory that records tasks created under a profile, delegating creation to ``previous``."""
+
+    def create(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous is not None else asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        profile = context.get(_current) if context is not None else _current.get()
+        if profile is not None:
+            profile.add_task(task)
+        return task
+
+    return create
+
+
+# Por loop: (factory anterior, perfiles activos). La factory solo está instalada mientras se perfila.
+_factories: Dict[asyncio.AbstractEventLoop, Tuple[Optional[Callable], int]] = {}
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    previous, users = _factories.get(loop, (loop.get_task_factory(), 0))
+    if not users:
+        loop.set_task_factory(_task_factory(previous))
+    _factories[loop] = (previous, users + 1)
+
+
+def _uninstall_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    previous, users = _factories.pop(loop)
+    if users > 1:
+        _factories[loop] = (previous, users - 1)
+    else:
+        loop.set_task_factory(previous)
+
+
+@asynccontextmanager
+async def profiling(profile: Optional[RequestProfile]):
+    """Runs the block (and every task it creates) under ``profile``; a None profile is a no-op."""
+    if profile is None:
+        yield None
+        return
+    loop = asyncio.get_running_loop()
+    _install_task_factory(loop)
+    token = _current.set(profile)
+    profile.add_task(asyncio.current_task())
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        _current.reset(token)
+        _uninstall_task_factory(loop)
+        with _active_lock:
+            _active.remove(profile)
+        await asyncio.to_thread(profile.join)
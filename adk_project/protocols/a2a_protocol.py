@@ -1,7 +1,19 @@
 """
 Protocolo A2A para mensajes entre agentes
 Define los tipos de mensajes y su flujo
+
+Cada etapa valida su salida contra el tipo de mensaje correspondiente antes de
+publicarla. Para despliegues remotos los mensajes se codifican en JSON (con
+orjson si está instalado) o en msgpack (``FACTOS_A2A_CODEC=msgpack``).
 """
+import importlib.util
+import json
+import os
+from typing import Any, Dict, Optional
+
+from adk_project.messages import ExtractedClaim, MatchResults, Message, ScoredResult, ValidatedArticle
+from adk_project.protocols.agui_response import AGUIResponse
+from adk_project.summarizer import estimate_tokens, summarize, truncate_to_tokens
 
 A2A_MESSAGE_TYPES = [
     'ValidatedArticle',
@@ -10,4 +22,120 @@ A2A_MESSAGE_TYPES = [
     'ScoredResult'
 ]
 
-MAX_PAYLOAD_TOKENS = 512
+MESSAGE_CLASSES: Dict[str, type] = {
+    'ValidatedArticle': ValidatedArticle,
+    'ExtractedClaim': ExtractedClaim,
+    'MatchResults': MatchResults,
+    'ScoredResult': ScoredResult,
+    'AGUIResponse': AGUIResponse,
+}
+
+MAX_PAYLOAD_TOKENS = int(os.getenv("FACTOS_MAX_PAYLOAD_TOKENS", "512"))
+
+# "json" o "msgpack" (requiere el paquete msgpack).
+A2A_CODEC = os.getenv("FACTOS_A2A_CODEC", "json")
+CONTENT_TYPES = {"json": "application/json", "msgpack": "application/msgpack"}
+JSON_BACKEND = "orjson" if importlib.util.find_spec("orjson") else "json"
+
+# Campo que orienta el resumen extractivo de cada tipo de mensaje.
+FOCUS_FIELDS = {
+    'ValidatedArticle': "headline",
+    'ExtractedClaim': "claim",
+    'MatchResults': "claim",
+    'ScoredResult': "main_claim",
+}
+
+
+def payload_tokens(payload: Any) -> int:
+    if isinstance(payload, str):
+        return estimate_tokens(payload)
+    return estimate_tokens(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def _shrink(value: Any, budget: int, focus: str) -> Any:
+    if isinstance(value, str):
+        shrunk = summarize(value, focus, budget)
+        return shrunk if estimate_tokens(shrunk) <= budget else truncate_to_tokens(shrunk, budget)
+    if isinstance(value, list):
+        # Las listas (p. ej. coincidencias) van ordenadas por relevancia: se recorta la cola.
+        kept, used = [], 2
+        for item in value:
+            cost = payload_tokens(item) + 1
+            if used + cost > budget:
+                if not kept:
+                    kept.append(_shrink(item, budget - used, focus))
+                break
+            kept.append(item)
+            used += cost
+        return kept
+    if isinstance(value, dict):
+        shrunk = dict(value)
+        while payload_tokens(shrunk) > budget:
+            sizes = {k: payload_tokens(v) for k, v in shrunk.items() if isinstance(v, (str, list, dict)) and v}
+            if not sizes:
+                break
+            key = max(sizes, key=sizes.get)
+            remaining = max(1, budget - (payload_tokens(shrunk) - sizes[key]))
+            new_value = _shrink(shrunk[key], remaining, focus)
+            if payload_tokens(new_value) >= sizes[key]:
+                break
+            shrunk[key] = new_value
+        return shrunk
+    return value
+
+
+def enforce_payload_budget(message_type: str, payload: Any, max_tokens: int = MAX_PAYLOAD_TOKENS) -> Any:
+    """Returns ``payload`` shrunk to ``max_tokens``: long text is summarized, lists lose their tail."""
+    if message_type not in A2A_MESSAGE_TYPES:
+        raise ValueError(f"Unknown A2A message type: {message_type}")
+    if payload_tokens(payload) <= max_tokens:
+        return payload
+    focus = payload.get(FOCUS_FIELDS[message_type], "") if isinstance(payload, dict) else ""
+    return _shrink(payload, max_tokens, focus if isinstance(focus, str) else "")
+
+
+def validate_message(message_type: str, payload: Any, lenient: bool = False) -> Message:
+    """Builds the typed message for ``payload`` (dict or message); raises ``MessageValidationError``."""
+    try:
+        cls = MESSAGE_CLASSES[message_type]
+    except KeyError:
+        raise ValueError(f"Unknown A2A message type: {message_type}") from None
+    return cls.from_dict(payload, lenient)
+
+
+def _codec(codec: Optional[str]) -> str:
+    codec = codec or A2A_CODEC
+    if codec not in CONTENT_TYPES:
+        raise ValueError(f"Unknown A2A codec: {codec}")
+    if codec == "msgpack" and not importlib.util.find_spec("msgpack"):
+        raise RuntimeError("The msgpack A2A codec requires the 'msgpack' package")
+    return codec
+
+
+def encode_message(message: Message, codec: Optional[str] = None) -> bytes:
+    """Serializes a message for a remote hop (``CONTENT_TYPES[codec]`` names the media type)."""
+    data = message.to_dict()
+    if _codec(codec) == "msgpack":
+        import msgpack
+
+        return msgpack.packb(data, use_bin_type=True)
+    if JSON_BACKEND == "orjson":
+        import orjson
+
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(message_type: str, body: bytes, codec: Optional[str] = None) -> Message:
+    """Parses and validates a message produced by ``encode_message``."""
+    if _codec(codec) == "msgpack":
+        import msgpack
+
+        payload = msgpack.unpackb(body, raw=False)
+    elif JSON_BACKEND == "orjson":
+        import orjson
+
+        payload = orjson.loads(body)
+    else:
+        payload = json.loads(body)
+    return validate_message(message_type, payload)
@@ -4,12 +4,28 @@ Formato esperado por el frontend AG-UI
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Optional, Tuple
 
-@dataclass
-class AGUIResponse:
-    score: int
-    explanation: str
-    sources: List[str]
-    visuals: str
-    hyperlinks: List[str]
+from adk_project.messages.base import Message
+from adk_project.messages.match_results import SourceFailure
+
+@dataclass(frozen=True, slots=True)
+class AGUIResponse(Message):
+    headline: str
+    url: str
+    score: Optional[int]
+    score_label: str = ""
+    main_claim: str = ""
+    detailed_analysis: str = ""
+    verified_sources: Tuple[str, ...] = ()
+    recommendation: str = ""
+    media_literacy_tip: str = ""
+    processing_time: float = 0.0
+    confidence_level: int = 0
+    sources_checked: int = 0
+    original_source_label: str = ""
+    original_source_url: str = ""
+    verified_sources_label: str = ""
+    error: Optional[str] = None
+    unavailable_sources: Optional[Tuple[SourceFailure, ...]] = None
+    degraded_stages: Optional[Tuple[str, ...]] = None
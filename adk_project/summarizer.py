@@ -0,0 +1,109 @@
+"""
+Resumen extractivo (solo CPU) y estimación de tokens sin tokenizador.
+
+Puntúa cada frase por solapamiento con el titular, posición, TF-IDF y
+densidad de cifras/entidades, y conserva las mejores dentro de un
+presupuesto de tokens, en su orden original.
+"""
+import math
+import re
+from collections import Counter
+from typing import List
+
+WORD = re.compile(r"\w+")
+PUNCT = re.compile(r"[^\w\s]")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?…])[\"'”»)]*\s+(?=[\"'“«¿¡(]*[A-ZÁÉÍÓÚÑ0-9])|\n{2,}")
+NUMBER = re.compile(r"\d")
+STOPWORDS = frozenset(
+    "the and for that with this from have has was were are not but its their they said will would been "
+    "about into more than also which who what when where after before over under while there these those "
+    "los las del que por para con una uno unos unas como más pero sus ese esa esto este esta fue han ser "
+    "son sobre entre cuando donde tras según dijo".split()
+)
+
+WEIGHTS = {"headline": 0.35, "position": 0.25, "tfidf": 0.25, "density": 0.15}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates BPE token count: one per word plus one per extra 6 chars, one per symbol."""
+    return sum(1 + len(w) // 6 for w in WORD.findall(text)) + len(PUNCT.findall(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_BREAK.split(text) if s and s.strip()]
+
+
+def _terms(sentence: str) -> List[str]:
+    return [w for w in WORD.findall(sentence.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+
+def _density(sentence: str) -> float:
+    words = sentence.split()
+    if not words:
+        return 0.0
+    numbers = sum(1 for w in words if NUMBER.search(w))
+    # Palabras en mayúscula que no abren la frase: aproximación barata a entidades con nombre.
+    entities = sum(1 for w in words[1:] if w[:1].isupper())
+    return (numbers + entities) / len(words)
+
+
+def score_sentences(sentences: List[str], headline: str = "") -> List[float]:
+    """Returns one 0-1 relevance score per sentence."""
+    if not sentences:
+        return []
+    terms = [_terms(s) for s in sentences]
+    headline_terms = set(_terms(headline))
+    document_freq = Counter(t for sentence_terms in terms for t in set(sentence_terms))
+    n = len(sentences)
+
+    tfidf = []
+    for sentence_terms in terms:
+        counts = Counter(sentence_terms)
+        weight = sum(tf * math.log(1 + n / document_freq[t]) for t, tf in counts.items())
+        tfidf.append(weight / math.sqrt(len(sentence_terms)) if sentence_terms else 0.0)
+    max_tfidf = max(tfidf) or 1.0
+    densities = [_density(s) for s in sentences]
+    max_density = max(densities) or 1.0
+
+    scores = []
+    for i, sentence_terms in enumerate(terms):
+        overlap = len(headline_terms & set(sentence_terms)) / len(headline_terms) if headline_terms else 0.0
+        scores.append(
+            WEIGHTS["headline"] * overlap
+            + WEIGHTS["position"] / math.sqrt(1 + i)
+            + WEIGHTS["tfidf"] * tfidf[i] / max_tfidf
+            + WEIGHTS["density"] * densities[i] / max_density
+        )
+    return scores
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts ``text`` at a word boundary so it fits ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], 0
+    for word in text.split():
+        cost = estimate_tokens(word) + (1 if kept else 0)
+        if used + cost > max_tokens - 1:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept) + "…" if kept else ""
+
+
+def summarize(text: str, headline: str = "", max_tokens: int = 512) -> str:
+    """Keeps the highest-scoring sentences of ``text`` that fit ``max_tokens``, in original order."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences, headline)
+    chosen, used = set(), 0
+    for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost <= max_tokens:
+            chosen.add(i)
+            used += cost
+    if not chosen:
+        best = max(range(len(sentences)), key=lambda i: scores[i]) if sentences else None
+        return truncate_to_tokens(sentences[best] if best is not None else text, max_tokens)
+    return " ".join(sentences[i] for i in sorted(chosen))
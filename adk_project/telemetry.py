@@ -0,0 +1,146 @@
+"""
+Instrumentación: latencia por etapa, herramienta y fetch HTTP, tokens de LLM
+por etapa y ratios de acierto de las cachés, expuestos en formato Prometheus.
+
+Con varios workers de uvicorn, define ``PROMETHEUS_MULTIPROC_DIR`` para que
+``/metrics`` agregue las métricas de todos los procesos.
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PIPELINE_DURATION = Histogram(
+    "factos_pipeline_duration_seconds", "Wall clock of a full pipeline run.", buckets=LATENCY_BUCKETS
+)
+STAGE_DURATION = Histogram(
+    "factos_stage_duration_seconds", "Wall clock per sub-agent of root_agent.", ["stage"], buckets=LATENCY_BUCKETS
+)
+TOOL_DURATION = Histogram(
+    "factos_tool_duration_seconds", "Wall clock per tool call.", ["tool", "outcome"], buckets=LATENCY_BUCKETS
+)
+HTTP_DURATION = Histogram(
+    "factos_http_fetch_duration_seconds", "Outbound HTTP fetch latency.", ["host", "status"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("factos_llm_tokens_total", "LLM tokens per stage.", ["stage", "kind"])
+LLM_BATCH_SIZE = Histogram(
+    "factos_llm_batch_size", "Requests packed per batched model call.", ["stage"], buckets=(2, 4, 8, 16, 32)
+)
+FETCH_FAILURES = Counter("factos_fetch_failures_total", "Fact-checker fetch failures by reason.", ["host", "reason"])
+JOB_QUEUE_DEPTH = Gauge("factos_job_queue_depth", "Jobs waiting for a worker.", ["priority"], multiprocess_mode="livesum")
+JOBS_TOTAL = Counter("factos_jobs_total", "Job submissions and completions by outcome.", ["outcome"])
+DEGRADED_STAGES = Counter("factos_degraded_stages_total", "Stages run in degraded mode to meet a deadline.", ["stage"])
+HEDGED_REQUESTS = Counter("factos_hedged_requests_total", "Hedged duplicate fetches issued.", ["host"])
+
+_cache_stats: Dict[str, Callable[[], Dict]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Dict]) -> None:
+    """Exposes a cache's ``stats()`` dict (hits, misses, evictions...) on /metrics."""
+    _cache_stats[name] = stats
+
+
+class _CacheCollector:
+    HIT_KEYS = ("hits", "stale_hits", "disk_hits", "revalidated")
+
+    def collect(self):
+        events = CounterMetricFamily("factos_cache_events", "Cache lookups by outcome.", labels=["cache", "event"])
+        ratio = GaugeMetricFamily("factos_cache_hit_ratio", "Share of lookups served from cache.", labels=["cache"])
+        for name, stats_fn in _cache_stats.items():
+            stats = stats_fn()
+            for key, value in stats.items():
+                if key not in ("hit_ratio", "entries", "name") and isinstance(value, (int, float)):
+                    events.add_metric([name, key], value)
+            hits = sum(stats.get(k, 0) for k in self.HIT_KEYS)
+            lookups = hits + stats.get("misses", 0)
+            ratio.add_metric([name], hits / lookups if lookups else 0.0)
+        yield events
+        yield ratio
+
+
+CACHE_COLLECTOR = _CacheCollector()
+REGISTRY.register(CACHE_COLLECTOR)
+
+
+@contextmanager
+def span(histogram: Histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def timed_tool(fn):
+    """Decorates an async ADK tool function to record its latency and outcome."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            TOOL_DURATION.labels(tool=fn.__name__, outcome=outcome).observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+class PipelineTrace:
+    """Derives per-stage spans and token counts from the Runner's event stream.
+
+    A stage spans from the previous stage's last event (or the pipeline
+    start) to its own last event.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._stage_start = self.started
+        self._last_event = self.started
+
+    def on_event(self, event) -> None:
+        now = time.perf_counter()
+        if event.author != self._stage:
+            self._close_stage()
+            self._stage, self._stage_start = event.author, self._last_event
+        self._last_event = now
+        usage = getattr(event, "usage_metadata", None)
+        if usage is not None and not event.partial:
+            LLM_TOKENS.labels(stage=event.author, kind="prompt").inc(usage.prompt_token_count or 0)
+            LLM_TOKENS.labels(stage=event.author, kind="completion").inc(usage.candidates_token_count or 0)
+
+    def _close_stage(self) -> None:
+        if self._stage is not None and self._stage != "user":
+            duration = self._last_event - self._stage_start
+            self.stages[self._stage] = self.stages.get(self._stage, 0.0) + duration
+            STAGE_DURATION.labels(stage=self._stage).observe(duration)
+
+    def finish(self) -> float:
+        self._close_stage()
+        self._stage = None
+        elapsed = time.perf_counter() - self.started
+        PIPELINE_DURATION.observe(elapsed)
+        return elapsed
+
+
+def render_metrics():
+    """Returns ``(body, content_type)`` for the /metrics route."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        # Las cachés viven en memoria de cada proceso: se exponen las del worker que atiende /metrics.
+        registry.register(CACHE_COLLECTOR)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,73 @@
+"""
+Tests para el extractor de artículos en streaming del SmartScraperAgent
+"""
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from adk_project import http_client
+from adk_project.agents.smart_scraper_agent.article_extractor import (
+    ArticleExtractionError,
+    download_article_html,
+    extract_article,
+    validate_url,
+)
+
+JSONLD = {"@context": "https://schema.org", "@type": "NewsArticle", "headline": "Deal reached",
+          "author": [{"@type": "Person", "name": "Sam Jones"}], "datePublished": "2025-06-11"}
+ARTICLE_PAGE = (
+    "<html><head><title>Fallback title</title>"
+    '<meta property="og:title" content="OG title">'
+    f'<script type="application/ld+json">{json.dumps(JSONLD)}</script></head><body>'
+    "<nav><p>Home News Sport Culture Lifestyle and many other sections</p></nav>"
+    "<article><header><h1>Deal reached</h1></header>"
+    "<p>The UK and Gibraltar have reached a historic agreement with Spain over the territory.</p>"
+    '<div class="share-tools"><p>Share this article on every social network you can find today</p></div>'
+    "<p>The deal is expected to ease tensions and ensure free movement across the border.</p>"
+    "</article>"
+    + "<section class='comments'>" + "<p>Reader comment that nobody needs in memory.</p>" * 20000 + "</section>"
+    "</body></html>"
+)
+
+@pytest_asyncio.fixture
+async def article_url():
+    app = web.Application()
+    app.router.add_get("/article", lambda request: web.Response(text=ARTICLE_PAGE, content_type="text/html"))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/article"
+    await http_client.close_transport()
+    await runner.cleanup()
+
+def test_validate_url_requires_https_and_whitelisted_domain():
+    validate_url("https://www.theguardian.com/world/2025/jun/11/deal")
+    with pytest.raises(ArticleExtractionError):
+        validate_url("http://www.theguardian.com/world")
+    with pytest.raises(ArticleExtractionError):
+        validate_url("https://theguardian.com.evil.example/world")
+
+@pytest.mark.asyncio
+async def test_extracts_metadata_and_body_without_boilerplate(article_url):
+    article = await extract_article(article_url, validate=False)
+    assert article["headline"] == "Deal reached"
+    assert article["byline"] == "Sam Jones"
+    assert article["publish_date"] == "2025-06-11"
+    assert "historic agreement" in article["full_text"]
+    assert "free movement" in article["full_text"]
+    assert "Share this article" not in article["full_text"]
+    assert "Home News" not in article["full_text"]
+
+@pytest.mark.asyncio
+async def test_download_stops_when_article_closes(article_url):
+    html, parser, bytes_read = await download_article_html(article_url)
+    assert parser.article_closed
+    assert bytes_read < len(ARTICLE_PAGE) / 10
+    assert "Reader comment" not in html[: html.index("</article>")]
+
+@pytest.mark.asyncio
+async def test_download_respects_byte_cap(article_url):
+    html, parser, bytes_read = await download_article_html(article_url, max_bytes=200)
+    assert bytes_read == 200
+    assert not parser.article_closed
@@ -0,0 +1,140 @@
+"""
+Tests para el micro-batching de llamadas a modelo
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.models.llm_request import LlmRequest
+from google.genai.types import Content, GenerateContentConfig, Part
+from adk_project.agents.batching import BATCH_MARKER, MicroBatcher
+from adk_project.deadline import current_deadline, deadline_scope, new_deadline
+from adk_project.benchmarks.stub_llm import StubLlm
+
+class CountingLlm(StubLlm):
+    calls: int = 0
+    batch_calls: int = 0
+    broken_batches: bool = False
+    batch_usage: list = []
+
+    def respond(self, llm_request):
+        if BATCH_MARKER in str(llm_request.config.system_instruction) and self.broken_batches:
+            return "not json"
+        return super().respond(llm_request)
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        self.batch_calls += BATCH_MARKER in str(llm_request.config.system_instruction)
+        async for response in super().generate_content_async(llm_request, stream):
+            if BATCH_MARKER in str(llm_request.config.system_instruction):
+                self.batch_usage.append(response.usage_metadata)
+            yield response
+
+def make_runner(batcher, model):
+    agent = LlmAgent(
+        name="ClaimExtractorAgent",
+        instruction="Extract the claim.",
+        model=model,
+        before_model_callback=batcher.before_model,
+    )
+    batcher.register(agent)
+    return Runner(agent=agent, app_name="t", session_service=InMemorySessionService())
+
+async def extract(runner, text, with_usage=False):
+    session = await runner.session_service.create_session(app_name="t", user_id="u")
+    message = Content(role="user", parts=[Part(text=text)])
+    async for event in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            claim = json.loads(event.content.parts[0].text)["claim"]
+            return (claim, event.usage_metadata) if with_usage else claim
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call_and_get_their_own_answer():
+    model = CountingLlm(delay_ms=20)
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=50)
+    runner = make_runner(batcher, model)
+    claims = await asyncio.gather(*(extract(runner, f"article bench-{i}") for i in range(5)))
+
+    assert claims == [f"Drinking {i} cups of coffee a day prevents cancer" for i in range(5)]
+    assert model.batch_calls == 1
+    assert model.calls == 2  # the first arrival goes direct, the rest share one batch
+    assert batcher.stats()["batched_items"] == 4
+
+@pytest.mark.asyncio
+async def test_isolated_request_is_not_delayed():
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=500)
+    runner = make_runner(batcher, CountingLlm())
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await extract(runner, "article bench-1") == "Drinking 1 cups of coffee a day prevents cancer"
+    assert loop.time() - start < 0.5
+    assert batcher.stats()["direct"] == 1
+
+@pytest.mark.asyncio
+async def test_unparseable_batch_falls_back_to_direct_calls():
+    model = CountingLlm(broken_batches=True)
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=50)
+    runner = make_runner(batcher, model)
+    claims = await asyncio.gather(*(extract(runner, f"article bench-{i}") for i in range(3)))
+
+    assert claims == [f"Drinking {i} cups of coffee a day prevents cancer" for i in range(3)]
+    assert batcher.stats()["fallbacks"] == 2
+
+@pytest.mark.asyncio
+async def test_batch_token_usage_is_split_across_its_items():
+    model = CountingLlm(delay_ms=20)
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=50)
+    runner = make_runner(batcher, model)
+    results = await asyncio.gather(*(extract(runner, f"article bench-{i}", with_usage=True) for i in range(5)))
+
+    (batch,) = model.batch_usage
+    batched = [usage for _, usage in results[1:]]
+    assert all(usage is not None for usage in batched)
+    assert sum(u.prompt_token_count for u in batched) == batch.prompt_token_count
+    assert sum(u.candidates_token_count for u in batched) == batch.candidates_token_count
+
+class SlowBatchModel:
+    def __init__(self):
+        self.deadlines = []
+        self.cancelled = asyncio.Event()
+
+    async def generate_content_async(self, llm_request):
+        self.deadlines.append(current_deadline())
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        yield
+
+def _request(text):
+    return LlmRequest(model="stub-llm", contents=[Content(role="user", parts=[Part(text=text)])],
+                      config=GenerateContentConfig(system_instruction="Extract the claim."))
+
+@pytest.mark.asyncio
+async def test_batch_runs_under_the_shortest_deadline_and_stops_when_nobody_waits():
+    model = SlowBatchModel()
+    agent = SimpleNamespace(name="ClaimExtractorAgent", canonical_model=model, canonical_after_model_callbacks=[])
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+    batcher.register(agent)
+    context = SimpleNamespace(agent_name=agent.name)
+    assert await batcher.before_model(context, _request("first")) is None  # carga baja: directa
+
+    async def wait_in_batch(text, seconds):
+        with deadline_scope(new_deadline(seconds)):
+            return await batcher.before_model(context, _request(text))
+
+    waiters = [asyncio.ensure_future(wait_in_batch("a", 30)), asyncio.ensure_future(wait_in_batch("b", 60))]
+    while not model.deadlines:
+        await asyncio.sleep(0.01)
+    assert 29 < model.deadlines[0].expires_at - time.monotonic() <= 30
+
+    waiters[0].cancel()
+    await asyncio.sleep(0.01)
+    assert not model.cancelled.is_set()
+    waiters[1].cancel()
+    await asyncio.wait_for(model.cancelled.wait(), 1)
@@ -0,0 +1,79 @@
+"""
+Tests para el almacén de textos por contenido y las sesiones acotadas
+"""
+import os
+import time
+import types
+import pytest
+from google.adk.models import LlmRequest
+from google.genai.types import Content, Part
+from adk_project.agents.utils import article_context_callback
+from adk_project.api.sessions import BoundedSessionService
+from adk_project.blobstore import BlobStore, preview, utf8_size
+from adk_project.cache.memory import LRUCache
+
+ARTICLE = "Coffee drinkers live longer, a new observational study suggests. " * 40
+
+@pytest.mark.asyncio
+async def test_put_is_content_addressed_and_falls_back_to_disk(tmp_path):
+    store = BlobStore(LRUCache(max_entries=1, sizeof=len), str(tmp_path))
+    ref = await store.put(ARTICLE)
+    assert await store.put(ARTICLE) == ref and ref.startswith("sha256:")
+    await store.put("another article")  # desaloja el primero de memoria
+    assert await store.get(ref) == ARTICLE
+    assert store.stats()["disk_hits"] == 1
+    assert await BlobStore(LRUCache(), "").get(ref) is None
+
+@pytest.mark.asyncio
+async def test_disk_tier_expires_unused_blobs_and_stays_under_its_size_cap(tmp_path):
+    store = BlobStore(LRUCache(max_entries=1, sizeof=utf8_size), str(tmp_path), disk_ttl=3600, disk_max_bytes=2500)
+    old, recent, newest = [await store.put(f"{i} {ARTICLE[:1000]}") for i in range(3)]
+    expired = store._path(old[len("sha256:"):])
+    os.utime(expired, (time.time() - 7200,) * 2)
+    assert store.sweep() == 1 and not os.path.exists(expired)
+    await store.put("ñ" * 600)  # 1200 bytes: supera el tope, cae el menos usado
+    os.utime(store._path(recent[len("sha256:"):]), (time.time() - 60,) * 2)
+    assert store.sweep() == 1
+    assert await store.get(recent) is None and await store.get(newest) is not None
+
+def test_sweep_keeps_writes_in_progress_and_removes_abandoned_temporaries(tmp_path):
+    store = BlobStore(LRUCache(), str(tmp_path), disk_ttl=3600, disk_max_bytes=1, tmp_grace=600)
+    (tmp_path / "ab").mkdir()
+    writing = tmp_path / "ab" / "abcd.4242.1.tmp"
+    abandoned = tmp_path / "ab" / "abef.4243.1.tmp"
+    writing.write_text("x" * 100)
+    abandoned.write_text("y" * 100)
+    os.utime(abandoned, (time.time() - 3600,) * 2)
+    assert store.sweep() == 1
+    assert writing.exists() and not abandoned.exists()
+    os.replace(writing, tmp_path / "ab" / "abcd")  # el otro worker termina su escritura
+
+def test_memory_tier_is_sized_in_bytes():
+    assert utf8_size("ñ" * 10) == 20
+
+def test_preview_is_short_and_cut_at_a_word():
+    text = preview(ARTICLE, 50)
+    assert len(text) <= 51 and text.endswith("…") and not text[:-1].endswith(" ")
+
+@pytest.mark.asyncio
+async def test_article_digest_is_added_to_the_model_call_only(monkeypatch):
+    from adk_project.agents import utils
+
+    store = BlobStore(LRUCache(sizeof=len))
+    monkeypatch.setattr(utils, "BLOBS", store)
+    state = {"validated_article": {"headline": "Coffee study", "text_ref": await store.put(ARTICLE), "preview": "Coffee"}}
+    request = LlmRequest(contents=[Content(role="user", parts=[Part(text="https://example.com/a")])])
+    assert await article_context_callback(types.SimpleNamespace(state=state), request) is None
+    assert "observational study" in request.contents[0].parts[0].text
+    assert "full_text" not in state["validated_article"]
+
+@pytest.mark.asyncio
+async def test_idle_and_excess_sessions_are_evicted():
+    service = BoundedSessionService(ttl=60, max_sessions=2)
+    for _ in range(3):
+        await service.create_session(app_name="factos", user_id="api")
+    service.evict()
+    assert len(service) == 2
+    service.ttl = 0
+    assert service.evict() == 2
+    assert service.sessions["factos"]["api"] == {}
@@ -0,0 +1,99 @@
+"""
+Tests para la caché LRU/TTL con coalescencia y stale-while-revalidate
+"""
+import asyncio
+import sqlite3
+import pytest
+from adk_project.cache import AsyncCache, LRUCache, SQLiteCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert cache.evictions == 1
+
+def test_lru_respects_byte_bound():
+    cache = LRUCache(max_entries=100, max_bytes=20)
+    for i in range(5):
+        cache.set(str(i), "x" * 8, ttl=60)
+    assert cache.total_bytes <= 20
+    assert cache.get("4") is not None
+
+def test_expired_entries_are_dropped():
+    cache = LRUCache()
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return ["match"]
+
+    cache = AsyncCache(LRUCache(), ttl=60)
+    results = await asyncio.gather(*(cache.get_or_fetch("claim", fetch) for _ in range(10)))
+    assert calls == 1
+    assert results == [["match"]] * 10
+    assert cache.stats()["coalesced"] == 9
+    assert await cache.get_or_fetch("claim", fetch) == ["match"]
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    cache = AsyncCache(LRUCache(), ttl=60, stale_ttl=60)
+    await cache.set("claim", "old", ttl=-1)
+
+    async def fetch():
+        return "new"
+
+    assert await cache.get_or_fetch("claim", fetch) == "old"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert (await cache.get("claim")).value == "new"
+    assert cache.stats()["stale_hits"] == 1
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = SQLiteCache(path, namespace="factcheck", vacuum_interval=0)
+    worker_b = SQLiteCache(path, namespace="factcheck", vacuum_interval=0)
+    worker_a.set("claim", [{"claim": "x", "confidence": 0.9}], ttl=60)
+    assert worker_b.get("claim").value == [{"claim": "x", "confidence": 0.9}]
+    assert SQLiteCache(path, namespace="pipeline", vacuum_interval=0).get("claim") is None
+
+    worker_a.set("old", "v", ttl=-1)
+    assert worker_b.get("old") is None
+    assert worker_b.purge_expired() == 1
+    assert len(worker_a) == 1
+
+@pytest.mark.asyncio
+async def test_async_cache_over_sqlite_backend(tmp_path):
+    cache = AsyncCache(SQLiteCache(str(tmp_path / "c.sqlite3"), vacuum_interval=0), ttl=60)
+
+    async def fetch():
+        return {"score": 3}
+
+    assert await cache.get_or_fetch("k", fetch) == {"score": 3}
+    assert await cache.get_or_fetch("k", fetch) == {"score": 3}
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_close_stops_vacuum_and_closes_every_connection(tmp_path):
+    backend = SQLiteCache(str(tmp_path / "c.sqlite3"), vacuum_interval=60)
+    backend.set("k", "v", ttl=60)
+    await asyncio.to_thread(backend.get, "k")  # conexión de otro hilo
+    conns = list(backend._conns)
+    backend.close()
+    assert len(conns) == 2 and backend._vacuum_thread is None
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert backend.get("k").value == "v"  # se reconecta si se vuelve a usar
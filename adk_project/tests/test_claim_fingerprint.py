@@ -0,0 +1,78 @@
+"""
+Tests para la normalización de afirmaciones y el índice de casi-duplicados
+"""
+import pytest
+from adk_project.agents.fact_check_matcher_agent import factchecker_scraper
+from adk_project.cache.fingerprint import MinHashIndex, claim_key, claim_shingles, claim_tokens, normalize_claim
+
+def test_normalization_ignores_case_punctuation_and_stop_words():
+    a = "Coffee PREVENTS cancer in 90% of cases!"
+    b = "  coffee prevents   cancer, in 90% of the cases."
+    assert normalize_claim(a) == normalize_claim(b)
+    assert claim_key(a) == claim_key(b)
+
+def test_normalization_folds_accents_and_keeps_numbers():
+    tokens = claim_tokens("El café previene el 90,5% de los cánceres")
+    assert {"cafe", "previene", "90,5%", "canceres"} <= tokens
+    assert claim_key("Coffee prevents 90% of cancer") != claim_key("Coffee prevents 50% of cancer")
+
+def test_negation_and_word_order_change_the_key():
+    assert claim_key("Vaccines cause autism") != claim_key("Vaccines do not cause autism")
+    assert claim_key("Vaccines don't cause autism") == claim_key("Vaccines do not cause autism")
+    assert claim_key("Spain beat England") != claim_key("England beat Spain")
+
+def test_near_duplicate_lookup():
+    index = MinHashIndex(threshold=0.7)
+    original = "UK and Gibraltar reach historic agreement with Spain over border and sovereignty"
+    index.add("k1", claim_shingles(original))
+
+    reworded = "UK and Gibraltar finally reach historic agreement with Spain over border and sovereignty"
+    key, similarity = index.query(claim_shingles(reworded))
+    assert key == "k1" and similarity >= 0.7
+    assert index.query(claim_shingles("Vaccines cause autism in children")) is None
+
+def test_near_duplicate_respects_word_order():
+    index = MinHashIndex(threshold=0.3)
+    index.add("k1", claim_shingles("Spain beat England in the final"))
+    assert index.query(claim_shingles("England beat Spain in the final")) is None
+
+def test_near_duplicate_requires_identical_numbers():
+    index = MinHashIndex(threshold=0.5)
+    index.add("k1", claim_shingles("Coffee prevents 90% of all cancer cases according to new study"))
+    assert index.query(claim_shingles("Coffee prevents 50% of all cancer cases according to new study")) is None
+
+def test_near_duplicate_requires_identical_negations():
+    index = MinHashIndex(threshold=0.5)
+    index.add("k1", claim_shingles("The new measles vaccine causes autism in young children according to a viral post"))
+    assert index.query(claim_shingles("The new measles vaccine does not cause autism in young children according to a viral post")) is None
+
+def test_index_is_bounded():
+    index = MinHashIndex(max_entries=2)
+    for i, text in enumerate(["alpha beta", "gamma delta", "epsilon zeta"]):
+        index.add(str(i), claim_shingles(text))
+    assert len(index) == 2
+    assert index.query(claim_shingles("alpha beta")) is None
+
+@pytest.mark.asyncio
+async def test_reordered_claim_does_not_reuse_fact_checks(monkeypatch):
+    calls = []
+
+    async def fake_live(claim):
+        calls.append(claim)
+        return [{"claim": claim, "source": "https://factcheck.example/1", "confidence": 0.9}]
+
+    monkeypatch.setattr(factchecker_scraper, "live_factcheck", fake_live)
+    first = await factchecker_scraper.get_factchecker_claims("Spain beat England in the 1966 final at Wembley")
+    second = await factchecker_scraper.get_factchecker_claims("England beat Spain in the 1966 final at Wembley")
+    assert len(calls) == 2
+    assert first["matches"][0]["claim"] != second["matches"][0]["claim"]
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_not_indexed_as_near_duplicate(monkeypatch):
+    async def failing_live(claim):
+        raise factchecker_scraper.FactCheckUnavailable([], [{"site": "apnews.com", "reason": "timeout"}])
+
+    monkeypatch.setattr(factchecker_scraper, "live_factcheck", failing_live)
+    claim = "Near duplicate index test claim about unreachable fact checkers today"
+    result = await factchecker_scraper.get_factchecker_claims(claim)
+    assert result["failures"] and factchecker_scraper.NEAR_DUPLICATES.query(claim_shingles(claim)) is None
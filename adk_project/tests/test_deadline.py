@@ -0,0 +1,122 @@
+"""
+Tests para el plazo por petición: degradación de etapas y cancelación
+"""
+import asyncio
+import pytest
+from starlette.requests import Request
+from adk_project import deadline
+from adk_project.api import main
+from adk_project.agents.fact_check_matcher_agent import factchecker_scraper, sources
+from adk_project.agents.fact_check_matcher_agent.sources import load_sources
+from adk_project.cache import SingleFlight
+from adk_project.deadline import DeadlineExceeded, deadline_scope, new_deadline, next_within
+
+def test_nested_deadline_never_outlives_the_enclosing_one():
+    assert new_deadline().expires_at is None
+    with deadline_scope(new_deadline(1)) as outer:
+        assert new_deadline().expires_at == outer.expires_at
+        assert new_deadline(60).expires_at == outer.expires_at
+        inner = new_deadline(0.5)
+        assert inner.expires_at < outer.expires_at and inner.degraded is not outer.degraded
+        assert deadline.has_budget(0.5) and not deadline.has_budget(5)
+
+@pytest.mark.asyncio
+async def test_step_past_the_deadline_is_cancelled():
+    cancelled = []
+
+    async def events():
+        yield "scraped"
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        yield "never"
+
+    run, limit = events(), new_deadline(0.05)
+    assert await next_within(run, limit) == "scraped"
+    with pytest.raises(DeadlineExceeded):
+        await next_within(run, limit)
+    assert cancelled == [True]
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_the_shared_flight():
+    flight, started, cancelled = SingleFlight(), asyncio.Event(), []
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    waiters = [asyncio.ensure_future(flight.do("k", fetch)) for _ in range(2)]
+    await started.wait()
+    waiters[0].cancel()
+    await asyncio.sleep(0)
+    assert cancelled == []
+    waiters[1].cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cancelled == [True] and "k" not in flight
+
+@pytest.mark.asyncio
+async def test_flight_is_only_shared_by_callers_its_deadline_covers():
+    flight, runs = SingleFlight(), []
+
+    async def fetch():
+        runs.append(deadline.remaining())
+        run = len(runs)
+        await asyncio.sleep(0.05)
+        return run
+
+    async def call(seconds):
+        with deadline_scope(new_deadline(seconds)):
+            return await flight.do("k", fetch)
+
+    short = asyncio.ensure_future(call(1))
+    await asyncio.sleep(0)
+    longer = asyncio.ensure_future(call(60))
+    await asyncio.sleep(0)
+    shorter = asyncio.ensure_future(call(0.5))
+    assert await asyncio.gather(short, longer, shorter) == [1, 2, 2]
+    assert runs[0] < 1 and runs[1] > 59 and flight.coalesced == 1
+
+@pytest.mark.asyncio
+async def test_live_search_reports_sources_still_pending_at_the_deadline(monkeypatch):
+    base = sources.DEFAULT_SOURCES[0]
+    monkeypatch.setattr(sources, "SOURCES", load_sources([
+        {**base, "name": name, "search_url": f"https://{name}/?q={{query}}"} for name in ("fast", "slow")
+    ]))
+    monkeypatch.setattr(factchecker_scraper, "DEADLINE_RESERVE_S", 0.0)
+
+    async def fake_search(source, query):
+        await asyncio.sleep(0 if source.name == "fast" else 5)
+        return [{"claim": f"{source.name} claim", "source": source.search_url, "confidence": 0.9}]
+
+    monkeypatch.setattr(factchecker_scraper, "search_and_parse", fake_search)
+    with deadline_scope(new_deadline(0.1)):
+        with pytest.raises(factchecker_scraper.FactCheckUnavailable) as exc:
+            await factchecker_scraper.live_factcheck("claim")
+    assert [m["claim"] for m in exc.value.matches] == ["fast claim"]
+    assert exc.value.failures == [{"site": "slow", "reason": "deadline", "detail": ""}]
+
+@pytest.mark.asyncio
+async def test_predict_work_is_cancelled_when_the_client_disconnects():
+    cancelled = []
+
+    async def receive():
+        await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    assert await main._cancel_on_disconnect(Request({"type": "http"}, receive), work()) is None
+    await asyncio.sleep(0)
+    assert cancelled == [True]
@@ -0,0 +1,109 @@
+"""
+Tests para el registro de fuentes de fact-checking y la respuesta temprana first-k
+"""
+import asyncio
+import json
+import os
+import pytest
+from adk_project import http_policy
+from adk_project.agents.fact_check_matcher_agent import factchecker_scraper, sources
+from adk_project.agents.fact_check_matcher_agent.sources import FactCheckSource, load_sources
+from adk_project.agents.truth_scorer_agent.rules import score_matches
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_source_declared_by_config_applies_trust_weight_and_rank_decay():
+    source = FactCheckSource.from_config({
+        "name": "example", "search_url": "https://checks.example/?q={query}",
+        "item": "article", "title": "h3", "link": "h3 a",
+        "trust_weight": 0.5, "rank_decay": 0.1, "max_results": 2,
+    })
+    results = source.parse(_fixture("factcheck_org_search.html"))
+    assert [r["confidence"] for r in results] == [0.45, 0.35]
+
+def test_confidence_follows_title_similarity_to_the_claim():
+    source = sources.SOURCES["factcheck.org"]
+    results = source.parse(_fixture("factcheck_org_search.html"), "Coffee deal is misleading, ballot says")
+    by_title = {r["claim"].split()[0]: r["confidence"] for r in results}
+    assert by_title["Ballot"] > by_title["Senator"] > by_title["Governor"] == 0.0
+    assert max(by_title.values()) < source.confidence
+
+def test_invalid_source_config_is_rejected():
+    with pytest.raises(ValueError):
+        FactCheckSource.from_config({"name": "x", "search_url": "https://x/", "item": "a", "title": "a", "link": "a"})
+    with pytest.raises(ValueError):
+        FactCheckSource.from_config({"name": "x", "search_url": "https://x/?q={query}", "item": "a", "title": "a",
+                                     "link": "a", "selector": "a"})
+
+def test_source_policy_configures_its_domain():
+    load_sources([{**sources.DEFAULT_SOURCES[0], "search_url": "https://slow.example/?s={query}", "policy": {"rate": 1}}])
+    try:
+        assert http_policy.get_policy("slow.example").bucket.rate == 1
+    finally:
+        http_policy.configure_domain("slow.example")
+
+@pytest.mark.asyncio
+async def test_first_k_returns_early_and_cancels_slow_sources(monkeypatch):
+    base = sources.DEFAULT_SOURCES[0]
+    monkeypatch.setattr(sources, "SOURCES", load_sources([
+        {**base, "name": name, "search_url": f"https://{name}/?q={{query}}"} for name in ("fast", "medium", "slow")
+    ]))
+    delays = {"fast": 0.0, "medium": 0.01, "slow": 5.0}
+    cancelled = []
+
+    async def fake_search(source, query):
+        try:
+            await asyncio.sleep(delays[source.name])
+        except asyncio.CancelledError:
+            cancelled.append(source.name)
+            raise
+        return [{"claim": f"{source.name} claim", "source": source.search_url, "confidence": 0.9}]
+
+    monkeypatch.setattr(factchecker_scraper, "search_and_parse", fake_search)
+    matches = await asyncio.wait_for(factchecker_scraper.live_factcheck("claim", first_k=2), 1)
+    await asyncio.sleep(0)
+    assert [m["claim"] for m in matches] == ["fast claim", "medium claim"]
+    assert cancelled == ["slow"]
+
+def _review_page(claim, rating):
+    review = {"@type": "ClaimReview", "claimReviewed": claim, "reviewRating": {"alternateName": rating}}
+    return f'<html><head><script type="application/ld+json">{json.dumps(review)}</script></head></html>'
+
+@pytest.mark.asyncio
+async def test_live_matches_carry_the_page_rating_into_the_rule_fast_path(monkeypatch):
+    monkeypatch.setattr(sources, "SOURCES", load_sources([sources.DEFAULT_SOURCES[0]]))
+    claim = "Coffee prevents cancer"
+    pages = {
+        "https://www.factcheck.org/?s=Coffee+prevents+cancer": (
+            '<article><h3><a href="/2025/01/coffee-cancer/">Coffee prevents cancer</a></h3></article>'
+            '<article><h3><a href="/2025/02/coffee-cures/">Coffee prevents cancer, post claims</a></h3></article>'
+        ),
+        "https://www.factcheck.org/2025/01/coffee-cancer/": _review_page("Coffee prevents cancer", "False"),
+        "https://www.factcheck.org/2025/02/coffee-cures/": _review_page("Coffee prevents cancer", "Pants on Fire"),
+    }
+
+    async def fake_fetch(url):
+        return pages[url]
+
+    monkeypatch.setattr(factchecker_scraper, "fetch_url", fake_fetch)
+    matches = await factchecker_scraper.live_factcheck(claim)
+    assert [m["rating"] for m in matches] == ["False", "Pants on Fire"]
+    scored, confident = score_matches(claim, matches)
+    assert confident and scored["score"] == 3 and scored["scored_by"] == "rules"
+
+@pytest.mark.asyncio
+async def test_unreachable_fact_check_page_leaves_the_match_unrated(monkeypatch):
+    monkeypatch.setattr(sources, "SOURCES", load_sources([sources.DEFAULT_SOURCES[0]]))
+
+    async def fake_fetch(url):
+        if "?s=" in url:
+            return '<article><h3><a href="/2025/01/coffee-cancer/">Coffee prevents cancer</a></h3></article>'
+        raise http_policy.FetchError("timeout")
+
+    monkeypatch.setattr(factchecker_scraper, "fetch_url", fake_fetch)
+    matches = await factchecker_scraper.live_factcheck("Coffee prevents cancer")
+    assert len(matches) == 1 and "rating" not in matches[0]
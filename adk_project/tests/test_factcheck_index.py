@@ -0,0 +1,49 @@
+"""
+Tests para el índice local de fact-checks pre-embebidos
+"""
+import asyncio
+import pytest
+from adk_project.agents.fact_check_matcher_agent import factcheck_index
+from adk_project.agents.fact_check_matcher_agent.factcheck_index import FactCheckIndex, build_index, embed_texts
+
+RECORDS = [
+    {"claim": "Coffee prevents 90% of cancer cases", "source": "https://www.factcheck.org/coffee-cancer/"},
+    {"claim": "The moon landing was staged in a studio", "source": "https://apnews.com/ap-fact-check/moon"},
+    {"claim": "Vaccines cause autism in children", "source": "https://www.factcheck.org/vaccines-autism/"},
+    {"claim": "Gibraltar deal keeps British sovereignty", "source": "https://apnews.com/ap-fact-check/gibraltar"},
+]
+
+@pytest.mark.parametrize("nlist", [0, 2])
+def test_search_returns_most_similar_claim(tmp_path, nlist):
+    build_index(RECORDS, str(tmp_path), nlist=nlist)
+    index = FactCheckIndex(str(tmp_path))
+    assert len(index) == len(RECORDS)
+
+    matches = index.search(["Does coffee prevent cancer?"], k=2, nprobe=nlist or None)[0]
+    assert matches[0]["source"] == "https://www.factcheck.org/coffee-cancer/"
+    assert matches[0]["confidence"] >= matches[-1]["confidence"]
+    index.close()
+
+def test_min_score_filters_unrelated_claims(tmp_path):
+    build_index(RECORDS, str(tmp_path))
+    index = FactCheckIndex(str(tmp_path))
+    assert index.search(["zebra quantum saxophone"], min_score=0.5) == [[]]
+    index.close()
+
+def test_index_built_with_another_embedder_is_not_searched(tmp_path):
+    build_index(RECORDS, str(tmp_path), embedder=lambda texts: embed_texts(texts, dim=64), embedder_name="hashing-64")
+    index = FactCheckIndex(str(tmp_path))
+    assert not index.compatible
+    with pytest.raises(ValueError, match="hashing-64"):
+        index.search(["coffee cancer"])
+    index.close()
+    assert FactCheckIndex(str(tmp_path), embedder=lambda texts: embed_texts(texts, dim=64), embedder_name="hashing-64").compatible
+
+@pytest.mark.asyncio
+async def test_concurrent_local_searches_run_in_the_pool(tmp_path, monkeypatch):
+    build_index(RECORDS, str(tmp_path))
+    monkeypatch.setattr(factcheck_index, "INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(factcheck_index, "_INDEX", None)
+    claims = [r["claim"].lower() for r in RECORDS[:3]] * 4
+    results = await asyncio.gather(*(factcheck_index.search_local_factchecks(claim) for claim in claims))
+    assert [r[0]["source"] for r in results] == [r["source"] for r in RECORDS[:3]] * 4
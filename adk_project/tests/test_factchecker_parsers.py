@@ -0,0 +1,32 @@
+"""
+Tests para los parsers de resultados de fact-checkers sobre páginas guardadas
+"""
+import os
+import pytest
+from adk_project.agents.fact_check_matcher_agent.factchecker_scraper import parse_apnews, parse_factcheck_org
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.asyncio
+async def test_parse_factcheck_org_fixture():
+    results = await parse_factcheck_org(_fixture("factcheck_org_search.html"))
+    assert len(results) == 3
+    assert results[0]["source"] == "https://www.factcheck.org/2025/01/fact-check-0/"
+    assert all(r["claim"] for r in results)
+
+@pytest.mark.asyncio
+async def test_parse_apnews_fixture_keeps_only_fact_checks():
+    results = await parse_apnews(_fixture("apnews_search.html"))
+    assert [r["source"] for r in results] == [
+        "https://apnews.com/article/ap-fact-check-1",
+        "https://apnews.com/article/ap-fact-check-2",
+    ]
+
+@pytest.mark.asyncio
+async def test_parsers_handle_missing_html():
+    assert await parse_factcheck_org(None) == []
+    assert await parse_apnews("") == []
@@ -0,0 +1,84 @@
+"""
+Tests para el cliente HTTP compartido
+"""
+import asyncio
+import pytest
+from aiohttp import web
+from adk_project import http_client
+
+@pytest.mark.asyncio
+async def test_transport_reuses_pooled_session():
+    app = web.Application()
+    app.router.add_get("/", lambda request: web.Response(text="ok"))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        transport = http_client.get_transport()
+        first = await transport.get(f"http://127.0.0.1:{port}/")
+        session = transport.session()
+        second = await transport.get(f"http://127.0.0.1:{port}/")
+        assert (first.status, first.text) == (200, "ok")
+        assert second.text == "ok"
+        assert transport.session() is session
+        assert http_client.get_transport() is transport
+    finally:
+        await http_client.close_transport()
+        await runner.cleanup()
+    assert session.closed
+
+def test_session_of_a_previous_event_loop_is_closed():
+    transport = http_client.AiohttpTransport()
+
+    async def open_session():
+        return transport.session()
+
+    async def replace_session():
+        session = transport.session()
+        await asyncio.sleep(0)
+        return session
+
+    def run(coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    first = run(open_session())
+    second = run(replace_session())
+    assert first is not second and first.closed and not second.closed
+    run(second.close())
+
+@pytest.mark.asyncio
+async def test_pinned_post_skips_dns_and_does_not_follow_redirects():
+    hits = []
+
+    async def hook(request):
+        hits.append(request.host)
+        raise web.HTTPTemporaryRedirect("/internal")
+
+    async def internal(request):
+        hits.append("internal")
+        return web.Response(text="leaked")
+
+    app = web.Application()
+    app.router.add_post("/hook", hook)
+    app.router.add_post("/internal", internal)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        # hooks.invalid no resuelve nunca: la conexión solo puede ir a la IP fijada.
+        resp = await http_client.get_transport().post_json(
+            f"http://hooks.invalid:{port}/hook", {"id": 1}, follow_redirects=False, addresses=["127.0.0.1"]
+        )
+    finally:
+        await http_client.close_transport()
+        await runner.cleanup()
+    assert resp.status == 307 and resp.headers["Location"] == "/internal"
+    assert hits == [f"hooks.invalid:{port}"]
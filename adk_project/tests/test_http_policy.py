@@ -0,0 +1,130 @@
+"""
+Tests para la política por dominio (rate limit, circuit breaker, hedging) y los fallos estructurados
+"""
+import asyncio
+from dataclasses import replace
+import pytest
+from adk_project import http_policy
+from adk_project.agents.fact_check_matcher_agent import factchecker_scraper, sources
+from adk_project.http_client import HttpResponse
+from adk_project.http_policy import CircuitBreaker, DomainPolicy, FetchError, LatencyTracker, TokenBucket
+
+class FakeTransport:
+    def __init__(self, delays=None, status=200):
+        self.delays = list(delays or [])
+        self.status = status
+        self.calls = 0
+
+    async def get(self, url, headers=None, timeout=10):
+        self.calls += 1
+        delay = self.delays.pop(0) if self.delays else 0
+        if isinstance(delay, Exception):
+            raise delay
+        await asyncio.sleep(delay)
+        return HttpResponse(self.status, {}, f"body {self.calls}")
+
+@pytest.fixture
+def transport(monkeypatch):
+    fake = FakeTransport()
+    monkeypatch.setattr(http_policy, "get_transport", lambda: fake)
+    http_policy.reset_policies()
+    yield fake
+    http_policy.reset_policies()
+
+def test_token_bucket_reserves_beyond_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_token_bucket_gives_up_past_max_wait():
+    bucket = TokenBucket(rate=1, burst=1)
+    await bucket.acquire(max_wait=0.5)
+    with pytest.raises(FetchError) as exc:
+        await bucket.acquire(max_wait=0.5)
+    assert exc.value.reason == "rate_limited"
+
+def test_adaptive_timeout_follows_p99():
+    tracker = LatencyTracker(window=50, min_samples=5)
+    assert tracker.timeout() == http_policy.TIMEOUT_DEFAULT
+    for _ in range(10):
+        tracker.add(0.8)
+    assert tracker.timeout() == pytest.approx(0.8 * http_policy.TIMEOUT_P99_FACTOR)
+
+def test_breaker_opens_and_probes_once_after_reset(monkeypatch):
+    breaker = CircuitBreaker(threshold=2, reset_s=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    monkeypatch.setattr(breaker, "opened_at", breaker.opened_at - 31)
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_policy_fails_fast_once_the_breaker_is_open(transport):
+    transport.status = 503
+    policy = DomainPolicy("example.org", breaker_threshold=2)
+    for _ in range(2):
+        with pytest.raises(FetchError) as exc:
+            await policy.get("http://example.org/")
+        assert exc.value.reason == "http_error"
+    with pytest.raises(FetchError) as exc:
+        await policy.get("http://example.org/")
+    assert exc.value.reason == "circuit_open"
+    assert transport.calls == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_reopens_the_breaker_instead_of_wedging_it(transport, monkeypatch):
+    transport.status = 503
+    policy = DomainPolicy("example.org", breaker_threshold=1, breaker_reset_s=30)
+    with pytest.raises(FetchError):
+        await policy.get("http://example.org/")
+    monkeypatch.setattr(policy.breaker, "opened_at", policy.breaker.opened_at - 31)
+    transport.delays = [1.0]
+    probe = asyncio.ensure_future(policy.get("http://example.org/"))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert policy.breaker.state == "open" and policy.breaker.retry_in() > 29
+    # Tras el nuevo periodo de espera se vuelve a sondear.
+    monkeypatch.setattr(policy.breaker, "opened_at", policy.breaker.opened_at - 31)
+    transport.status = 200
+    assert (await policy.get("http://example.org/")).status == 200
+    assert policy.breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_trip_the_breaker(transport):
+    transport.status = 404
+    policy = DomainPolicy("example.org", breaker_threshold=1)
+    with pytest.raises(FetchError):
+        await policy.get("http://example.org/")
+    assert policy.breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_first_response_wins(transport):
+    policy = DomainPolicy("example.org", hedge=True)
+    for _ in range(http_policy.LATENCY_MIN_SAMPLES):
+        policy.latency.add(0.02)
+    transport.delays = [1.0, 0.0]
+    resp = await policy.get("http://example.org/")
+    assert resp.text == "body 2"
+    assert transport.calls == 2
+
+@pytest.mark.asyncio
+async def test_failed_sites_are_reported_and_not_cached(transport, monkeypatch):
+    monkeypatch.setattr(sources, "SOURCES", {
+        name: replace(source, search_url=f"http://{name}.test/?q={{query}}") for name, source in sources.SOURCES.items()
+    })
+    transport.delays = [ConnectionError("refused"), ConnectionError("refused")]
+    result = await factchecker_scraper.get_factchecker_claims("Policy test claim about unreachable checkers")
+    assert result["matches"] == []
+    assert {(f["site"], f["reason"]) for f in result["failures"]} == {
+        ("factcheck.org", "network_error"), ("apnews.com", "network_error"),
+    }
+    again = await factchecker_scraper.get_factchecker_claims("Policy test claim about unreachable checkers")
+    assert again["failures"] == []
+    assert transport.calls == 4
@@ -0,0 +1,96 @@
+"""
+Tests para la ingesta incremental de ClaimReview y el cambio atómico de snapshot
+"""
+import json
+import os
+import time
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from adk_project import http_client
+from adk_project.agents.fact_check_matcher_agent import factcheck_index
+from adk_project.agents.fact_check_matcher_agent.ingest import _prune_snapshots, dedupe, extract_claim_reviews, ingest
+
+def _page(*claims):
+    graph = [{"@type": "ClaimReview", "claimReviewed": claim, "url": f"https://checks.example/{i}?utm_source=x",
+              "reviewRating": {"alternateName": "False"}, "author": {"name": "Checks"}, "datePublished": "2025-01-01"}
+             for i, claim in enumerate(claims)]
+    return f'<html><head><script type="application/ld+json">{json.dumps({"@graph": graph})}</script></head></html>'
+
+@pytest_asyncio.fixture
+async def site():
+    pages = {
+        "coffee": ("2025-01-01", _page("Coffee prevents 90% of cancer cases")),
+        "moon": ("2025-01-01", _page("The moon landing was staged in a studio")),
+    }
+    fetched = []
+
+    def sitemap(request):
+        base = f"http://{request.host}"
+        if request.path == "/sitemap_index.xml":
+            body = (f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><sitemap>'
+                    f'<loc>{base}/posts.xml</loc><lastmod>{max(m for m, _ in pages.values())}</lastmod></sitemap></sitemapindex>')
+        else:
+            body = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + "".join(
+                f"<url><loc>{base}/p/{slug}</loc><lastmod>{lastmod}</lastmod></url>" for slug, (lastmod, _) in pages.items()
+            ) + "</urlset>"
+        return web.Response(text=body, content_type="application/xml")
+
+    def page(request):
+        fetched.append(request.match_info["slug"])
+        return web.Response(text=pages[request.match_info["slug"]][1], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/sitemap_index.xml", sitemap)
+    app.router.add_get("/posts.xml", sitemap)
+    app.router.add_get("/p/{slug}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    server = web.TCPSite(runner, "127.0.0.1", 0)
+    await server.start()
+    yield f"http://127.0.0.1:{runner.addresses[0][1]}", pages, fetched
+    await http_client.close_transport()
+    await runner.cleanup()
+
+def test_claim_reviews_are_extracted_and_deduped():
+    records = extract_claim_reviews(_page("Coffee prevents cancer", "Coffee prevents cancer"), "https://checks.example/p")
+    assert records[0]["source"] == "https://checks.example/0"
+    assert records[0]["rating"] == "False" and records[0]["publisher"] == "Checks"
+    syndicated = dict(records[0], source="https://checks.example/0?utm_medium=social", claim="coffee PREVENTS cancer!")
+    assert len(dedupe([records[0], syndicated])) == 1
+
+@pytest.mark.asyncio
+async def test_incremental_ingest_swaps_snapshot_and_reembeds_only_changes(site, tmp_path, monkeypatch):
+    base, pages, fetched = site
+    root = str(tmp_path)
+    monkeypatch.setattr(factcheck_index, "INDEX_DIR", root)
+    monkeypatch.setattr(factcheck_index, "INDEX_RELOAD_INTERVAL", 0)
+    monkeypatch.setattr(factcheck_index, "_INDEX", None)
+
+    first = await ingest([f"{base}/sitemap_index.xml"], root)
+    assert (first["records"], first["embedded"], sorted(fetched)) == (2, 2, ["coffee", "moon"])
+    served = factcheck_index.get_index()
+    assert served.search(["Does coffee prevent cancer?"], k=1)[0][0]["rating"] == "False"
+
+    unchanged = await ingest([f"{base}/sitemap_index.xml"], root)
+    assert unchanged["pages_fetched"] == 0 and unchanged["snapshot"] == first["snapshot"]
+
+    pages["moon"] = ("2025-02-01", _page("The moon landing was staged in a studio", "Birds are government drones"))
+    second = await ingest([f"{base}/sitemap_index.xml"], root)
+    assert fetched.count("coffee") == 1 and fetched.count("moon") == 2
+    assert (second["records"], second["embedded"]) == (3, 1)
+
+    reloaded = factcheck_index.get_index()
+    assert reloaded is not served
+    assert reloaded.search(["birds are drones"], k=1)[0][0]["claim"] == "Birds are government drones"
+    # El snapshot anterior sigue siendo legible para las búsquedas en curso.
+    assert len(served.search(["coffee cancer"], k=1)[0]) == 1
+
+def test_superseded_snapshots_outlive_the_reload_interval(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    for i, age in enumerate((600, 300, 5, 0)):
+        (snapshots / f"s{i}").mkdir(parents=True)
+        os.utime(snapshots / f"s{i}", (time.time() - age,) * 2)
+    _prune_snapshots(str(tmp_path), keep=1, current="s3", grace=60)
+    # s0 fue reemplazado hace 300 s; s1 y s2 hace menos de la gracia y aún pueden estar en uso.
+    assert sorted(os.listdir(snapshots)) == ["s1", "s2", "s3"]
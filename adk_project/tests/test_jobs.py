@@ -0,0 +1,165 @@
+"""
+Tests para la cola de trabajos: prioridades, deduplicación, 429, persistencia y notificaciones
+"""
+import asyncio
+import json
+import pytest
+from aiohttp import web
+from fastapi.testclient import TestClient
+from adk_project import http_client
+from adk_project.api import jobs, main
+from adk_project.api.jobs import InvalidWebhook, JobQueue, JobStore, QueueFull
+
+def _recording_run(order):
+    async def run(text):
+        order.append(text)
+        await asyncio.sleep(0)
+        return {"url": text}
+    return run
+
+@pytest.mark.asyncio
+async def test_interactive_lane_runs_first_and_duplicates_share_a_job():
+    queue = JobQueue(max_depth=2)
+    bulk, _ = queue.submit("https://example.com/a", "bulk")
+    interactive, _ = queue.submit("https://example.com/b")
+    same, deduplicated = queue.submit("https://example.com/a?utm_source=feed", "bulk")
+    assert deduplicated and same is bulk
+    with pytest.raises(QueueFull):
+        queue.submit("https://example.com/c", "bulk")
+
+    order = []
+    queue.start(_recording_run(order), workers=1)
+    assert (await queue.wait(bulk.id)).result == {"url": "https://example.com/a"}
+    await queue.stop()
+    assert order == ["https://example.com/b", "https://example.com/a"]
+    assert interactive.status == "done" and queue.depth() == 0
+
+@pytest.mark.asyncio
+async def test_interactive_resubmission_promotes_a_queued_bulk_job():
+    queue = JobQueue()
+    first, _ = queue.submit("https://example.com/a", "bulk")
+    queue.submit("https://example.com/b", "bulk")
+    promoted, _ = queue.submit("https://example.com/a", "interactive")
+    assert promoted is first and first.priority == "interactive"
+    assert (queue.depth("interactive"), queue.depth("bulk")) == (1, 1)
+
+    order = []
+    queue.start(_recording_run(order), workers=1)
+    await queue.wait(queue.submit("https://example.com/b", "bulk")[0].id)
+    await queue.stop()
+    assert order == ["https://example.com/a", "https://example.com/b"]
+
+def test_persisted_jobs_resume_after_restart(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store=store)
+    job, _ = queue.submit("https://example.com/a", "bulk")
+    job.status = "running"
+    store.save(job)
+    with pytest.raises(RuntimeError, match="one file per worker"):
+        JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.close()
+
+    restored = JobQueue(store=JobStore(str(tmp_path / "jobs.sqlite3")))
+    assert restored.get(job.id).status == "queued"
+    assert restored.depth("bulk") == 1
+    assert restored.submit("https://example.com/a")[1] is True
+
+def test_webhooks_to_internal_hosts_are_rejected(monkeypatch):
+    queue = JobQueue()
+    for url in ("file:///etc/passwd", "http://127.0.0.1:8080/hook", "http://169.254.169.254/latest/meta-data",
+                "http://[::1]/hook", "http://10.0.0.5/hook", "http://localhost/hook"):
+        with pytest.raises(InvalidWebhook):
+            queue.submit("https://example.com/a", webhook_url=url)
+    assert queue.submit("https://example.com/a", webhook_url="https://hooks.example.com/factos")[0].webhooks
+    monkeypatch.setattr(jobs, "WEBHOOK_HOSTS", [".partner.example"])
+    queue.submit("https://example.com/b", webhook_url="https://api.partner.example/hook")
+    with pytest.raises(InvalidWebhook):
+        queue.submit("https://example.com/c", webhook_url="https://hooks.example.com/factos")
+
+@pytest.mark.asyncio
+async def test_webhook_receives_the_finished_job(monkeypatch):
+    monkeypatch.setattr(jobs, "WEBHOOK_HOSTS", ["127.0.0.1"])
+    received = asyncio.Queue()
+
+    async def hook(request):
+        await received.put(await request.json())
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post("/hook", hook)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    try:
+        queue = JobQueue()
+        job, _ = queue.submit("https://example.com/a", webhook_url=f"http://127.0.0.1:{runner.addresses[0][1]}/hook")
+        queue.start(_recording_run([]), workers=1)
+        payload = await asyncio.wait_for(received.get(), 5)
+        await queue.stop()
+    finally:
+        await http_client.close_transport()
+        await runner.cleanup()
+    assert payload["id"] == job.id and payload["status"] == "done"
+    assert "webhooks" not in payload
+
+@pytest.mark.asyncio
+async def test_webhook_redirects_are_not_followed(monkeypatch, capsys):
+    monkeypatch.setattr(jobs, "WEBHOOK_HOSTS", ["127.0.0.1"])
+    leaked = []
+
+    async def hook(request):
+        raise web.HTTPTemporaryRedirect("/metadata")
+
+    async def metadata(request):
+        leaked.append(await request.json())
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post("/hook", hook)
+    app.router.add_post("/metadata", metadata)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    try:
+        queue = JobQueue()
+        job, _ = queue.submit("https://example.com/a", webhook_url=f"http://127.0.0.1:{runner.addresses[0][1]}/hook")
+        job.status = "done"
+        await queue._deliver(job)
+    finally:
+        await http_client.close_transport()
+        await runner.cleanup()
+    assert leaked == []
+    assert "redirect to /metadata not followed" in capsys.readouterr().out
+
+@pytest.mark.asyncio
+async def test_webhook_to_a_host_resolving_privately_is_skipped(capsys):
+    queue = JobQueue()
+    job, _ = queue.submit("https://example.com/a", webhook_url="https://hooks.example.com/factos")
+    job.webhooks = ["http://localhost/hook"]
+    assert await jobs._public_addresses("localhost") is None
+    await queue._deliver(job)
+    assert "does not resolve to a public address" in capsys.readouterr().out
+
+def test_job_api_polling_sse_and_backpressure(monkeypatch):
+    async def fake_pipeline(text):
+        return {"score": 1, "url": text}
+
+    monkeypatch.setattr(main, "WARMUP_ENABLED", False)
+    monkeypatch.setattr(main, "run_pipeline_cached", fake_pipeline)
+    monkeypatch.setattr(main, "JOBS", JobQueue(max_depth=1))
+    with TestClient(main.app) as client:
+        created = client.post("/jobs", json={"text": "https://example.com/a"})
+        assert created.status_code == 202
+        job_id = created.json()["id"]
+
+        frames = [f for f in client.get(f"/jobs/{job_id}/events").text.split("\n\n") if f]
+        assert frames[-1].splitlines()[0] == "event: done"
+        assert json.loads(frames[-1].splitlines()[1][len("data: "):])["result"] == {"score": 1, "url": "https://example.com/a"}
+        assert client.get(f"/jobs/{job_id}").json()["status"] == "done"
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.post("/jobs", json={"text": "x", "priority": "urgent"}).status_code == 422
+        assert client.post("/jobs", json={"text": "x", "webhook_url": "http://127.0.0.1/"}).status_code == 422
+
+    main.JOBS.submit("https://example.com/queued")  # sin workers: la cola se queda llena
+    full = TestClient(main.app).post("/jobs", json={"text": "https://example.com/b"})
+    assert full.status_code == 429 and full.headers["Retry-After"]
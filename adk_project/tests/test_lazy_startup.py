@@ -0,0 +1,39 @@
+"""
+Tests para la construcción diferida de agentes y el arranque en frío de la API
+"""
+import asyncio
+import subprocess
+import sys
+import pytest
+from adk_project import agent
+from adk_project.api import pipeline, warmup
+
+HEAVY_MODULES = ("google.adk", "google.genai", "aiohttp", "bs4")
+
+def test_importing_the_api_does_not_load_agent_dependencies():
+    code = (
+        "import sys, adk_project.api.main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+def test_root_agent_attribute_is_the_cached_tree():
+    from adk_project.agent import root_agent
+    assert root_agent is agent.get_root_agent()
+    assert root_agent.name == "FactosAgent"
+    with pytest.raises(AttributeError):
+        agent.missing_attribute
+
+@pytest.mark.asyncio
+async def test_concurrent_first_requests_share_one_runner():
+    runners = await asyncio.gather(*(pipeline.ensure_runner() for _ in range(4)))
+    assert all(r is runners[0] for r in runners)
+    assert runners[0].agent is agent.get_root_agent()
+
+@pytest.mark.asyncio
+async def test_warm_up_tolerates_unreachable_origins(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_URLS", ["http://127.0.0.1:9/"])
+    monkeypatch.setattr(warmup, "warm_model_client", lambda model: asyncio.sleep(0))
+    await warmup.warm_up()
+    assert warmup.WARMUP_STATE["done"] is True
@@ -0,0 +1,85 @@
+"""
+Tests para la caché de respuestas de modelo de los LlmAgent
+"""
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, FunctionCall, Part
+from adk_project.agents.llm_cache import LlmCacheMiss, LlmResponseCache, request_key
+from adk_project.benchmarks.stub_llm import StubLlm
+from adk_project.cache import AsyncCache, LRUCache
+
+class CountingLlm(StubLlm):
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+def make_agent(cache, name="ClaimExtractorAgent"):
+    return LlmAgent(
+        name=name,
+        instruction="Extract the claim.",
+        model=CountingLlm(),
+        before_model_callback=cache.before_model,
+        after_model_callback=cache.after_model,
+    )
+
+async def run_once(agent, text):
+    sessions = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="t", session_service=sessions)
+    session = await sessions.create_session(app_name="t", user_id="u")
+    texts = []
+    async for event in runner.run_async(
+        user_id="u", session_id=session.id, new_message=Content(role="user", parts=[Part(text=text)])
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            texts.append(event.content.parts[0].text)
+    return texts
+
+def memory_cache(mode="cache", disabled=()):
+    return LlmResponseCache(AsyncCache(LRUCache(max_entries=16), ttl=60, name="llm"), mode, disabled)
+
+@pytest.mark.asyncio
+async def test_identical_requests_hit_the_cache():
+    cache = memory_cache()
+    agent = make_agent(cache)
+    first = await run_once(agent, "article bench-7")
+    second = await run_once(agent, "article bench-7")
+    await run_once(agent, "article bench-8")
+    assert first == second
+    assert agent.model.calls == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "stores": 2}
+
+@pytest.mark.asyncio
+async def test_agent_opt_out_always_calls_the_model():
+    cache = memory_cache(disabled={"ClaimExtractorAgent"})
+    agent = make_agent(cache)
+    await run_once(agent, "article bench-7")
+    await run_once(agent, "article bench-7")
+    assert agent.model.calls == 2
+    assert cache.stats()["hits"] == 0
+
+@pytest.mark.asyncio
+async def test_replay_serves_recordings_and_fails_on_miss():
+    backend = LRUCache(max_entries=16)
+    recorder = LlmResponseCache(AsyncCache(backend, ttl=60), "record")
+    recorded = await run_once(make_agent(recorder), "article bench-3")
+
+    replayer = LlmResponseCache(AsyncCache(backend, ttl=60), "replay")
+    agent = make_agent(replayer)
+    assert await run_once(agent, "article bench-3") == recorded
+    assert agent.model.calls == 0
+    with pytest.raises(LlmCacheMiss):
+        await run_once(agent, "article bench-4")
+
+def test_request_key_ignores_function_call_ids():
+    def request(call_id):
+        call = FunctionCall(id=call_id, name="factchecker_search_tool", args={"main_claim": "x"})
+        return LlmRequest(model="m", contents=[Content(role="model", parts=[Part(function_call=call)])])
+
+    assert request_key(request("adk-1")) == request_key(request("adk-2"))
+    assert request_key(request("adk-1")) != request_key(LlmRequest(model="other", contents=request("adk-1").contents))
@@ -0,0 +1,76 @@
+"""
+Tests para los mensajes A2A tipados: validación, forma compacta y codificación
+"""
+import dataclasses
+import importlib.util
+import json
+from types import SimpleNamespace
+import pytest
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, Part
+from adk_project.agents.response_formatter_agent import ResponseFormatterAgent
+from adk_project.agents.utils import payload_budget_callback
+from adk_project.messages import Match, MatchResults, MessageValidationError, ScoredResult, ValidatedArticle
+from adk_project.protocols.a2a_protocol import decode_message, encode_message, validate_message
+
+MATCHES = {
+    "matches": [{"claim": "Coffee does not prevent cancer", "source": "https://factcheck.example/1",
+                 "confidence": 1, "rating": "False", "page": "https://factcheck.example/"}],
+    "failures": [{"site": "apnews.com", "reason": "timeout"}],
+}
+
+def test_messages_are_frozen_slotted_and_typed():
+    results = validate_message("MatchResults", MATCHES)
+    match = results.matches[0]
+    assert isinstance(match, Match) and match.confidence == 1.0 and not hasattr(match, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        match.claim = "edited"
+    # Campos desconocidos fuera; los opcionales sin valor no viajan.
+    assert results.to_dict()["matches"][0] == {"claim": "Coffee does not prevent cancer",
+                                               "source": "https://factcheck.example/1",
+                                               "confidence": 1.0, "rating": "False"}
+
+def test_strict_validation_rejects_what_lenient_validation_repairs():
+    with pytest.raises(MessageValidationError, match="MatchResults.matches: Match.claim: missing"):
+        MatchResults.from_dict({"matches": [{"source": "https://x"}]})
+    with pytest.raises(MessageValidationError, match="ValidatedArticle.headline"):
+        ValidatedArticle.from_dict({"url": "https://x", "headline": 3})
+    repaired = MatchResults.from_dict({"matches": [{"source": "https://x"}, MATCHES["matches"][0]]}, lenient=True)
+    assert [m.claim for m in repaired.matches] == ["Coffee does not prevent cancer"]
+    scored = ScoredResult.from_dict({"score": 2.0, "confidence_level": "high"}, lenient=True)
+    assert (scored.score, scored.confidence_level) == (2, 0)
+    with pytest.raises(MessageValidationError):
+        ScoredResult.from_dict({"label": "False"}, lenient=True)
+
+def test_lenient_validation_parses_numeric_strings_and_nulls_bad_optionals():
+    with pytest.raises(MessageValidationError, match="ScoredResult.score: expected int, got str"):
+        ScoredResult.from_dict({"score": "3"})
+    scored = ScoredResult.from_dict({"score": "3", "confidence_level": "2", "processing_time": "1.5"}, lenient=True)
+    assert (scored.score, scored.confidence_level, scored.processing_time) == (3, 2, 1.5)
+    assert ScoredResult.from_dict({"score": "mostly false"}, lenient=True).score is None
+
+@pytest.mark.asyncio
+async def test_formatter_accepts_a_string_score_from_the_scorer():
+    state = {"scored_result": {"score": "3", "label": "True"},
+             "validated_article": {"url": "https://news.example/a", "headline": "Headline"}}
+    events = [event async for event in ResponseFormatterAgent().run_async(SimpleNamespace(session=SimpleNamespace(state=state)))]
+    response = events[-1].actions.state_delta["agui_response"]
+    assert (response["score"], response["score_label"], response["url"]) == (3, "True", "https://news.example/a")
+
+def test_encoded_message_round_trips():
+    results = validate_message("MatchResults", MATCHES)
+    body = encode_message(results, "json")
+    assert isinstance(body, bytes) and decode_message("MatchResults", body, "json") == results
+
+@pytest.mark.skipif(importlib.util.find_spec("msgpack") is not None, reason="msgpack is installed")
+def test_msgpack_codec_reports_the_missing_package():
+    with pytest.raises(RuntimeError, match="msgpack"):
+        encode_message(validate_message("MatchResults", MATCHES), "msgpack")
+
+def test_model_output_is_validated_at_the_stage_boundary():
+    text = json.dumps([MATCHES["matches"][0], {"source": "no claim"}])
+    response = LlmResponse(content=Content(role="model", parts=[Part(text=text)]))
+    payload_budget_callback("MatchResults")(None, response)
+    assert json.loads(response.content.parts[0].text) == {
+        "matches": [validate_message("MatchResults", MATCHES).to_dict()["matches"][0]], "failures": []
+    }
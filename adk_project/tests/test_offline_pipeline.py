@@ -0,0 +1,55 @@
+"""
+Tests del pipeline completo sin red: servidor de replay + LLM enlatado
+"""
+import pytest
+from adk_project.agent import root_agent
+from adk_project.agents.fact_check_matcher_agent import sources
+from adk_project.agents.smart_scraper_agent import article_extractor
+from adk_project.api import pipeline
+from adk_project.benchmarks.load_driver import configure_offline, percentile, run_load
+from adk_project.benchmarks.replay_server import start_replay_server
+from adk_project.benchmarks.stub_llm import install_stub_llm, restore_models
+from adk_project.deadline import LLM_MIN_BUDGET_S, deadline_scope, new_deadline
+from adk_project.http_client import close_transport
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(sources, "SOURCES", dict(sources.SOURCES))
+    monkeypatch.setattr(article_extractor, "SCRAPER_REQUIRE_HTTPS", True)
+    monkeypatch.setattr(article_extractor, "ALLOWED_DOMAINS", list(article_extractor.ALLOWED_DOMAINS))
+    previous = {agent.name: agent.model for agent in [root_agent, *root_agent.sub_agents] if hasattr(agent, "model")}
+    yield
+    restore_models(root_agent, previous)
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+@pytest.mark.asyncio
+async def test_load_against_root_agent_reports_every_stage(offline):
+    report = await run_load(target="agent", requests=4, concurrency=2)
+    summary = report.summary()
+    assert summary["errors"] == 0
+    assert set(summary["stages"]) == {"pipeline", *(agent.name for agent in root_agent.sub_agents)}
+    assert summary["stages"]["pipeline"]["p95_ms"] >= summary["stages"]["pipeline"]["p50_ms"] > 0
+
+@pytest.mark.asyncio
+async def test_load_counts_origin_failures_as_errors(offline):
+    report = await run_load(target="agent", requests=2, concurrency=2, error_rate=1.0)
+    assert report.summary()["errors"] == 2
+
+@pytest.mark.asyncio
+async def test_short_deadline_skips_model_calls_and_reports_degraded_stages(offline):
+    replay, base_url = await start_replay_server()
+    try:
+        configure_offline(base_url)
+        install_stub_llm(root_agent, 0, 0)
+        with deadline_scope(new_deadline(LLM_MIN_BUDGET_S / 2)):
+            result = await pipeline.run_pipeline(f"{base_url}/article/bench-3")
+    finally:
+        await close_transport()
+        await replay.cleanup()
+    assert result["headline"] and not result.get("error")
+    assert {"ClaimExtractorAgent", "FactCheckMatcherAgent"} <= set(result["degraded_stages"])
@@ -0,0 +1,25 @@
+"""
+Tests para la ejecución concurrente de lotes en /predict
+"""
+import asyncio
+import pytest
+from adk_project.api import pipeline
+
+@pytest.mark.asyncio
+async def test_run_batch_is_concurrent_and_ordered(monkeypatch):
+    async def fake_run_pipeline(text):
+        await asyncio.sleep(0.2 if text == "slow" else 0.05)
+        if text == "boom":
+            raise RuntimeError("scrape failed")
+        return {"url": text}
+
+    monkeypatch.setattr(pipeline, "run_pipeline", fake_run_pipeline)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await pipeline.run_batch(["slow", "boom", "fast"])
+    elapsed = loop.time() - start
+
+    assert elapsed < 0.3
+    assert [r["result"] for r in results] == [{"url": "slow"}, None, {"url": "fast"}]
+    assert results[1]["error"] == "RuntimeError: scrape failed"
+    assert all(r["elapsed_ms"] > 0 for r in results)
@@ -0,0 +1,24 @@
+"""
+Tests para el endpoint de streaming por etapas /predict/stream
+"""
+import json
+from fastapi.testclient import TestClient
+from adk_project.api import main
+
+async def fake_stream_pipeline(text, deadline=None):
+    yield {"stage": "SmartScraperAgent", "output_key": "validated_article", "data": {"url": text}}
+    yield {"stage": "ResponseFormatterAgent", "output_key": "agui_response", "data": {"score": 1}}
+
+def test_sse_emits_one_event_per_stage(monkeypatch):
+    monkeypatch.setattr(main, "stream_pipeline", fake_stream_pipeline)
+    response = TestClient(main.app).post("/predict/stream", json={"text": "https://example.com/a"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in response.text.split("\n\n") if f]
+    assert [f.splitlines()[0] for f in frames] == ["event: validated_article", "event: agui_response"]
+    assert json.loads(frames[-1].splitlines()[1][len("data: "):])["data"] == {"score": 1}
+
+def test_ndjson_format(monkeypatch):
+    monkeypatch.setattr(main, "stream_pipeline", fake_stream_pipeline)
+    response = TestClient(main.app).post("/predict/stream?format=ndjson", json={"text": "https://example.com/a"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["output_key"] for line in lines] == ["validated_article", "agui_response"]
@@ -0,0 +1,95 @@
+"""
+Tests para el perfilado bajo demanda de peticiones (/predict)
+"""
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from adk_project import profiling
+from adk_project.api import main
+from adk_project.workers import run_in_parse_pool
+
+def busy_parse(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return "parsed"
+
+async def busy_stage():
+    busy_parse(0.05)
+    await asyncio.sleep(0.01)
+    return await run_in_parse_pool(busy_parse, 0.05)
+
+@pytest.mark.asyncio
+async def test_profile_attributes_loop_and_parse_pool_samples_to_the_request():
+    profile = profiling.acquire("unit")
+    async with profiling.profiling(profile):
+        assert await asyncio.ensure_future(busy_stage()) == "parsed"
+        profiling.mark("event:SmartScraperAgent")
+    roots = {line.split(";", 1)[0] for line in profile.collapsed().splitlines()}
+    assert "loop:busy_stage" in roots and any(root.startswith("thread:factos-parse") for root in roots)
+    assert "busy_parse" in profile.collapsed()
+    stage = next(t for t in profile.timeline() if t["coro"] == "busy_stage")
+    assert stage["end_ms"] >= stage["start_ms"] and stage["cpu_ms"] > 0
+    assert profile.marks[0]["label"] == "event:SmartScraperAgent"
+    speedscope = profile.speedscope()["profiles"][0]
+    assert len(speedscope["samples"]) == len(speedscope["weights"]) > 0
+
+@pytest.mark.asyncio
+async def test_only_a_bounded_number_of_requests_are_profiled(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_CONCURRENT", 1)
+    first = profiling.acquire("first")
+    async with profiling.profiling(first):
+        assert profiling.acquire("second") is None
+    second = profiling.acquire("second")
+    assert second is not None
+    async with profiling.profiling(second):
+        pass
+
+@pytest.mark.asyncio
+async def test_task_factory_is_restored_and_forwards_new_keyword_arguments():
+    loop = asyncio.get_running_loop()
+    created = []
+
+    def custom_factory(loop, coro, **kwargs):
+        created.append(sorted(kwargs))
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    loop.set_task_factory(custom_factory)
+    try:
+        first, second = profiling.acquire("first"), profiling.acquire("second")
+        async with profiling.profiling(first):
+            async with profiling.profiling(second):
+                factory = loop.get_task_factory()
+                # Python 3.13 también pasa name/eager_start: la factory no debe rechazarlos.
+                await factory(loop, asyncio.sleep(0), name="probe", context=None)
+            assert loop.get_task_factory() is factory
+        assert loop.get_task_factory() is custom_factory
+        assert created[0] == ["context", "name"]
+        assert any(t["name"] == "probe" for t in second.timeline())
+        assert not first._sampler.is_alive() and not second._sampler.is_alive()
+    finally:
+        loop.set_task_factory(None)
+
+def test_predict_profile_header_writes_or_returns_the_profile(monkeypatch, tmp_path):
+    async def fake_run_batch(texts):
+        return [{"result": await busy_stage(), "error": None, "elapsed_ms": 1.0} for _ in texts]
+
+    monkeypatch.setattr(main, "run_batch", fake_run_batch)
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    client = TestClient(main.app)
+    payload = {"instances": [{"text": "https://example.com/a"}]}
+
+    assert client.post("/predict", json=payload, headers={"X-Factos-Profile": "guess"}).status_code == 403
+    assert "profile" not in client.post("/predict", json=payload).json()
+
+    written = client.post("/predict", json=payload, headers={"X-Factos-Profile": "s3cret"}).json()["profile"]
+    assert sorted(p.rsplit(".", 2)[-2] for p in written["files"]) == ["collapsed", "speedscope", "tasks"]
+    with open(next(p for p in written["files"] if p.endswith(".speedscope.json"))) as f:
+        assert json.load(f)["profiles"][0]["type"] == "sampled"
+
+    inline = client.post("/predict", json=payload,
+                         headers={"X-Factos-Profile": "s3cret", "X-Factos-Profile-Output": "inline"}).json()["profile"]
+    assert "busy_parse" in inline["collapsed"] and inline["tasks"]
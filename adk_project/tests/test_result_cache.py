@@ -0,0 +1,166 @@
+"""
+Tests para la caché de resultados del pipeline por URL canónica
+"""
+import asyncio
+import pytest
+from adk_project import http_policy
+from adk_project.api.result_cache import PipelineResultCache, canonicalize_url, content_hash, record_article
+from adk_project.agents.smart_scraper_agent.article_extractor import article_text
+from adk_project.cache import AsyncCache, LRUCache
+from adk_project.http_client import HttpResponse
+
+def test_canonicalize_strips_tracking_fragments_and_amp():
+    canonical = "https://www.theguardian.com/world/2025/jun/11/uk-gibraltar-deal"
+    assert canonicalize_url("https://www.theguardian.com/world/2025/jun/11/uk-gibraltar-deal?utm_source=tw&fbclid=x#comments") == canonical
+    assert canonicalize_url("HTTPS://WWW.theguardian.com:443/world/2025/jun/11/uk-gibraltar-deal/amp") == canonical
+    assert canonicalize_url("https://amp.example.com/story") == "https://example.com/story"
+    assert canonicalize_url("https://news.example.com/story.amp.html?id=2&b=1") == "https://news.example.com/story.html?b=1&id=2"
+
+class FakeTransport:
+    def __init__(self):
+        self.body = "<html>v1</html>"
+        self.etag = '"v1"'
+        self.requests = []
+
+    async def get(self, url, headers=None, timeout=10):
+        self.requests.append(headers or {})
+        if headers and headers.get("If-None-Match") == self.etag:
+            return HttpResponse(304, {"ETag": self.etag}, "")
+        return HttpResponse(200, {"ETag": self.etag}, self.body)
+
+    def scraped(self, url):
+        """What the SmartScraperAgent would publish for the current version of the page."""
+        return {"url": url, "etag": self.etag, "text_ref": "sha256:" + content_hash(self.body)}
+
+@pytest.fixture
+def transport(monkeypatch):
+    fake = FakeTransport()
+    # La revalidación pasa por la política por dominio, que usa el transporte compartido.
+    monkeypatch.setattr(http_policy, "get_transport", lambda: fake)
+    http_policy.reset_policies()
+    yield fake
+    http_policy.reset_policies()
+
+@pytest.mark.asyncio
+async def test_identical_submissions_run_pipeline_once(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        await asyncio.sleep(0.05)
+        return {"url": url}
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=60, stale_ttl=600))
+    urls = ["https://example.com/a?utm_campaign=x", "https://example.com/a#top", "https://example.com/a"]
+    results = await asyncio.gather(*(cache.run(u, run_pipeline) for u in urls))
+    # Una sola ejecución, con la URL tal como la envió el primero; la canónica es solo la clave.
+    assert runs == ["https://example.com/a?utm_campaign=x"]
+    assert results == [{"url": "https://example.com/a?utm_campaign=x"}] * 3
+    assert await cache.run("https://example.com/a/amp", run_pipeline) == {"url": "https://example.com/a?utm_campaign=x"}
+    assert cache.stats()["hits"] == 1
+    assert transport.requests == []  # los validadores salen de la descarga del pipeline, no de otro GET
+
+@pytest.mark.asyncio
+async def test_stale_result_is_revalidated_against_origin(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        record_article(transport.scraped(url))
+        return {"version": len(runs)}
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=-1, stale_ttl=600))
+    assert await cache.run("https://example.com/a", run_pipeline) == {"version": 1}
+    # 304 Not Modified -> cached result reused
+    assert await cache.run("https://example.com/a", run_pipeline) == {"version": 1}
+    assert transport.requests[-1]["If-None-Match"] == '"v1"'
+    # article changed -> pipeline runs again
+    transport.etag, transport.body = '"v2"', "<html>v2</html>"
+    assert await cache.run("https://example.com/a", run_pipeline) == {"version": 2}
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "misses": 2, "coalesced": 0}
+
+@pytest.mark.asyncio
+async def test_unchanged_article_text_revalidates_without_validators(transport):
+    transport.body = "<html><body><article><p>" + "Coffee study finds no link to cancer risk. " * 3 + "</p></article></body></html>"
+
+    async def run_pipeline(url):
+        record_article({**transport.scraped(url), "etag": None,
+                        "text_ref": "sha256:" + content_hash(article_text(transport.body))})
+        return {"url": url}
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=-1, stale_ttl=600))
+    await cache.run("https://example.com/a", run_pipeline)
+    transport.etag = '"rotated"'  # ETag distinto, mismo texto
+    await cache.run("https://example.com/a", run_pipeline)
+    assert cache.stats()["revalidated"] == 1
+
+@pytest.mark.asyncio
+async def test_non_dict_results_are_not_cached(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        return None
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=60, stale_ttl=600))
+    await cache.run("https://example.com/a", run_pipeline)
+    await cache.run("https://example.com/a", run_pipeline)
+    assert len(runs) == 2
+
+@pytest.mark.asyncio
+async def test_incomplete_results_are_not_cached(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        if len(runs) == 1:
+            return {"url": url, "unavailable_sources": [{"site": "apnews.com", "reason": "timeout"}]}
+        if len(runs) == 2:
+            return {"url": url, "error": "Could not fetch article"}
+        return {"url": url}
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=60, stale_ttl=600))
+    for _ in range(4):
+        await cache.run("https://example.com/a", run_pipeline)
+    assert len(runs) == 3 and cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_pipeline_and_revalidation_use_the_submitted_url(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        record_article(transport.scraped(url))
+        return {"url": url}
+
+    fetched = []
+    get = transport.get
+
+    async def recording_get(url, headers=None, timeout=10):
+        fetched.append(url)
+        return await get(url, headers, timeout)
+
+    transport.get = recording_get
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=-1, stale_ttl=600))
+    await cache.run("https://amp.example.com/news/story/amp", run_pipeline)
+    await cache.run("https://amp.example.com/news/story/amp", run_pipeline)
+    assert runs == ["https://amp.example.com/news/story/amp"]
+    assert fetched == ["https://amp.example.com/news/story/amp"]
+    assert cache.stats()["revalidated"] == 1
+
+@pytest.mark.asyncio
+async def test_revalidation_respects_an_open_breaker(transport):
+    runs = []
+
+    async def run_pipeline(url):
+        runs.append(url)
+        record_article(transport.scraped(url))
+        return {"version": len(runs)}
+
+    cache = PipelineResultCache(AsyncCache(LRUCache(), ttl=-1, stale_ttl=600))
+    await cache.run("https://example.com/a", run_pipeline)
+    policy = http_policy.get_policy("example.com")
+    for _ in range(policy.breaker.threshold):
+        policy.breaker.record_failure()
+    assert await cache.run("https://example.com/a", run_pipeline) == {"version": 2}
+    assert len(transport.requests) == 0
@@ -0,0 +1,56 @@
+"""
+Tests para el resumen extractivo y el presupuesto de tokens de los mensajes A2A
+"""
+import pytest
+from adk_project.protocols.a2a_protocol import A2A_MESSAGE_TYPES, enforce_payload_budget, payload_tokens
+from adk_project.summarizer import estimate_tokens, split_sentences, summarize
+
+FILLER = "Readers shared the story widely on social media during the weekend and many left comments. "
+ARTICLE = (
+    "The city council approved a 12 million euro budget for new bike lanes on Monday. "
+    + FILLER * 30
+    + "Mayor Ana López said the Lanes will open in March 2026 across 40 kilometres of streets. "
+    + FILLER * 30
+)
+
+def test_estimate_tokens_is_close_to_word_count():
+    text = "Coffee consumption was associated with a lower risk of several cancers."
+    assert len(text.split()) <= estimate_tokens(text) <= 2 * len(text.split())
+    assert estimate_tokens("") == 0
+
+def test_split_sentences_keeps_abbreviation_free_sentences():
+    assert split_sentences("First one. Second one! ¿Tercera? 4 cuartas.") == ["First one.", "Second one!", "¿Tercera?", "4 cuartas."]
+
+def test_summarize_keeps_relevant_sentences_within_budget_in_order():
+    summary = summarize(ARTICLE, headline="Council approves budget for bike lanes", max_tokens=60)
+    assert estimate_tokens(summary) <= 60
+    assert summary.startswith("The city council approved a 12 million euro budget")
+    assert "Mayor Ana López" in summary
+    assert summary.index("city council") < summary.index("Mayor")
+
+def test_short_text_is_untouched():
+    assert summarize("Short text.", max_tokens=50) == "Short text."
+
+@pytest.mark.parametrize("message_type", A2A_MESSAGE_TYPES)
+def test_every_message_type_is_bounded(message_type):
+    payload = {
+        "headline": "Council approves budget for bike lanes",
+        "claim": "The council approved 12 million euros for bike lanes",
+        "main_claim": "The council approved 12 million euros for bike lanes",
+        "full_text": ARTICLE,
+        "detailed_analysis": ARTICLE,
+    }
+    bounded = enforce_payload_budget(message_type, payload, max_tokens=200)
+    assert payload_tokens(bounded) <= 200
+    assert bounded["headline"] == payload["headline"]
+
+def test_match_list_loses_its_tail_first():
+    matches = [{"claim": f"Fact-check number {i} about bike lanes", "source": f"https://example.org/{i}"} for i in range(50)]
+    bounded = enforce_payload_budget("MatchResults", {"matches": matches}, max_tokens=120)
+    assert payload_tokens(bounded) <= 120
+    assert bounded["matches"] == matches[: len(bounded["matches"])]
+    assert len(bounded["matches"]) >= 1
+
+def test_unknown_message_type_is_rejected():
+    with pytest.raises(ValueError):
+        enforce_payload_budget("Article", {})
@@ -0,0 +1,43 @@
+"""
+Tests para la instrumentación y el endpoint /metrics
+"""
+import inspect
+import pytest
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from adk_project import telemetry
+from adk_project.api import main
+
+def _event(author, prompt=None, completion=None):
+    usage = SimpleNamespace(prompt_token_count=prompt, candidates_token_count=completion) if prompt else None
+    return SimpleNamespace(author=author, usage_metadata=usage, partial=False)
+
+def test_pipeline_trace_records_stages_and_tokens():
+    trace = telemetry.PipelineTrace()
+    for event in [_event("user"), _event("SmartScraperAgent"), _event("ClaimExtractorAgent", 120, 30), _event("ClaimExtractorAgent")]:
+        trace.on_event(event)
+    assert trace.finish() >= 0
+    assert set(trace.stages) == {"SmartScraperAgent", "ClaimExtractorAgent"}
+    assert telemetry.LLM_TOKENS.labels(stage="ClaimExtractorAgent", kind="prompt")._value.get() >= 120
+
+@pytest.mark.asyncio
+async def test_timed_tool_keeps_signature_and_records_outcome():
+    @telemetry.timed_tool
+    async def sample_tool(main_claim: str):
+        return [main_claim]
+
+    assert list(inspect.signature(sample_tool).parameters) == ["main_claim"]
+    assert await sample_tool("x") == ["x"]
+    assert telemetry.TOOL_DURATION.labels(tool="sample_tool", outcome="ok")._sum.get() > 0
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    telemetry.register_cache("test", lambda: {"hits": 3, "misses": 1})
+    body = TestClient(main.app).get("/metrics").text
+    assert "factos_stage_duration_seconds" in body
+    assert 'factos_cache_hit_ratio{cache="test"} 0.75' in body
+
+def test_cache_stats_survive_multiprocess_mode(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    telemetry.register_cache("test", lambda: {"hits": 1, "misses": 1})
+    body, _ = telemetry.render_metrics()
+    assert b'factos_cache_hit_ratio{cache="test"} 0.5' in body
@@ -0,0 +1,42 @@
+"""
+Tests para el motor de puntuación basado en reglas del TruthScorerAgent
+"""
+from adk_project.agents.truth_scorer_agent.rules import detect_verdict, score_matches
+
+def test_detect_verdict_prefers_specific_phrases():
+    assert detect_verdict("Claim about tariffs is Half True") == 1
+    assert detect_verdict("Viral video is misleading") == 2
+    assert detect_verdict("It's not true that coffee prevents cancer") == 3
+    assert detect_verdict("Senator's figure is accurate") == 0
+    assert detect_verdict("What we know about the border deal") is None
+
+def test_agreeing_sources_are_scored_without_llm():
+    matches = [
+        {"claim": "Coffee prevents 90% of cancers", "source": "https://a", "confidence": 0.92, "rating": "False"},
+        {"claim": "Coffee prevents cancer in humans", "source": "https://b", "confidence": 0.88, "rating": "Pants on Fire"},
+    ]
+    scored, confident = score_matches("Coffee prevents cancer", matches)
+    assert confident
+    assert scored["score"] == 3 and scored["label"] == "False"
+    assert scored["verified_sources"] == ["https://a", "https://b"]
+    assert scored["main_claim"] == "Coffee prevents cancer"
+
+def test_conflicting_or_weak_evidence_defers_to_llm():
+    conflicting = [
+        {"claim": "The deal changes sovereignty", "source": "https://a", "confidence": 0.97, "rating": "False"},
+        {"claim": "The deal is a breakthrough", "source": "https://b", "confidence": 0.93, "rating": "Accurate"},
+    ]
+    assert score_matches("claim", conflicting)[1] is False
+    weak = [{"claim": "Claim", "source": "https://a", "confidence": 0.3, "rating": "False"}]
+    assert score_matches("claim", weak)[1] is False
+    assert score_matches("claim", [])[1] is False
+
+def test_headlines_without_a_rating_are_never_a_confident_verdict():
+    debunks = [
+        {"claim": "Experts confirm vaccines do not contain microchips", "source": "https://a", "confidence": 0.95},
+        {"claim": "No, it is not confirmed that vaccines contain microchips", "source": "https://b", "confidence": 0.93},
+    ]
+    scored, confident = score_matches("vaccines contain microchips", debunks)
+    assert confident is False and scored["score"] is None
+    spider = [{"claim": "Yes, it is true that the false widow spider bites", "source": "https://c", "confidence": 0.9}]
+    assert score_matches("false widow spiders bite", spider) == (scored | {"main_claim": "false widow spiders bite"}, False)
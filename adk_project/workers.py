@@ -0,0 +1,46 @@
+"""
+Pool acotado para trabajo de CPU (parsing HTML) fuera del event loop.
+"""
+import asyncio
+import importlib.util
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from adk_project.profiling import active_profile
+
+PARSE_WORKERS = int(os.getenv("FACTOS_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# "thread" (por defecto; lxml libera el GIL) o "process" para aislar por completo el parsing.
+PARSE_EXECUTOR = os.getenv("FACTOS_PARSE_EXECUTOR", "thread")
+
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+_executor: Optional[Executor] = None
+
+
+def get_parse_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PARSE_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="factos-parse")
+    return _executor
+
+
+async def run_in_parse_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Runs ``fn(*args)`` in the parse pool; ``fn`` must be picklable for process pools."""
+    loop = asyncio.get_running_loop()
+    executor = get_parse_executor()
+    profile = active_profile()
+    if profile is not None and isinstance(executor, ThreadPoolExecutor):
+        fn = profile.wrap_thread(fn)
+    return await loop.run_in_executor(executor, partial(fn, *args))
+
+
+def shutdown_parse_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None